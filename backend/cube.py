@@ -0,0 +1,87 @@
+"""Materialized aggregate cube over the course and beviljade facts.
+
+Every combination of dimensions (a cuboid) is aggregated once when the cube
+is built, each from its smallest already-built parent, so a rollup or slice is
+a lookup in pre-aggregated cells instead of a groupby over the fact rows.
+Measures are summed with ``min_count=1``: a cell without facts for a measure
+stays NaN, so charts can drop it instead of showing zeros. Measures whose facts
+are whole numbers (counts of seats) come back as nullable ``Int64`` rather than
+the float the missing cells would force on them.
+"""
+from itertools import combinations
+
+
+class AggregateCube:
+    def __init__(self, facts, dimensions, measures, attributes=None):
+        """``attributes`` maps a dimension to columns it determines (Län -> Länskod)."""
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.attributes = dict(attributes or {})
+        self._integers = {
+            measure for measure in self.measures
+            if (values := facts[measure].dropna()).empty or (values % 1 == 0).all()
+        }
+        self._cuboids = {}
+
+        for size in range(len(self.dimensions), -1, -1):
+            for dims in combinations(self.dimensions, size):
+                parents = [
+                    cuboid for key, cuboid in self._cuboids.items()
+                    if len(key) == size + 1 and key.issuperset(dims)
+                ]
+                source = min(parents, key=len) if parents else facts
+                self._cuboids[frozenset(dims)] = self._aggregate(source, list(dims))
+
+    def _keys(self, dims):
+        ordered = [dim for dim in self.dimensions if dim in dims]
+        return ordered + [attr for dim in ordered for attr in self.attributes.get(dim, ())]
+
+    def _typed(self, frame, measures):
+        return frame.astype({m: "Int64" if m in self._integers else "float64" for m in measures})
+
+    def _aggregate(self, df, dims):
+        if not dims:
+            return self._typed(df[self.measures].sum(min_count=1).to_frame().T, self.measures)
+        return self._typed(
+            df.groupby(self._keys(dims), dropna=False, observed=True, sort=True)[self.measures]
+              .sum(min_count=1)
+              .reset_index(),
+            self.measures
+        )
+
+    def __len__(self):
+        """Number of pre-aggregated cells across all cuboids."""
+        return sum(len(cuboid) for cuboid in self._cuboids.values())
+
+    def rollup(self, by=(), measures=None, where=None):
+        """``measures`` aggregated by the dimensions ``by``, restricted by ``where``.
+
+        ``where`` maps dimensions to a value or a list of values. Slices on single
+        values are answered from the matching cuboid's cells directly.
+        """
+        by = list(by)
+        measures = list(measures or self.measures)
+        where = {dim: value for dim, value in (where or {}).items() if value not in (None, "")}
+        cuboid = self._cuboids[frozenset(by) | frozenset(where)]
+
+        for dim, value in where.items():
+            if isinstance(value, (list, tuple, set)):
+                cuboid = cuboid[cuboid[dim].isin(value)]
+            else:
+                cuboid = cuboid[cuboid[dim] == value]
+        keys = self._keys(by)
+        if any(isinstance(value, (list, tuple, set)) for value in where.values()):
+            # Several cells per output row remain; combine those few cells
+            if not by:
+                return self._typed(cuboid[measures].sum(min_count=1).to_frame().T, measures)
+            cuboid = cuboid.groupby(keys, dropna=False, observed=True, sort=True)[measures].sum(min_count=1).reset_index()
+        return cuboid[keys + measures].reset_index(drop=True)
+
+    def top(self, by, measure, n=10, where=None):
+        """The ``n`` members of dimension ``by`` with the largest ``measure``."""
+        return (
+            self.rollup([by], [measure], where)
+                .dropna(subset=[measure])
+                .nlargest(n, measure)
+                .reset_index(drop=True)
+        )
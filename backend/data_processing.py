@@ -1,24 +1,103 @@
 import pandas as pd
 import numpy as np
 import json
+import os
+import warnings
+from pathlib import Path
+
+from backend.cube import AggregateCube
+from backend.dimension_index import DimensionIndex
+from backend.funding import DEFAULT_SCENARIO, RATE_TABLES, FundingEngine, compute_statsbidrag, load_rates
+from backend.geometry import load_geometry
+from backend.graduates import GraduateIndex
+from backend.instrumentation import instrumented
+from backend.ingestion import match_measure, read_rounds
+from backend.municipalities import add_region_columns, load_municipality_table
+from backend.registry import DatasetRegistry
+from backend.schema import SCHEMAS, categorical_columns, enforce_schema
+from backend.snapshot_cache import load_snapshot
+from backend.streaming import STREAMING, filter_frame, read_header, read_streamed
+from backend.table_store import TablePager
+from utils.constants import CACHE_DIRECTORY
+
+# All datasets are built lazily on first access and memoized in the registry.
+# Pages call datasets.get("<name>") for exactly the frames they render.
+# Every build is timed under the "loader" kind (see backend.instrumentation).
+datasets = DatasetRegistry(wrap_builder=lambda name, builder: instrumented("loader", name)(builder))
 
 # === Load Main Datasets ===
-df_courses = pd.read_excel("data/course/inkomna-ansokningar-2024-for-kurser.xlsx")
-df_students = pd.read_csv("data/student/antal_behoriga_sokande_kurser_kon_omrade_alder_2020_2024.csv", encoding="latin1")
-df_grants = pd.read_excel("data/payments/ek_1_utbet_statliga_medel_utbomr.xlsx")
-df_graduates = pd.read_csv(
-    "data/student/studerande_examinerade_kon_inriktning_region_form_langd_examen_2020_2024.csv",
-    encoding="latin1",
-    on_bad_lines="skip"
-)
+# Source file and reader options per raw dataset
+SOURCES = {
+    "df_courses": dict(path="data/course/inkomna-ansokningar-2024-for-kurser.xlsx"),
+    "df_students": dict(
+        path="data/student/antal_behoriga_sokande_kurser_kon_omrade_alder_2020_2024.csv",
+        reader="csv",
+        encoding="latin1"
+    ),
+    "df_grants": dict(path="data/payments/ek_1_utbet_statliga_medel_utbomr.xlsx"),
+    "df_graduates": dict(
+        path="data/student/studerande_examinerade_kon_inriktning_region_form_langd_examen_2020_2024.csv",
+        reader="csv",
+        encoding="latin1",
+        sep=";",
+        na_values=[".."],
+        on_bad_lines="skip"
+    ),
+    "df_employment": dict(
+        path="data/graduated/examinerade_kon_omrade_sysselsattning_upp_2020_2024foljning_myh.csv",
+        reader="csv",
+        encoding="latin1",
+        sep=";",
+        na_values=[".."]
+    ),
+    "df_april": dict(
+        path="data/course/beviljade-korta-utb-kurser-kurspaket-YH-april-2020-2024.xlsx",
+        sheet_name="Lista beviljade utbildningar"
+    ),
+    "df_july": dict(
+        path="data/course/beviljade-korta-utb-kurser-kurspaket-YH-juli-2020-2024.xlsx",
+        sheet_name="Lista beviljade utbildningar"
+    ),
+}
+
+def load_source(name):
+    # Sources go through the Parquet snapshot cache, so openpyxl only runs when a file changed;
+    # declared categoricals are read dictionary-encoded and the rest of the schema applied after
+    schema = SCHEMAS.get(name)
+    df = load_snapshot(**SOURCES[name], categories=categorical_columns(schema))
+    return enforce_schema(df, schema, name)
+
+for _name in ("df_courses", "df_students", "df_grants", "df_graduates", "df_employment"):
+    datasets.register(_name, lambda name=_name: load_source(name))
+    # Arrow-backed pager for the raw data page; never builds the full DataFrame
+    datasets.register(f"{_name}_table", lambda name=_name: TablePager.from_source(**SOURCES[name]))
 
 # === Filtered Applications Dataset ===
-filtered_df = df_courses[df_courses["Sökt antal platser 2024"] > 0]
+@datasets.register("filtered_df", depends_on=("df_courses",))
+def build_filtered_df(df_courses):
+    return df_courses[df_courses["Sökt antal platser 2024"] > 0]
+
+# === All Application Rounds ===
+# Program and course rounds 2020-2024 in one long-format, year-partitioned store
+# (see backend.ingestion). The store is built offline; the server only reads it.
+datasets.register("df_rounds", read_rounds)
+
+# Variants counted per measure; the others ("start och avslut", "start och slut") are subsets
+ROUND_VARIANTS = {"Sökta platser": ("",), "Beviljade platser": ("", "start")}
+
+def seats_by_round(df_rounds, measure="Sökta platser", area=None):
+    """Seats per kind (program/kurs) and round for one measure, optionally for one area."""
+    df = df_rounds[(df_rounds["Mått"] == measure) & df_rounds["Variant"].isin(ROUND_VARIANTS[measure])]
+    if area:
+        df = df[df["Utbildningsområde"] == area]
+    return df.groupby(["Typ", "Omgång"], observed=True)["Värde"].sum().reset_index()
 
 # === Data Loader Functions ===
+@instrumented("loader")
 def load_course_data(path):
-    return pd.read_excel(path)
+    return load_snapshot(path)
 
+@instrumented("loader")
 def load_geojson(path):
     with open(path, encoding="utf-8") as f:
         return json.load(f)
@@ -36,51 +115,114 @@ def get_organizer_stats(df, organizer_name):
 
 # === Aggregations and Trends ===
 def applications_by_field(df):
-    return df.groupby("Sökt utbildningsområde")["Sökt antal platser 2024"].sum().reset_index()
+    return df.groupby("Sökt utbildningsområde", observed=True)["Sökt antal platser 2024"].sum().reset_index()
 
 def get_region_summary(df):
     return df[df["Kommun"] != 'Se "Lista flera kommuner"']
 
+def melt_years(df, id_vars, year_columns, value_name):
+    """Long format with one row per id and year, from ``year_columns`` ({column: year}).
+
+    melt stacks the value columns one after another, so the year column is
+    each column's year repeated; categorical ids stay categorical.
+    """
+    df_melted = df.melt(id_vars=id_vars, value_vars=list(year_columns), value_name=value_name)
+    df_melted["År"] = np.repeat(np.fromiter(year_columns.values(), dtype=int, count=len(year_columns)), len(df))
+    return df_melted[list(id_vars) + ["År", value_name]]
+
+def year_columns(columns, measure):
+    """{column: year} for the columns named "<measure> <year>", however many years a file has."""
+    return {column: int(column[-4:]) for column in map(str, columns) if column[:-5] == measure and column[-4:].isdigit()}
+
+# Student rows behind the charts: totals per region and area
+STUDENT_ROWS = [
+    ("kön", "==", "totalt"),
+    ("region (hemlän)", "!=", "Samtliga län"),
+    ("utbildningens studietakt", "==", "Totalt"),
+]
+STUDENT_IDS = ["region (hemlän)", "utbildningsområde MYH"]
+
 def melt_students_over_time(df):
-    df_filtered = df[(df["kön"] == "totalt") & (df["region (hemlän)"] != "Samtliga län") & (df["utbildningens studietakt"] == "Totalt")]
-    df_melted = df_filtered.melt(
-        id_vars=["region (hemlän)", "utbildningsområde MYH"],
-        value_vars=[
-            "Antal behöriga sökande 2020",
-            "Antal behöriga sökande 2021",
-            "Antal behöriga sökande 2022",
-            "Antal behöriga sökande 2023",
-            "Antal behöriga sökande 2024"
-        ],
-        var_name="År",
-        value_name="Antal behöriga"
+    return melt_years(
+        filter_frame(df, STUDENT_ROWS),
+        STUDENT_IDS,
+        year_columns(df.columns, "Antal behöriga sökande"),
+        "Antal behöriga"
     )
-    df_melted["År"] = df_melted["År"].str.extract(r"(\d{4})").astype(int)
+
+# Graduate rows: every exam type per kön, region, area, pace, form and length
+GRADUATE_ROWS = [
+    ("region där utbildningen bedrivs", "!=", "Samtliga län"),
+    ("utbildningens inriktning", "!=", "Totalt"),
+    ("utbildningens examenstyp", "==", "Totalt"),
+]
+GRADUATE_IDS = [
+    "kön",
+    "region där utbildningen bedrivs",
+    "utbildningens inriktning",
+    "utbildningens studietakt",
+    "utbildningens studieform",
+    "utbildningens längd",
+]
+
+def melt_graduates(df):
+    df = filter_frame(df, GRADUATE_ROWS)
+    students = year_columns(df.columns, "Antal studerande")
+    graduates = year_columns(df.columns, "Antal examinerade")
+    df_melted = melt_years(df, GRADUATE_IDS, students, "Antal studerande")
+    # Both families cover the same years in the same order, so the rows line up
+    df_melted["Antal examinerade"] = melt_years(df, GRADUATE_IDS, graduates, "Antal examinerade")["Antal examinerade"].to_numpy()
+    region = "region där utbildningen bedrivs"
+    df_melted[region] = df_melted[region].astype(str).str.strip()
+    return df_melted
+
+# Employment after graduation (percent of the graduates) per kön and area
+EMPLOYMENT_MEASURES = {
+    "totalt antal examinerade": "Examinerade",
+    "arbete, procent": "Arbete",
+    "anställd, procent": "Anställd",
+    "egen företagare, procent": "Egen företagare",
+    "arbetssökande, procent": "Arbetssökande",
+    "studerande, procent": "Studerande",
+    "annat, procent": "Annat",
+}
+
+def melt_employment(df):
+    ids = ["kön", "utbildningsområde MYH"]
+    df = df[df["utbildningsområde MYH"] != "totalt"]
+    df_melted = None
+    for measure, name in EMPLOYMENT_MEASURES.items():
+        melted = melt_years(df, ids, year_columns(df.columns, measure), name)
+        if df_melted is None:
+            df_melted = melted
+        else:
+            df_melted[name] = melted[name].to_numpy()
     return df_melted
 
-def trend_applications_over_time(df):
-    years = [col for col in df.columns if "Sökt antal platser" in col]
-    df_melted = df.melt(
-        id_vars=["Sökt utbildningsområde"],
-        value_vars=years,
-        var_name="År",
-        value_name="Platser"
+def trend_applications_over_time(cube):
+    """Applied seats per year and area, read from the aggregate cube."""
+    # Empty cube cells are NaN, which makes the counts float; without them they are ints again
+    return (
+        cube.rollup(["År", "Utbildningsområde"], ["Platser"])
+            .dropna(subset=["Platser"])
+            .astype({"Platser": "int64"})
+            .rename(columns={"Utbildningsområde": "Sökt utbildningsområde"})
+            .reset_index(drop=True)
     )
-    df_melted["År"] = df_melted["År"].str.extract(r"(\d{4})").astype(int)
-    return df_melted.groupby(["År", "Sökt utbildningsområde"])["Platser"].sum().reset_index()
 
 def get_top_20_schools_by_applications(df):
+    # Ties are broken by name, so the list is deterministic (and matches the DuckDB query)
     return (
-        df.groupby("Anordnare namn")["Sökt antal platser 2024"]
+        df.groupby("Anordnare namn", observed=True)["Sökt antal platser 2024"]
           .sum()
-          .sort_values(ascending=False)
-          .head(20)
           .reset_index()
           .rename(columns={"Anordnare namn": "Skola", "Sökt antal platser 2024": "Antal ansökningar"})
+          .sort_values(["Antal ansökningar", "Skola"], ascending=[False, True], ignore_index=True)
+          .head(20)
     )
 
 def get_filtered_df():
-    return df_courses[df_courses["Sökt antal platser 2024"] > 0]
+    return datasets.get("filtered_df")
 
 def kpi(df):
     total_applications = df["Sökt antal platser 2024"].sum()
@@ -96,167 +238,288 @@ def kpi(df):
         "unique_schools": unique_schools
     }
 
+# === Filter Dimensions ===
+# apply_filters argument -> course column
+COURSE_DIMENSIONS = {
+    "area": "Sökt utbildningsområde",
+    "municipality": "Kommun",
+    "school": "Anordnare namn",
+    "education": "Utbildningsnamn",
+}
+
+# Built once per dataset version: dropdowns read the full course list,
+# filters run on the courses that have applications
+@datasets.register("courses_index", depends_on=("df_courses",))
+def build_courses_index(df_courses):
+    return DimensionIndex(df_courses, COURSE_DIMENSIONS.values())
+
+@datasets.register("filtered_index", depends_on=("filtered_df",))
+def build_filtered_index(filtered_df):
+    return DimensionIndex(filtered_df, COURSE_DIMENSIONS.values())
+
 def get_educational_areas():
-    return df_courses["Sökt utbildningsområde"].dropna().unique().tolist()
+    return datasets.get("courses_index").options(COURSE_DIMENSIONS["area"])
 
 def get_municipalities():
-    return df_courses["Kommun"].dropna().unique().tolist()
+    return datasets.get("courses_index").options(COURSE_DIMENSIONS["municipality"])
 
 def get_schools():
-    return df_courses["Anordnare namn"].dropna().unique().tolist()
+    return datasets.get("courses_index").options(COURSE_DIMENSIONS["school"])
 
 def get_educations():
-    return df_courses["Utbildningsnamn"].dropna().unique().tolist()
-
-def apply_filters(df, area, municipality, school, education):
-    df_filtered = df.copy()
-    if area:
-        df_filtered = df_filtered[df_filtered["Sökt utbildningsområde"] == area]
-    if municipality:
-        df_filtered = df_filtered[df_filtered["Kommun"] == municipality]
-    if school:
-        df_filtered = df_filtered[df_filtered["Anordnare namn"] == school]
-    if education:
-        df_filtered = df_filtered[df_filtered["Utbildning"] == education]
+    return datasets.get("courses_index").options(COURSE_DIMENSIONS["education"])
+
+def get_filter_options(area=None, municipality=None, school=None, education=None):
+    """Dropdown lists narrowed by the other selections (e.g. municipalities offering the selected area)."""
+    index = datasets.get("courses_index")
+    selected = {
+        COURSE_DIMENSIONS["area"]: area,
+        COURSE_DIMENSIONS["municipality"]: municipality,
+        COURSE_DIMENSIONS["school"]: school,
+        COURSE_DIMENSIONS["education"]: education,
+    }
+    return {key: index.cross_options(column, selected) for key, column in COURSE_DIMENSIONS.items()}
+
+def apply_filters(df, area, municipality, school, education, index=None):
+    """Filter ``df`` through ``index``, a DimensionIndex built for ``df``, or with a mask without one.
+
+    Building an index costs more than one masked pass, so one-off callers go without.
+    """
+    selected = {
+        COURSE_DIMENSIONS["area"]: area,
+        COURSE_DIMENSIONS["municipality"]: municipality,
+        COURSE_DIMENSIONS["school"]: school,
+        COURSE_DIMENSIONS["education"]: education,
+    }
+    if index is not None:
+        df_filtered = index.filter(df, selected)
+    else:
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in selected.items():
+            if value:
+                mask &= (df[column] == value).to_numpy()
+        df_filtered = df[mask]
     return df_filtered, kpi(df_filtered)
 
-# Student melt for charts
-df_melted = melt_students_over_time(df_students)
+# === Student Melts ===
+# Long-format student and graduate counts for the charts. Streamed (backend.streaming),
+# they are read straight from the CSV files one block at a time, parsing only the
+# needed columns and rows; otherwise they are melted from the fully loaded sources.
+# Melt dataset -> (source, measures, id columns, row predicates, melt)
+MELTS = {
+    "df_melted": ("df_students", ["Antal behöriga sökande"], STUDENT_IDS, STUDENT_ROWS, melt_students_over_time),
+    "df_graduates_melted": ("df_graduates", ["Antal studerande", "Antal examinerade"], GRADUATE_IDS, GRADUATE_ROWS, melt_graduates),
+}
+
+def stream_melt(name, path=None):
+    """Build the melt ``name`` from its source CSV (or ``path``, a file of the same layout)."""
+    source, measures, ids, where, melt = MELTS[name]
+    path = path or SOURCES[source]["path"]
+    options = {key: SOURCES[source][key] for key in ("encoding", "sep", "na_values") if key in SOURCES[source]}
+    header = read_header(path, options.get("encoding", "utf-8"), options.get("sep", ","))
+    values = [column for measure in measures for column in year_columns(header, measure)]
+    keep = set(ids) | {column for column, _, _ in where}
+    df = read_streamed(
+        path,
+        [column for column in header if column in keep] + values,
+        where,
+        transform=melt,
+        name=name,
+        numeric=values,
+        **options
+    )
+    # Each block is melted on its own; a stable sort by year restores the order of a single melt
+    df = df.sort_values("År", kind="stable", ignore_index=True)
+    return enforce_schema(df, SCHEMAS.get(name), name)
+
+for _name, (_source, *_, _melt) in MELTS.items():
+    if STREAMING:
+        datasets.register(_name, lambda name=_name: stream_melt(name))
+    else:
+        datasets.register(_name, lambda df, name=_name, melt=_melt: enforce_schema(melt(df), SCHEMAS.get(name), name),
+                          depends_on=(_source,))
+
+# Graduates per kön, year, area, region, form and length with precomputed marginals (see backend.graduates)
+@datasets.register("graduate_index", depends_on=("df_graduates_melted",))
+def build_graduate_index(df_graduates_melted):
+    return GraduateIndex(df_graduates_melted)
+
+@datasets.register("df_employment_melted", depends_on=("df_employment",))
+def build_employment(df_employment):
+    return enforce_schema(melt_employment(df_employment), SCHEMAS["df_employment_melted"], "df_employment_melted")
 category_column = "utbildningsområde MYH"
 
 
 # === Region-based Beviljade Data ===
 
 # Load Excel files
-df_april = pd.read_excel("data/course/beviljade-korta-utb-kurser-kurspaket-YH-april-2020-2024.xlsx", sheet_name="Lista beviljade utbildningar")
-df_july = pd.read_excel("data/course/beviljade-korta-utb-kurser-kurspaket-YH-juli-2020-2024.xlsx", sheet_name="Lista beviljade utbildningar")
+datasets.register("df_april", lambda: load_source("df_april"))
+datasets.register("df_july", lambda: load_source("df_july"))
 
 # Helper function
 def process_beviljade(df, year_cols_prefix, kommun_cols):
-    year_cols = [col for col in df.columns if col.startswith(year_cols_prefix)]
-    df_melted = df.melt(
-        id_vars=["Utbildningsområde", "YH-poäng", "Anordnare"] + kommun_cols,
-        value_vars=year_cols,
-        var_name="År",
-        value_name="Beviljade"
-    )
-    df_melted["År"] = df_melted["År"].str.extract(r"(\d{4})").astype(int)
-    df_melted["Kommun"] = df_melted[kommun_cols].bfill(axis=1).iloc[:, 0]
-    df_melted["Kommun"] = df_melted["Kommun"].replace({".": None}).fillna("Okänd")
+    year_cols = {col: int(col[-4:]) for col in df.columns if col.startswith(year_cols_prefix)}
+    # First listed municipality, resolved once per course before the melt repeats it per year
+    kommun = df[kommun_cols].astype(object).bfill(axis=1).iloc[:, 0]
+    df = df.assign(Kommun=kommun.replace({".": None}).fillna("Okänd").astype("category"))
+    df_melted = melt_years(df, ["Utbildningsområde", "YH-poäng", "Anordnare", "Kommun"], year_cols, "Beviljade")
     return df_melted[["Utbildningsområde", "YH-poäng", "Anordnare", "År", "Beviljade", "Kommun"]]
 
 # Process both datasets
 kommun_cols_april = [f"Kommun {i}" for i in range(1, 7)]
 kommun_cols_july = [f"Kommun {i}" for i in range(1, 11)]
 
-df_april_cleaned = process_beviljade(df_april, "Platser med start", kommun_cols_april)
-df_july_cleaned = process_beviljade(df_july, "Platser med start och avslut", kommun_cols_july)
-
-# Combine and calculate statsbidrag
-df_combined = pd.concat([df_april_cleaned, df_july_cleaned], ignore_index=True)
-df_combined["Statsbidrag"] = df_combined["YH-poäng"] * 7000
-
 # Load GeoJSON file with regions
-with open("assets/swedish_regions.geojson", encoding="utf-8") as f:
-    region_geojson = json.load(f)
-
-# Create mapping from region name to region code
-region_to_code = {
-    feature["properties"]["name"]: feature["properties"]["ref:se:länskod"]
-    for feature in region_geojson["features"]
-}
-
-# Add a dummy mapping from kommun to region (this should come from a reliable mapping in your data)
-# If not available, you might need an external CSV to map "Kommun" → "Län"
-kommun_to_region = {
-    "Stockholm": "Stockholms län",
-    "Sundbyberg": "Stockholms län",
-    "Solna": "Stockholms län",
-    "Uppsala": "Uppsala län",
-    "Gävle": "Gävleborgs län",
-    "Västerås": "Västmanlands län",
-    "Örebro": "Örebro län",
-    "Linköping": "Östergötlands län",
-    "Norrköping": "Östergötlands län",
-    "Jönköping": "Jönköpings län",
-    "Växjö": "Kronobergs län",
-    "Kalmar": "Kalmar län",
-    "Karlskrona": "Blekinge län",
-    "Kristianstad": "Skåne län",
-    "Malmö": "Skåne län",
-    "Helsingborg": "Skåne län",
-    "Göteborg": "Västra Götalands län",
-    "Borås": "Västra Götalands län",
-    "Trollhättan": "Västra Götalands län",
-    "Karlstad": "Värmlands län",
-    "Falun": "Dalarnas län",
-    "Östersund": "Jämtlands län",
-    "Umeå": "Västerbottens län",
-    "Luleå": "Norrbottens län",
-    "Visby": "Gotlands län"
-}
-    # Add more known mappings if needed
-
-
-# Map to Län and Länskod
-df_combined["Län"] = df_combined["Kommun"].map(kommun_to_region)
-df_combined["Länskod"] = df_combined["Län"].map(region_to_code)
+datasets.register("region_geojson", lambda: load_geojson("assets/swedish_regions.geojson"))
 
-# Drop rows where mapping failed
-df_combined = df_combined.dropna(subset=["Län", "Länskod"])
+# Simplified, shared geometry for the maps (see backend.geometry)
+datasets.register("region_geometry", lambda: load_geometry("regions", "coarse"))
+datasets.register("municipality_geometry", lambda: load_geometry("municipalities", "coarse"))
 
-# Aggregate
-df_regions = df_combined.groupby(["Län", "Länskod", "År"]).agg({
-    "Beviljade": "sum",
-    "Statsbidrag": "sum"
-}).reset_index()
-geojson_data = region_geojson
-
-# Make sure region_geojson, df_combined, df_regions are defined earlier in the file
+# Create mapping from region name to region code
+@datasets.register("region_to_code", depends_on=("region_geometry",))
+def build_region_to_code(region_geometry):
+    return {
+        feature["properties"]["name"]: feature["properties"]["ref:se:länskod"]
+        for feature in region_geometry["features"]
+    }
 
-region_geojson = region_geojson  # already loaded from the GeoJSON file
-df_combined = df_combined        # combined April + July data
-df_regions = df_regions          # grouped by region
+# Municipality dimension (kommun -> kommunkod -> län) from the municipality GeoJSON
+datasets.register("df_municipalities", load_municipality_table, depends_on=("region_to_code",))
+
+
+# === Funding ===
+# Schablon rates per area (see backend.funding); scenarios are computed by the engine
+for _name, _path in RATE_TABLES.items():
+    datasets.register(f"rates_{_name}", lambda path=_path: load_rates(path))
+
+# Combine and calculate statsbidrag (default scenario; what-ifs go through `funding`)
+@datasets.register("df_combined", depends_on=("df_april", "df_july", "df_municipalities", "rates_schablon"))
+def build_combined(df_april, df_july, df_municipalities, rates_schablon):
+    df_april_cleaned = process_beviljade(df_april, "Platser med start", kommun_cols_april)
+    df_july_cleaned = process_beviljade(df_july, "Platser med start och avslut", kommun_cols_july)
+
+    df_combined = pd.concat([df_april_cleaned, df_july_cleaned], ignore_index=True)
+    # concat falls back to object when the two rounds' categories differ
+    df_combined = df_combined.astype({"Utbildningsområde": "category", "Anordnare": "category", "Kommun": "category"})
+    df_combined["Statsbidrag"] = compute_statsbidrag(df_combined, rates_schablon, DEFAULT_SCENARIO)
+
+    # Map to Län and Länskod through the kommun code
+    df_combined = add_region_columns(df_combined, df_municipalities)
+
+    # Drop rows where mapping failed (unknown or non-municipality place names)
+    return df_combined.dropna(subset=["Län", "Länskod"])
+
+funding = FundingEngine(datasets)
+
+# === Aggregate Cube ===
+# One fact frame for the course applications (Platser) and the beviljade
+# courses (Beviljade, Statsbidrag); all rollups over these dimensions are
+# materialized once per data version.
+CUBE_DIMENSIONS = ["Län", "Kommun", "År", "Utbildningsområde", "Anordnare"]
+CUBE_MEASURES = ["Beviljade", "Statsbidrag", "Platser"]
+
+def application_facts(df_courses, df_municipalities):
+    """Applied seats per course and year from the 'Sökt antal platser <år>' columns."""
+    years = {}
+    for col in df_courses.columns:
+        match = match_measure(col)
+        # The "(start och avslut ...)" variant is a subset of the same year's seats
+        if match is not None and not match[2]:
+            years[col] = match[1]
+    df_melted = melt_years(df_courses, ["Sökt utbildningsområde", "Anordnare namn", "Kommun"], years, "Platser")
+    df_melted = df_melted.rename(columns={"Sökt utbildningsområde": "Utbildningsområde", "Anordnare namn": "Anordnare"})
+    return add_region_columns(df_melted, df_municipalities)
+
+@datasets.register("cube", depends_on=("df_combined", "df_courses", "df_municipalities"))
+def build_cube(df_combined, df_courses, df_municipalities):
+    facts = pd.concat(
+        [df_combined, application_facts(df_courses, df_municipalities)],
+        ignore_index=True
+    )
+    return AggregateCube(
+        facts[CUBE_DIMENSIONS + ["Länskod"] + CUBE_MEASURES],
+        CUBE_DIMENSIONS,
+        CUBE_MEASURES,
+        attributes={"Län": ["Länskod"]}
+    )
 
-# Optional if using in chart.py
-# geojson_data = region_geojson
+# Beviljade and statsbidrag per region and year, read from the cube
+@datasets.register("df_regions", depends_on=("cube",))
+def build_regions(cube):
+    return (
+        cube.rollup(["Län", "År"], ["Beviljade", "Statsbidrag"])
+            .dropna(subset=["Län", "Länskod", "Beviljade"])
+            .astype({"Beviljade": "int64"})
+            .reset_index(drop=True)
+    )
 
 
-# Load the dataset
-def process_applications_data(input_path: str, output_path: str):
-    # Read the file with proper encoding
-    df = pd.read_csv(input_path, encoding='latin1')
+# Legacy module attributes (df_courses, df_regions, region_geojson, ...) resolve lazily
+# through the registry, so importing this module does not load anything.
+_ALIASES = {"geojson_data": "region_geojson"}
 
-    # Extract columns related to course applications
-    id_vars = ['kön', 'utbildningsområde MYH']
-    value_vars = [col for col in df.columns if "Antal ansökningar" in col]
+def __getattr__(name):
+    name = _ALIASES.get(name, name)
+    if name in datasets:
+        return datasets.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    # Melt to long format
-    df_long = pd.melt(df, id_vars=id_vars, value_vars=value_vars,
-                      var_name='År', value_name='Antal ansökningar')
 
-    # Extract numeric year
-    df_long['År'] = df_long['År'].str.extract(r'(\d{4})').astype(int)
+# === Application Trends ===
+# Applications per gender, area and year, derived from the student CSV. The result is a
+# managed Parquet artifact in the cache directory: rebuilt when the source is newer,
+# otherwise read back typed, and shared by every consumer through the registry.
+APPLICATIONS_SOURCE = SOURCES["df_students"]["path"]
+APPLICATIONS_ARTIFACT = CACHE_DIRECTORY / "derived" / "processed_applications.parquet"
 
-    # Rename columns
-    df_long = df_long.rename(columns={
-        'kön': 'Kön',
-        'utbildningsområde MYH': 'Utbildningsområde'
-    })
+def application_trends(df):
+    """Long format of the "Antal ansökningar <år>" columns, without the totals rows."""
+    df_long = melt_years(
+        df,
+        ["kön", "utbildningsområde MYH"],
+        year_columns(df.columns, "Antal ansökningar"),
+        "Antal ansökningar"
+    ).rename(columns={"kön": "Kön", "utbildningsområde MYH": "Utbildningsområde"})
 
     # Filter out totals for better chart control
-    df_filtered = df_long[
-        (df_long['Kön'] != 'totalt') &
-        (df_long['Utbildningsområde'] != 'Totalt')
-    ]
-
-    # Save processed data
-    df_filtered.to_csv(output_path, index=False)
+    df_filtered = df_long[(df_long["Kön"] != "totalt") & (df_long["Utbildningsområde"] != "Totalt")]
+    return enforce_schema(df_filtered.reset_index(drop=True), SCHEMAS["df_applications"])
 
-# Example usage
-if __name__ == "__main__":
-    process_applications_data(
-        input_path="data/student/antal_behoriga_sokande_kurser_kon_omrade_alder_2020_2024.csv",
-        output_path="data/processed_applications.csv"
+@instrumented("loader")
+def process_applications_data(input_path: str, output_path: str):
+    # Only the id and application columns are parsed
+    df = pd.read_csv(
+        input_path,
+        encoding="latin1",
+        usecols=lambda column: column in ("kön", "utbildningsområde MYH") or column.startswith("Antal ansökningar ")
     )
+    df_filtered = application_trends(df)
+
+    # Written aside and swapped in, so a reader never sees half a file
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    if output_path.suffix == ".csv":
+        df_filtered.to_csv(tmp, index=False)
+    else:
+        df_filtered.to_parquet(tmp, index=False)
+    os.replace(tmp, output_path)
+    return df_filtered
+
+def load_applications(source=APPLICATIONS_SOURCE, artifact=APPLICATIONS_ARTIFACT):
+    """The application trends, regenerating the artifact when it is missing or older than the source."""
+    artifact = Path(artifact)
+    if artifact.exists() and artifact.stat().st_mtime_ns >= Path(source).stat().st_mtime_ns:
+        return pd.read_parquet(artifact)
+    try:
+        return process_applications_data(source, artifact)
+    except OSError as exc:
+        # Read-only deployment: derive in memory on every build
+        warnings.warn(f"Could not write {artifact}: {exc}")
+        return application_trends(pd.read_csv(source, encoding="latin1"))
+
+datasets.register("df_applications", load_applications)
 
+if __name__ == "__main__":
+    print(process_applications_data(APPLICATIONS_SOURCE, APPLICATIONS_ARTIFACT).shape, APPLICATIONS_ARTIFACT)
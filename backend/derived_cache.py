@@ -0,0 +1,60 @@
+"""Bounded cache of values derived from registry datasets.
+
+Values are keyed by (function, versions of the datasets it reads, parameters).
+A new data version therefore never hits an old value, and the stale entries
+are dropped as soon as the registry invalidates their datasets. Figures
+(``backend.figure_cache``) and funding scenarios (``backend.funding``) are
+cached this way.
+"""
+import threading
+from collections import OrderedDict
+
+
+class DerivedCache:
+    def __init__(self, registry, maxsize=128):
+        self._registry = registry
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        registry.subscribe(self.invalidate)
+
+    def _key(self, func, depends_on, params):
+        versions = tuple((name, self._registry.version(name)) for name in depends_on)
+        return (func.__module__, func.__qualname__), versions, tuple(sorted(params.items()))
+
+    def get(self, func, depends_on, **params):
+        """Return ``func(*datasets, **params)``, building it only on a cache miss.
+
+        ``depends_on`` names the registry datasets passed positionally to ``func``.
+        """
+        key = self._key(func, depends_on, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = func(*[self._registry.get(name) for name in depends_on], **params)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, names):
+        """Drop every entry built from one of the dataset ``names``."""
+        names = set(names)
+        with self._lock:
+            for key in [key for key in self._entries if names & {name for name, _ in key[1]}]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
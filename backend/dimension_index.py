@@ -0,0 +1,65 @@
+"""Pre-encoded dimension index for filtering a frame on categorical columns.
+
+Each indexed column is factorized once into integer codes, and every distinct
+value keeps the sorted row positions where it occurs. Filters become
+intersections of those position arrays, option lists are dictionary reads, and
+cross-filtered options are read from the codes of the selected rows.
+"""
+import numpy as np
+import pandas as pd
+
+
+class DimensionIndex:
+    def __init__(self, df, columns):
+        self.columns = tuple(columns)
+        self.n_rows = len(df)
+        self.codes = {}
+        self.categories = {}
+        self.positions = {}
+        for col in self.columns:
+            # Codes follow order of first appearance, missing values get -1
+            codes, uniques = pd.factorize(df[col], sort=False)
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            starts = np.searchsorted(sorted_codes, np.arange(len(uniques)), side="left")
+            ends = np.searchsorted(sorted_codes, np.arange(len(uniques)), side="right")
+            self.codes[col] = codes
+            self.categories[col] = list(uniques)
+            self.positions[col] = {
+                value: order[start:end]
+                for value, start, end in zip(self.categories[col], starts, ends)
+            }
+
+    def options(self, column):
+        """Distinct non-missing values of ``column`` in order of first appearance."""
+        return list(self.positions[column])
+
+    def select(self, filters):
+        """Sorted row positions matching every non-empty ``{column: value}`` filter.
+
+        Returns None when no filter is set, meaning all rows.
+        """
+        result = None
+        for column, value in filters.items():
+            if not value:
+                continue
+            rows = self.positions[column].get(value)
+            if rows is None:
+                return np.empty(0, dtype=np.intp)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def filter(self, df, filters):
+        """Rows of ``df`` (the indexed frame) that match ``filters``."""
+        positions = self.select(filters)
+        return df if positions is None else df.iloc[positions]
+
+    def cross_options(self, column, filters):
+        """Values of ``column`` that still occur once the *other* filters are applied."""
+        others = {key: value for key, value in filters.items() if key != column}
+        positions = self.select(others)
+        if positions is None:
+            return self.options(column)
+        present = np.unique(self.codes[column][positions])
+        categories = self.categories[column]
+        return [categories[code] for code in present if code >= 0]
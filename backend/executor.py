@@ -0,0 +1,102 @@
+"""Background execution of dashboard callbacks, latest request wins.
+
+A callback reads its selections from the state, hands independent chart
+builds to a shared thread pool and returns immediately. Requests are grouped
+per (session, channel): a newer request cancels the older one's builds that
+have not started yet, and results of a superseded request are dropped, so
+only the latest selection is ever applied to the state.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from taipy.gui import get_state_id
+
+from backend.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set YH_BACKGROUND_CALLBACKS=0 to build in the callback thread instead
+BACKGROUND_CALLBACKS = os.environ.get("YH_BACKGROUND_CALLBACKS", "1") == "1"
+
+
+class LatestOnlyExecutor:
+    def __init__(self, max_workers=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard")
+        self._requests = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, key, jobs, on_done):
+        """Run the ``jobs`` (name -> callable) in parallel and call ``on_done(results)``.
+
+        ``on_done`` only runs if no newer request for ``key`` was submitted meanwhile.
+        """
+        token = next(self._tokens)
+        if not jobs:
+            on_done({})
+            return token
+        futures = [self._pool.submit(job) for job in jobs.values()]
+        with self._lock:
+            previous = self._requests.get(key)
+            self._requests[key] = (token, futures)
+        if previous is not None:
+            # Outside the lock: cancel() runs the done callbacks synchronously
+            for future in previous[1]:
+                future.cancel()
+
+        remaining = [len(futures)]
+
+        def finished(_):
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+                current = self._requests.get(key)
+                latest = current is not None and current[0] == token
+                if latest:
+                    del self._requests[key]
+            if not latest:
+                self.dropped += 1
+                return
+            try:
+                results = {name: future.result() for name, future in zip(jobs, futures)}
+            except Exception:
+                logger.exception("Background build failed for %s", key)
+                return
+            on_done(results)
+
+        for future in futures:
+            future.add_done_callback(finished)
+        return token
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = LatestOnlyExecutor()
+
+
+def dispatch(state, channel, jobs, apply):
+    """Build ``jobs`` off the callback thread, then run ``apply(state, results)`` for this session.
+
+    ``jobs`` must not touch ``state``; read the selections before dispatching.
+    The time until the results are ready is recorded as a "request" on ``channel``.
+    """
+    start = time.perf_counter()
+    if not BACKGROUND_CALLBACKS:
+        results = {name: job() for name, job in jobs.items()}
+        metrics.record("request", channel, time.perf_counter() - start)
+        apply(state, results)
+        return
+    gui, state_id = state.get_gui(), get_state_id(state)
+
+    def on_done(results):
+        metrics.record("request", channel, time.perf_counter() - start)
+        gui.invoke_callback(state_id, apply, [results], module_context=apply.__module__)
+
+    executor.submit((state_id, channel), jobs, on_done)
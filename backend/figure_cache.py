@@ -0,0 +1,16 @@
+"""Bounded cache of built Plotly figures.
+
+Figures are keyed by (chart function, versions of the datasets it reads,
+parameters). A new data version therefore never hits an old figure, and the
+stale entries are dropped as soon as the registry invalidates their datasets.
+"""
+from backend.data_processing import datasets
+from backend.derived_cache import DerivedCache
+
+
+class FigureCache(DerivedCache):
+    def __init__(self, registry=datasets, maxsize=128):
+        super().__init__(registry, maxsize)
+
+
+figure_cache = FigureCache()
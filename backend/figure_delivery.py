@@ -0,0 +1,166 @@
+"""Figure delivery over HTTP: orjson bytes, compressed once, served with ETags.
+
+A figure is serialized the first time it is delivered (plotly's orjson
+engine). The payload is the JSON, its gzip encoding and, when the optional
+``brotli`` package is installed, its brotli encoding. It is stored on the
+figure and found by the SHA-1 of the JSON for as long as the figure is alive,
+i.e. held by the figure cache or by a session that shows it, so a page that
+was rendered can always fetch its figure. Figures are shared between sessions
+and never mutated once built, so each figure object is serialized only once.
+
+The ``figures`` blueprint serves ``/figures/<etag>.json`` in the encoding the
+client rates highest in Accept-Encoding (q-values honored), and answers a request carrying the current ETag with a
+304. Charts are rendered through a Taipy content provider: a small page that
+loads plotly.js (``/figures/plotly.min.js``) and fetches the figure from the
+endpoint, so the figure JSON never goes through the websocket.
+
+    YH_FIGURE_DELIVERY=http   render the dashboard charts from the endpoint
+"""
+import gzip
+import hashlib
+import os
+import threading
+import weakref
+from typing import NamedTuple, Optional
+
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+from flask import Blueprint, Response, abort, request
+from plotly.offline import get_plotlyjs
+from taipy.gui import Gui
+
+from backend.static_site import best_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+FIGURE_DELIVERY = os.environ.get("YH_FIGURE_DELIVERY", "taipy")
+ROUTE = "/figures"
+
+
+class Payload(NamedTuple):
+    etag: str
+    json: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+
+    def encoded(self, accept):
+        """(body, Content-Encoding) in the best encoding of the parsed Accept-Encoding ``accept``."""
+        encoding = best_encoding(accept, ["br", "gzip"] if self.brotli is not None else ["gzip"])
+        if encoding == "br":
+            return self.brotli, "br"
+        if encoding == "gzip":
+            return self.gzip, "gzip"
+        return self.json, None
+
+
+def make_payload(data):
+    """Payload of JSON bytes, compressed at the highest levels since it is done once."""
+    return Payload(
+        etag=hashlib.sha1(data).hexdigest(),
+        json=data,
+        gzip=gzip.compress(data, compresslevel=9, mtime=0),
+        brotli=brotli.compress(data, quality=11) if brotli is not None else None,
+    )
+
+
+class FigurePayloads:
+    """Serialized figures by ETag, for as long as their figure is referenced."""
+
+    def __init__(self):
+        self._figures = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.serialized = 0
+
+    def payload(self, figure):
+        """The figure's payload, serializing it on first use."""
+        payload = getattr(figure, "_yh_payload", None)
+        if payload is None:
+            payload = make_payload(pio.to_json(figure, validate=False, engine="orjson").encode("utf-8"))
+            figure._yh_payload = payload
+            self.serialized += 1
+        with self._lock:
+            # Equal figures built twice share an ETag; either object serves it
+            self._figures[payload.etag] = figure
+        return payload
+
+    def get(self, etag):
+        with self._lock:
+            figure = self._figures.get(etag)
+        return None if figure is None else figure._yh_payload
+
+    def summary(self):
+        """(figures, JSON bytes, gzip bytes) currently stored."""
+        with self._lock:
+            entries = [figure._yh_payload for figure in self._figures.values()]
+        return len(entries), sum(len(p.json) for p in entries), sum(len(p.gzip) for p in entries)
+
+    def __len__(self):
+        return len(self._figures)
+
+
+payloads = FigurePayloads()
+
+
+# === HTTP endpoint ===
+figures_blueprint = Blueprint("figures", __name__, url_prefix=ROUTE)
+
+_plotlyjs = None
+_plotlyjs_lock = threading.Lock()
+
+
+def _respond(payload, mimetype, cache_control):
+    if payload.etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        body, encoding = payload.encoded(request.accept_encodings)
+        response = Response(body, mimetype=mimetype)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(payload.etag)
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+@figures_blueprint.route("/<etag>.json")
+def figure_json(etag):
+    payload = payloads.get(etag)
+    if payload is None:
+        abort(404)
+    # Revalidated on every use: an unchanged figure costs a 304
+    return _respond(payload, "application/json", "no-cache")
+
+
+@figures_blueprint.route("/plotly.min.js")
+def plotly_js():
+    global _plotlyjs
+    with _plotlyjs_lock:
+        if _plotlyjs is None:
+            _plotlyjs = make_payload(get_plotlyjs().encode("utf-8"))
+    return _respond(_plotlyjs, "text/javascript", "public, max-age=86400")
+
+
+# === Taipy content provider ===
+FIGURE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<script src="{route}/plotly.min.js?v={version}"></script>
+<style>html, body, #figure {{ margin: 0; width: 100%; height: 100%; }}</style>
+</head><body><div id="figure"></div>
+<script>
+fetch("{route}/{etag}.json")
+    .then((response) => response.json())
+    .then((figure) => Plotly.newPlot("figure", figure.data, figure.layout, {{responsive: true}}));
+</script>
+</body></html>"""
+
+
+def figure_page(figure):
+    """HTML page rendering ``figure`` from the endpoint (the content of a ``part``)."""
+    return FIGURE_PAGE.format(route=ROUTE, version=plotly.__version__, etag=payloads.payload(figure).etag)
+
+
+Gui.register_content_provider(go.Figure, figure_page)
@@ -0,0 +1,136 @@
+"""Statsbidrag from the schablon rates per utbildningsområde.
+
+The scraped rate table (kronor per årsplats, with and without
+momskompensation) is parsed once: the double-encoded UTF-8 text is repaired,
+amounts like "69 900" become integers and area names are matched on a
+normalized key, so "Data/It" and "Data/IT" get the same rate.
+
+A course's Statsbidrag is its seats times its årsplatser per seat (YH-poäng /
+200, a full-time year) times its area's rate. The computation is a lookup
+through the area codes and one multiply over the columns' arrays, so a
+scenario never copies the fact frame; FundingEngine caches the result per
+scenario and data version in a ``DerivedCache``, like the figures.
+"""
+import re
+import unicodedata
+import warnings
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.derived_cache import DerivedCache
+from utils.constants import DATA_DIRECTORY
+
+# Rate table name -> scraped CSV; registered in the dataset registry as "rates_<name>"
+RATE_TABLES = {
+    "schablon": DATA_DIRECTORY / "scraped" / "statsbidrag_schablonnivåer_kr.csv",
+}
+RATE_COLUMNS = {False: "Utan momskompensation", True: "Med momskompensation"}
+
+# YH-poäng of one full-time year (one årsplats)
+POINTS_PER_YEAR = 200
+
+
+class Scenario(NamedTuple):
+    """One what-if: which rates, with or without moms, which year, and a uniform rate change."""
+    rates: str = "schablon"
+    moms: bool = False
+    year: Optional[int] = None
+    factor: float = 1.0
+
+
+DEFAULT_SCENARIO = Scenario()
+
+
+# === Rate table ===
+def repair_text(value):
+    """Undo UTF-8 text that was decoded as Latin-1 once ("UtbildningsomrÃ¥de")."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return value.encode("latin1").decode("utf-8")
+    except UnicodeError:
+        return value
+
+
+def parse_amount(value):
+    """Kronor from "69 900", "69 900 kr" or "69\xa0900"."""
+    digits = re.sub(r"[^\d]", "", str(value))
+    return int(digits) if digits else np.nan
+
+
+def area_key(name):
+    """Comparison key for area names: case, Unicode form, dashes and spacing do not matter."""
+    name = unicodedata.normalize("NFC", str(name)).casefold()
+    name = re.sub(r"[‐-―]", "-", name)
+    name = re.sub(r"\s*([/,-])\s*", r"\1 ", name)
+    return re.sub(r"\s+", " ", name).strip()
+
+
+def load_rates(path):
+    """Rates per area: index area_key, columns Utbildningsområde and the two rate columns."""
+    df = pd.read_csv(path, dtype=str, encoding="utf-8")
+    df.columns = [repair_text(column).strip() for column in df.columns]
+    area = df.columns[0]
+    rates = pd.DataFrame({"Utbildningsområde": df[area].map(repair_text).str.strip()})
+    for column in RATE_COLUMNS.values():
+        rates[column] = df[column].map(parse_amount).astype("int64")
+    rates.index = rates["Utbildningsområde"].map(area_key)
+    return rates[~rates.index.duplicated()]
+
+
+def area_rates(areas, rates, scenario=DEFAULT_SCENARIO):
+    """Rate per row of ``areas``; areas missing from the table get NaN (with a warning)."""
+    if isinstance(areas.dtype, pd.CategoricalDtype):
+        codes, uniques = areas.cat.codes.to_numpy(), areas.cat.categories
+    else:
+        codes, uniques = pd.factorize(areas)
+    per_area = rates[RATE_COLUMNS[scenario.moms]].reindex([area_key(area) for area in uniques])
+    present = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 0
+    missing = [area for area, rate, used in zip(uniques, per_area, present) if used and pd.isna(rate)]
+    if missing:
+        warnings.warn(f"No {scenario.rates} rate for {missing}; their Statsbidrag is left empty")
+    # Missing areas (code -1) pick the trailing NaN
+    lookup = np.append(per_area.to_numpy(dtype="float64") * scenario.factor, np.nan)
+    return lookup[codes]
+
+
+def compute_statsbidrag(df, rates, scenario=DEFAULT_SCENARIO, seats="Beviljade",
+                        area="Utbildningsområde", points="YH-poäng"):
+    """Statsbidrag per row of ``df`` (rows outside ``scenario.year`` are left out)."""
+    # Positions of the scenario's rows; only the three columns used are taken at them
+    rows = slice(None)
+    if scenario.year is not None and "År" in df:
+        rows = np.flatnonzero(df["År"].to_numpy() == int(scenario.year))
+    values = (
+        df[seats].to_numpy(dtype="float64")[rows]
+        * df[points].to_numpy(dtype="float64")[rows] / POINTS_PER_YEAR
+        * area_rates(df[area].iloc[rows], rates, scenario)
+    )
+    return pd.Series(values, index=df.index[rows], name="Statsbidrag")
+
+
+# === Scenario engine ===
+class FundingEngine:
+    """Statsbidrag of the beviljade facts per scenario, cached per data version."""
+
+    def __init__(self, registry, facts="df_combined", maxsize=64):
+        self._facts = facts
+        self._cache = DerivedCache(registry, maxsize)
+
+    def _tables(self, scenario):
+        return (self._facts, f"rates_{scenario.rates}")
+
+    def statsbidrag(self, scenario=DEFAULT_SCENARIO):
+        """Series aligned with the fact rows of ``scenario.year`` (all years when None)."""
+        return self._cache.get(compute_statsbidrag, self._tables(scenario), scenario=scenario)
+
+    def totals(self, scenario=DEFAULT_SCENARIO, by=("År",)):
+        """Statsbidrag summed by the fact columns ``by``, without copying the facts."""
+        return self._cache.get(self._totals, self._tables(scenario), scenario=scenario, by=tuple(by))
+
+    def _totals(self, facts, rates, scenario, by):
+        values = self.statsbidrag(scenario)
+        keys = [facts[column].loc[values.index] for column in by]
+        return values.groupby(keys, observed=True, dropna=False).sum(min_count=1).reset_index()
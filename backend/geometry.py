@@ -0,0 +1,223 @@
+"""Shared, simplified GeoJSON geometry for the region and municipality maps.
+
+Each GeoJSON file is loaded once, its coordinates are quantized to a grid, and
+its polygons are simplified with Douglas-Peucker per shared arc: rings are cut
+at junctions (vertices where neighbouring borders meet) and every arc is
+simplified the same way in both polygons that share it, so neighbouring
+regions keep a common border without gaps or overlaps. The simplified
+geometry is cached in memory and on disk as a compressed ``.npz`` file of
+integer coordinates.
+"""
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from backend.snapshot_cache import content_hash
+from utils.constants import CACHE_DIRECTORY
+
+GEOMETRY_DIRECTORY = CACHE_DIRECTORY / "geometry"
+
+GEOJSON_SOURCES = {
+    "regions": Path("assets/swedish_regions.geojson"),
+    "municipalities": Path("assets/swedish_municipalities.geojson"),
+}
+
+# Douglas-Peucker tolerance in degrees; "full" keeps every (quantized) vertex
+TOLERANCES = {
+    "coarse": 0.02,
+    "fine": 0.005,
+    "full": 0.0,
+}
+
+# Coordinates are stored as integers on a 1e-5 degree grid (about 1 m)
+QUANTIZATION = 1e-5
+
+_memory_cache = {}
+_lock = threading.Lock()
+
+
+# === Simplification ===
+def _douglas_peucker(points, tolerance):
+    """Indices of the points kept by Douglas-Peucker on an open polyline."""
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def _simplify_arc(arc, tolerance):
+    # Simplify in a canonical direction so an arc shared by two rings
+    # (walked in opposite directions) gives the same vertices in both
+    if tuple(arc[0]) > tuple(arc[-1]):
+        return _simplify_arc(arc[::-1], tolerance)[::-1]
+    return arc[_douglas_peucker(arc.astype(float), tolerance)]
+
+
+def _junctions(rings):
+    """Vertices whose neighbours differ between the rings that use them."""
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        open_ring = [tuple(point) for point in ring[:-1]]
+        count = len(open_ring)
+        for i, point in enumerate(open_ring):
+            pair = frozenset((open_ring[i - 1], open_ring[(i + 1) % count]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _simplify_ring(ring, junctions, tolerance):
+    open_ring = ring[:-1]
+    cuts = [i for i, point in enumerate(open_ring) if tuple(point) in junctions]
+    if not cuts:
+        # Free-standing ring (island or outer coast): cut at the first and farthest vertex
+        far = int(np.argmax(np.hypot(*(open_ring - open_ring[0]).T)))
+        cuts = [0, far] if far else [0]
+    # Rotate so the ring starts at a cut, then simplify arc by arc
+    rotated = np.concatenate([open_ring[cuts[0]:], open_ring[:cuts[0]], open_ring[cuts[0]:cuts[0] + 1]])
+    bounds = [cut - cuts[0] for cut in cuts] + [len(open_ring)]
+    pieces = [_simplify_arc(rotated[a:b + 1], tolerance)[:-1] for a, b in zip(bounds, bounds[1:])]
+    simplified = np.concatenate(pieces + [rotated[:1]])
+    return simplified if len(simplified) >= 4 else None
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def simplify_geojson(geojson, tolerance):
+    """Return (features, properties) with quantized, simplified integer rings."""
+    quantized = [
+        [[np.round(np.asarray(ring, dtype=float) / QUANTIZATION).astype(np.int64) for ring in polygon]
+         for polygon in _polygons(feature["geometry"])]
+        for feature in geojson["features"]
+    ]
+    junctions = _junctions(ring for feature in quantized for polygon in feature for ring in polygon)
+    grid_tolerance = tolerance / QUANTIZATION
+
+    features = []
+    for feature in quantized:
+        polygons = []
+        for polygon in feature:
+            rings = [_simplify_ring(ring, junctions, grid_tolerance) for ring in polygon]
+            if rings[0] is None:
+                continue  # exterior collapsed: the polygon is smaller than the tolerance
+            polygons.append([ring for ring in rings if ring is not None])
+        if not polygons:
+            # Never drop a whole feature; keep its largest polygon unsimplified
+            polygons = [max(feature, key=lambda polygon: len(polygon[0]))]
+        features.append(polygons)
+    return features, [feature["properties"] for feature in geojson["features"]]
+
+
+# === Compact binary storage ===
+def _pack(features):
+    """Flatten features into int32 coordinates plus ring/polygon/feature offsets."""
+    coords, ring_offsets, polygon_offsets, feature_offsets = [], [0], [0], [0]
+    for polygons in features:
+        for rings in polygons:
+            for ring in rings:
+                coords.append(ring)
+                ring_offsets.append(ring_offsets[-1] + len(ring))
+            polygon_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(polygon_offsets) - 1)
+    return {
+        "coords": np.concatenate(coords).astype(np.int32),
+        "ring_offsets": np.asarray(ring_offsets, dtype=np.int64),
+        "polygon_offsets": np.asarray(polygon_offsets, dtype=np.int64),
+        "feature_offsets": np.asarray(feature_offsets, dtype=np.int64),
+    }
+
+
+def _unpack(arrays, properties, decimals):
+    coords = np.round(arrays["coords"] * QUANTIZATION, decimals)
+    rings = np.split(coords, arrays["ring_offsets"][1:-1])
+    polygons = [rings[a:b] for a, b in zip(arrays["polygon_offsets"][:-1], arrays["polygon_offsets"][1:])]
+    features = []
+    for i, props in enumerate(properties):
+        feature_polygons = polygons[arrays["feature_offsets"][i]:arrays["feature_offsets"][i + 1]]
+        features.append({
+            "type": "Feature",
+            "properties": props,
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [[ring.tolist() for ring in polygon] for polygon in feature_polygons],
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _decimals(tolerance):
+    # Enough decimals to keep the simplification tolerance, never below the grid
+    if tolerance <= 0:
+        return 5
+    return min(5, max(2, int(np.ceil(-np.log10(tolerance))) + 1))
+
+
+def load_geometry(name="regions", detail="coarse"):
+    """Simplified GeoJSON for ``name`` ("regions" or "municipalities") at a detail level.
+
+    ``detail`` is a key of TOLERANCES or a tolerance in degrees. The returned dict is
+    shared between callers and must not be modified.
+    """
+    tolerance = TOLERANCES.get(detail, detail)
+    source = GEOJSON_SOURCES[name]
+    key = (name, float(tolerance))
+    with _lock:
+        if key in _memory_cache:
+            return _memory_cache[key]
+
+        digest = content_hash(source)[:16]
+        cache_path = GEOMETRY_DIRECTORY / f"{name}-{tolerance:g}-{digest}.npz"
+        if cache_path.exists():
+            with np.load(cache_path) as stored:
+                arrays = {k: stored[k] for k in ("coords", "ring_offsets", "polygon_offsets", "feature_offsets")}
+                properties = json.loads(str(stored["properties"]))
+        else:
+            with open(source, encoding="utf-8") as f:
+                features, properties = simplify_geojson(json.load(f), tolerance)
+            arrays = _pack(features)
+            try:
+                GEOMETRY_DIRECTORY.mkdir(parents=True, exist_ok=True)
+                np.savez_compressed(cache_path, properties=np.array(json.dumps(properties)), **arrays)
+            except OSError:
+                pass  # read-only deployment: keep the in-memory copy only
+
+        geometry = _unpack(arrays, properties, _decimals(tolerance))
+        _memory_cache[key] = geometry
+        return geometry
+
+
+def subset_features(geojson, property_name, values):
+    """Only the features whose ``properties[property_name]`` is in ``values``."""
+    values = set(values)
+    return {
+        "type": "FeatureCollection",
+        "features": [f for f in geojson["features"] if f["properties"].get(property_name) in values],
+    }
@@ -0,0 +1,150 @@
+"""Indexed slicing of the graduate counts by kön, year, inriktning, region, studieform and längd.
+
+The long-format graduate rows (``data_processing.melt_graduates``) are summed
+over the dimensions that are not sliced on (studietakt), giving one cell per
+combination of dimensions. The cells are kept sorted by their dimension codes
+(kön first, then År) under a mixed-radix key. A slice that fixes the leading
+dimensions is a binary search for one contiguous range. Only the cells in
+that range are checked against the other filters, and grouping is a bincount
+over their codes, so no query masks the full frame.
+
+The marginals of every dimension per kön and year are computed when the
+index is built, so "per area" or "per region" totals for a kön and year are
+lookups. Measures are float64 (NaN where suppressed) on every path.
+
+kön holds overlapping "totalt" and "kvinnor" rows, so a slice always fixes it
+(to "totalt" unless given) instead of summing over it.
+"""
+import numpy as np
+import pandas as pd
+
+GRADUATE_DIMENSIONS = [
+    "kön",
+    "År",
+    "utbildningens inriktning",
+    "region där utbildningen bedrivs",
+    "utbildningens studieform",
+    "utbildningens längd",
+]
+GRADUATE_MEASURES = ["Antal studerande", "Antal examinerade"]
+DEFAULT_GENDER = "totalt"
+
+
+class GraduateIndex:
+    def __init__(self, df, dimensions=GRADUATE_DIMENSIONS, measures=GRADUATE_MEASURES):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        # One cell per combination; a sorted groupby yields the cells in code order
+        cells = df.groupby(self.dimensions, observed=True, sort=True)[self.measures].sum(min_count=1)
+        self.levels = dict(zip(self.dimensions, cells.index.levels))
+        self.codes = {dim: np.asarray(codes, dtype=np.int64) for dim, codes in zip(self.dimensions, cells.index.codes)}
+        self._lookup = {dim: {value: code for code, value in enumerate(level)} for dim, level in self.levels.items()}
+
+        # Mixed-radix key: the first dimension is the most significant digit
+        sizes = [len(self.levels[dim]) for dim in self.dimensions]
+        self.strides = np.cumprod([1] + sizes[:0:-1])[::-1]
+        self.keys = sum(self.codes[dim] * stride for dim, stride in zip(self.dimensions, self.strides))
+        self.values = {measure: cells[measure].to_numpy(dtype="float64") for measure in self.measures}
+        # Years with at least one value per measure; the newest year has students before examinations
+        self.years = {
+            measure: [int(year) for year in self.levels["År"].take(np.unique(self.codes["År"][~np.isnan(values)]))]
+            for measure, values in self.values.items()
+        }
+
+        # Each dimension's totals per kön and year, ready to return: {dim: {(kön, år): frame}}
+        self.marginals = {}
+        for dim in self.dimensions[2:]:
+            totals = (
+                cells.groupby(["kön", "År", dim], observed=True).sum(min_count=1)
+                     .astype("float64")
+                     .reset_index()
+            )
+            self.marginals[dim] = {
+                (gender, int(year)): part[[dim] + self.measures].reset_index(drop=True)
+                for (gender, year), part in totals.groupby(["kön", "År"], observed=True)
+            }
+
+    def __len__(self):
+        return len(self.keys)
+
+    def options(self, dim):
+        return list(self.levels[dim])
+
+    def latest_year(self, measure, upto=None):
+        """The latest year (not after ``upto``) with a value for ``measure``, or None."""
+        years = [year for year in self.years[measure] if upto is None or year <= int(upto)]
+        return years[-1] if years else None
+
+    def _code(self, dim, value):
+        return self._lookup[dim].get(value)
+
+    def select(self, where):
+        """Positions of the cells matching ``where`` ({dimension: value or list of values})."""
+        where = {dim: value for dim, value in where.items() if value not in (None, "")}
+        # Leading dimensions fixed to one value narrow the key range by binary search
+        low, width, depth = 0, len(self.levels[self.dimensions[0]]) * self.strides[0], 0
+        for dim, stride in zip(self.dimensions, self.strides):
+            value = where.get(dim)
+            if value is None or isinstance(value, (list, tuple, set)):
+                break
+            code = self._code(dim, value)
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            low, width, depth = low + code * stride, stride, depth + 1
+        start, stop = np.searchsorted(self.keys, [low, low + width])
+        positions = np.arange(start, stop)
+
+        for dim in self.dimensions[depth:]:
+            if dim not in where:
+                continue
+            values = where[dim] if isinstance(where[dim], (list, tuple, set)) else [where[dim]]
+            codes = [code for code in (self._code(dim, value) for value in values) if code is not None]
+            positions = positions[np.isin(self.codes[dim][positions], codes)]
+        return positions
+
+    def slice(self, by=(), where=None, measures=None):
+        """``measures`` summed by the dimensions ``by`` over the cells matching ``where``.
+
+        Cells without a value for a measure (suppressed counts) are left out of
+        its sums; a group without any value gets NaN. Totals of one dimension for
+        a kön and year are the precomputed marginal frames, shared between callers.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        measures = list(measures or self.measures)
+        where = {"kön": DEFAULT_GENDER, **(where or {})}
+        fixed = {dim: value for dim, value in where.items() if value not in (None, "")}
+        if len(by) == 1 and by[0] in self.marginals and set(fixed) <= {"kön", "År"} and "År" in fixed:
+            return self._marginal(by[0], fixed["kön"], fixed["År"], measures)
+
+        positions = self.select(where)
+        if not by:
+            return pd.DataFrame([{measure: self._sum(self.values[measure][positions]) for measure in measures}])
+
+        group = np.zeros(len(positions), dtype=np.int64)
+        for dim in by:
+            group = group * len(self.levels[dim]) + self.codes[dim][positions]
+        groups, inverse = np.unique(group, return_inverse=True)
+        size = len(groups)
+        members = {}
+        for dim in reversed(by):
+            groups, codes = np.divmod(groups, len(self.levels[dim]))
+            members[dim] = self.levels[dim].take(codes)
+        result = {dim: members[dim] for dim in by}
+        for measure in measures:
+            values = self.values[measure][positions]
+            present = ~np.isnan(values)
+            totals = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=size)
+            counts = np.bincount(inverse, weights=present, minlength=size)
+            result[measure] = np.where(counts > 0, totals, np.nan)
+        return pd.DataFrame(result)
+
+    def _marginal(self, dim, gender, year, measures):
+        frame = self.marginals[dim].get((gender, int(year)))
+        if frame is None:
+            return pd.DataFrame({dim: [], **{measure: np.empty(0) for measure in measures}})
+        return frame[[dim] + measures]
+
+    @staticmethod
+    def _sum(values):
+        present = values[~np.isnan(values)]
+        return present.sum() if len(present) else np.nan
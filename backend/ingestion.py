@@ -0,0 +1,281 @@
+"""Ingestion of every application round into one long-format store.
+
+The program workbooks (``data/program``) and the course workbooks
+(``data/course``) each use a different sheet layout, header row and set of
+year-suffixed columns. Every workbook is read in a worker process: the data
+sheet and its header row are detected, column names are mapped onto one
+schema, and the seat columns (``Sökt antal platser 2024``, ``Antal beviljade
+platser start 2025``, ``Sökta platser totalt``, ...) are melted into
+``Mått``/``Variant``/``År``/``Värde`` rows. The result is written as one
+Parquet dataset partitioned by ``År`` and rebuilt only when a workbook changes.
+
+Ingestion is an offline step; the dashboard server neither watches the round
+workbooks nor builds the store, it only reads it (``read_rounds``). Rebuild it
+and restart the server to pick up new workbooks:
+
+    python -m backend.ingestion
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from backend.snapshot_cache import content_hash
+from utils.constants import CACHE_DIRECTORY
+
+ROUNDS_DIRECTORY = CACHE_DIRECTORY / "rounds"
+
+# Bump when the long-format schema changes so an old store is rebuilt
+ROUNDS_FORMAT_VERSION = 1
+
+# Workbook globs -> kind of round
+ROUND_SOURCES = {
+    "program": "data/program/resultat-ansokningsomgang-*.xlsx",
+    "kurs": "data/course/inkomna-ansokningar-*.xlsx",
+    "kurs-resultat": "data/course/resultat-*.xlsx",
+}
+
+# Column names seen across the workbooks -> long-format column
+COLUMN_ALIASES = {
+    "Diarienummer": "Diarienummer",
+    "Beslut": "Beslut",
+    "Anordnare namn": "Anordnare namn",
+    "Utbildningsanordnare administrativ enhet": "Anordnare namn",
+    "Utbildningsnamn": "Utbildningsnamn",
+    "Utbildningsområde": "Utbildningsområde",
+    "Sökt utbildningsområde": "Utbildningsområde",
+    "Kommun": "Kommun",
+    "Län": "Län",
+    "YH-poäng": "YH-poäng",
+}
+
+ID_COLUMNS = [
+    "Typ", "Källa", "Omgång", "Diarienummer", "Beslut", "Anordnare namn",
+    "Utbildningsnamn", "Utbildningsområde", "Kommun", "Län", "YH-poäng",
+]
+ROUND_COLUMNS = ID_COLUMNS + ["Mått", "Variant", "År", "Värde"]
+
+# Seat columns -> (measure, year group, variant group); a None year means the round year
+MEASURE_PATTERNS = [
+    (re.compile(r"^Sökt antal platser (\d{4})(?: \((.+?)(?: \d{4})?\))?$"), "Sökta platser", 1, 2),
+    (re.compile(r"^Antal beviljade platser (?:(start(?: och slut)?) )?(\d{4})$"), "Beviljade platser", 2, 1),
+    (re.compile(r"^Sökta platser totalt$"), "Sökta platser", None, None),
+    (re.compile(r"^Beviljade platser totalt$"), "Beviljade platser", None, None),
+]
+
+# Rows scanned per sheet when looking for the header row
+HEADER_SCAN_ROWS = 30
+
+
+# === Layout detection ===
+def normalize_column(name):
+    """Collapse repeated whitespace ("Sökt antal  platser 2021") and strip."""
+    return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def match_measure(column):
+    """``(measure, year, variant)`` for a seat column, or None."""
+    for pattern, measure, year_group, variant_group in MEASURE_PATTERNS:
+        match = pattern.match(column)
+        if match:
+            year = int(match.group(year_group)) if year_group else None
+            variant = match.group(variant_group) if variant_group else None
+            return measure, year, variant or ""
+    return None
+
+
+def _header_score(row):
+    cells = [normalize_column(value) for value in row if isinstance(value, str)]
+    known = sum(cell in COLUMN_ALIASES for cell in cells)
+    measures = sum(match_measure(cell) is not None for cell in cells)
+    return known, measures
+
+
+def detect_layout(path):
+    """Return ``(sheet, header_row)`` of the sheet with seat columns and the most known headers."""
+    previews = pd.read_excel(path, sheet_name=None, header=None, nrows=HEADER_SCAN_ROWS)
+    best, best_score = None, (0, 0)
+    for sheet, preview in previews.items():
+        for row_number, row in enumerate(preview.itertuples(index=False)):
+            known, measures = _header_score(row)
+            if measures and known >= 3 and (known, measures) > best_score:
+                best, best_score = (sheet, row_number), (known, measures)
+    if best is None:
+        raise ValueError(f"No application-round table found in {path}")
+    return best
+
+
+def round_year(path):
+    match = re.search(r"(20\d{2})", Path(path).stem)
+    return int(match.group(1)) if match else None
+
+
+# === Per-workbook ingestion (runs in worker processes) ===
+def ingest_workbook(path, kind):
+    """Read one workbook and return its rows in the long-format schema."""
+    sheet, header_row = detect_layout(path)
+    df = pd.read_excel(path, sheet_name=sheet, header=header_row)
+    df.columns = [normalize_column(col) for col in df.columns]
+    df = df.dropna(how="all")
+
+    year = round_year(path)
+    wide = pd.DataFrame(index=df.index)
+    wide["Typ"] = "program" if kind == "program" else "kurs"
+    wide["Källa"] = Path(path).name
+    wide["Omgång"] = year
+    for column in ID_COLUMNS[3:]:
+        sources = [col for col in df.columns if COLUMN_ALIASES.get(col) == column]
+        wide[column] = df[sources[0]] if sources else None
+
+    measures = {}
+    for column in df.columns:
+        match = match_measure(column)
+        if match is not None:
+            measure, measure_year, variant = match
+            measures[column] = (measure, measure_year or year, variant)
+    if not measures:
+        return pd.DataFrame(columns=ROUND_COLUMNS)
+
+    long = pd.concat([wide, df[list(measures)]], axis=1).melt(
+        id_vars=ID_COLUMNS, value_vars=list(measures), var_name="Kolumn", value_name="Värde"
+    )
+    labels = long["Kolumn"].map(measures)
+    long["Mått"] = labels.str[0]
+    long["År"] = labels.str[1].astype("int16")
+    long["Variant"] = labels.str[2]
+    long["Värde"] = pd.to_numeric(long["Värde"], errors="coerce")
+    long = long.dropna(subset=["Värde"])
+    long["Värde"] = long["Värde"].astype("int64")
+    long["YH-poäng"] = pd.to_numeric(long["YH-poäng"], errors="coerce")
+    long["Omgång"] = long["Omgång"].astype("Int16")
+    for column in ("Diarienummer", "Beslut", "Anordnare namn", "Utbildningsnamn", "Utbildningsområde", "Kommun", "Län"):
+        long[column] = long[column].astype("string").str.strip()
+    return long[ROUND_COLUMNS].reset_index(drop=True)
+
+
+# === Partitioned store ===
+def round_files():
+    """``(path, kind)`` for every application-round workbook, in a stable order."""
+    files = []
+    for kind, pattern in ROUND_SOURCES.items():
+        directory, glob = pattern.rsplit("/", 1)
+        files.extend((path, kind) for path in sorted(Path(directory).glob(glob)))
+    return files
+
+
+def _manifest(files):
+    return {
+        "format_version": ROUNDS_FORMAT_VERSION,
+        "sources": {str(path): content_hash(path) for path, _ in files},
+    }
+
+
+def _read_manifest():
+    try:
+        with open(ROUNDS_DIRECTORY / "_manifest.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_rounds(files=None, max_workers=None):
+    """Ingest ``files`` in a process pool and return one long-format DataFrame."""
+    files = round_files() if files is None else files
+    if not files:
+        return pd.DataFrame(columns=ROUND_COLUMNS)
+    paths, kinds = zip(*files)
+    if max_workers == 1 or len(files) == 1:
+        frames = list(map(ingest_workbook, paths, kinds))
+    else:
+        workers = max_workers or min(len(files), os.cpu_count() or 1)
+        # Spawned, not forked: a caller may be a threaded server process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            frames = list(pool.map(ingest_workbook, paths, kinds))
+    return pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+
+
+def write_rounds(df, manifest):
+    """Replace the store with ``df`` partitioned by year (written aside, then swapped in)."""
+    staging = ROUNDS_DIRECTORY.with_name(ROUNDS_DIRECTORY.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        staging,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("År", pa.int16())]), flavor="hive"),
+    )
+    with open(staging / "_manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(ROUNDS_DIRECTORY, ignore_errors=True)
+    os.replace(staging, ROUNDS_DIRECTORY)
+
+
+def refresh_rounds(max_workers=None):
+    """Rebuild the store if any workbook changed; return True when it was rebuilt."""
+    files = round_files()
+    manifest = _manifest(files)
+    if _read_manifest() == manifest:
+        return False
+    write_rounds(build_rounds(files, max_workers), manifest)
+    return True
+
+
+def read_rounds(years=None, **filters):
+    """Long-format rows from the store as it is, without checking the workbooks.
+
+    ``years`` only reads those year partitions; other keyword arguments filter
+    columns by equality (``Mått="Beviljade platser"``). Without a store the
+    result is empty.
+    """
+    if _read_manifest() is None:
+        warnings.warn(f"No application-round store in {ROUNDS_DIRECTORY}; run python -m backend.ingestion")
+        return pd.DataFrame(columns=ROUND_COLUMNS)
+    dataset = ds.dataset(
+        ROUNDS_DIRECTORY,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("År", pa.int16())]), flavor="hive"),
+    )
+    expression = None
+    if years is not None:
+        expression = ds.field("År").isin([int(year) for year in years])
+    for column, value in filters.items():
+        condition = ds.field(column) == value
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(filter=expression).to_pandas()[ROUND_COLUMNS]
+
+
+def load_rounds(years=None, **filters):
+    """``read_rounds``, refreshing the store first if a workbook changed."""
+    try:
+        refresh_rounds()
+    except OSError as exc:
+        # Read-only deployment: ingest in memory and filter with pandas
+        warnings.warn(f"Could not write the application-round store: {exc}")
+        df = build_rounds()
+        if years is not None:
+            df = df[df["År"].isin([int(year) for year in years])]
+        for column, value in filters.items():
+            df = df[df[column] == value]
+        return df.reset_index(drop=True)
+    return read_rounds(years, **filters)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="ingestion processes (default: one per workbook)")
+    args = parser.parse_args(argv)
+    rebuilt = refresh_rounds(args.workers)
+    df = read_rounds()
+    print(f"{'Rebuilt' if rebuilt else 'Up to date'}: {len(df):,} rows in {ROUNDS_DIRECTORY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Timing, row counts and memory of loaders, chart builders and callbacks.
+
+Functions are wrapped with ``instrumented(kind)``. Each call records its wall
+time, the rows it received (DataFrame arguments) and returned (frame rows or
+figure points) and, when memory tracking is on, its peak allocation above
+what was allocated when it started. Recording is off by default; the wrapper
+is then a single flag check.
+
+    YH_INSTRUMENT=1          enable recording
+    YH_INSTRUMENT_MEMORY=1   also track allocations (tracemalloc; slows every call)
+    YH_METRICS_FILE=<path>   Prometheus text file written by start_export()
+    YH_METRICS_WORKER=<id>   worker label on every series (set per worker by backend.workers)
+
+The same numbers back the diagnostics page and the Prometheus export.
+tracemalloc has one peak for the whole process, so a peak also counts what
+other threads allocated meanwhile; nested instrumented calls pass their peak
+on to the caller.
+"""
+import atexit
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from utils.constants import CACHE_DIRECTORY
+
+METRICS_FILE = Path(os.environ.get("YH_METRICS_FILE", CACHE_DIRECTORY / "metrics.prom"))
+METRICS_WORKER = os.environ.get("YH_METRICS_WORKER")
+EXPORT_INTERVAL_SECONDS = 15
+
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def row_count(value):
+    """Rows in a frame, points in a figure, or None for anything else."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    data = getattr(value, "data", None)
+    if isinstance(data, tuple) and hasattr(value, "layout"):
+        points = 0
+        for trace in data:
+            for attribute in ("x", "values", "locations", "y"):
+                values = getattr(trace, attribute, None)
+                if values is not None:
+                    points += len(values)
+                    break
+        return points
+    if isinstance(value, tuple):
+        counts = [count for count in map(row_count, value) if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+class Timing:
+    """Running totals for one instrumented function."""
+
+    __slots__ = ("count", "errors", "total", "max", "last", "buckets", "rows_in", "rows_out", "memory")
+
+    def __init__(self):
+        self.count = self.errors = 0
+        self.total = self.max = self.last = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.rows_in = self.rows_out = self.memory = None
+
+    def add(self, seconds, rows_in=None, rows_out=None, memory=None, failed=False):
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        if rows_in is not None:
+            self.rows_in = rows_in
+        if rows_out is not None:
+            self.rows_out = rows_out
+        if memory is not None:
+            self.memory = memory
+
+
+class Metrics:
+    def __init__(self, enabled=True, memory=False):
+        self._timings = {}
+        self._lock = threading.Lock()
+        self.enabled = enabled
+        self.memory = False
+        self.track_memory(memory)
+
+    def track_memory(self, on=True):
+        if on and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.memory = on
+
+    def record(self, kind, name, seconds, rows_in=None, rows_out=None, memory=None, failed=False):
+        with self._lock:
+            timing = self._timings.get((kind, name))
+            if timing is None:
+                timing = self._timings[(kind, name)] = Timing()
+            timing.add(seconds, rows_in, rows_out, memory, failed)
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+
+    def table(self):
+        """One row per instrumented function, slowest total first."""
+        with self._lock:
+            rows = [
+                {
+                    "Typ": kind,
+                    "Funktion": name,
+                    "Anrop": timing.count,
+                    "Fel": timing.errors,
+                    "Medel (ms)": round(timing.total / timing.count * 1000, 2),
+                    "Max (ms)": round(timing.max * 1000, 2),
+                    "Senast (ms)": round(timing.last * 1000, 2),
+                    "Totalt (s)": round(timing.total, 3),
+                    "Rader in": timing.rows_in,
+                    "Rader ut": timing.rows_out,
+                    "Minnestopp (KiB)": None if timing.memory is None else round(timing.memory / 1024, 1),
+                }
+                for (kind, name), timing in self._timings.items()
+            ]
+        columns = ["Typ", "Funktion", "Anrop", "Fel", "Medel (ms)", "Max (ms)", "Senast (ms)",
+                   "Totalt (s)", "Rader in", "Rader ut", "Minnestopp (KiB)"]
+        return pd.DataFrame(rows, columns=columns).sort_values("Totalt (s)", ascending=False, ignore_index=True)
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP yh_call_duration_seconds Wall time of instrumented calls.",
+            "# TYPE yh_call_duration_seconds histogram",
+        ]
+        gauges = {
+            "yh_call_rows_in": ("Rows passed to the last call.", "rows_in"),
+            "yh_call_rows_out": ("Rows or figure points returned by the last call.", "rows_out"),
+            "yh_call_memory_peak_bytes": ("Peak bytes allocated during the last call.", "memory"),
+        }
+        with self._lock:
+            timings = sorted(self._timings.items())
+            for (kind, name), timing in timings:
+                labels = _labels(kind, name)
+                for bound, count in zip(DURATION_BUCKETS, timing.buckets):
+                    lines.append(f'yh_call_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'yh_call_duration_seconds_bucket{{{labels},le="+Inf"}} {timing.count}')
+                lines.append(f"yh_call_duration_seconds_sum{{{labels}}} {timing.total:.6f}")
+                lines.append(f"yh_call_duration_seconds_count{{{labels}}} {timing.count}")
+            lines += ["# HELP yh_call_errors_total Instrumented calls that raised.", "# TYPE yh_call_errors_total counter"]
+            for (kind, name), timing in timings:
+                lines.append(f"yh_call_errors_total{{{_labels(kind, name)}}} {timing.errors}")
+            for metric, (help_text, attribute) in gauges.items():
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+                for (kind, name), timing in timings:
+                    value = getattr(timing, attribute)
+                    if value is not None:
+                        lines.append(f"{metric}{{{_labels(kind, name)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_FILE):
+        """Write the export atomically, so a scraper never reads half a file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(kind, name):
+    labels = f'kind="{kind}",name="{_escape(name)}"'
+    if METRICS_WORKER is not None:
+        labels += f',worker="{_escape(METRICS_WORKER)}"'
+    return labels
+
+
+metrics = Metrics(
+    enabled=os.environ.get("YH_INSTRUMENT", "0") == "1",
+    memory=os.environ.get("YH_INSTRUMENT_MEMORY", "0") == "1",
+)
+
+# Per thread, the highest traced memory seen by each instrumented call in progress
+_peaks = threading.local()
+
+
+def _start_peak():
+    """Traced memory now; the process peak restarts from here."""
+    stack = _peaks.__dict__.setdefault("stack", [])
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        # Resetting the peak below would lose the caller's peak so far
+        stack[-1] = max(stack[-1], peak)
+    tracemalloc.reset_peak()
+    stack.append(current)
+    return current
+
+
+def _end_peak(before):
+    """Peak bytes above ``before`` since the matching ``_start_peak``."""
+    stack = _peaks.stack
+    peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+    if stack:
+        stack[-1] = max(stack[-1], peak)
+    return peak - before
+
+
+def instrumented(kind, name=None):
+    """Decorator recording each call of the function under (``kind``, ``name`` or its name)."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            memory_before = _start_peak() if metrics.memory else None
+            start = time.perf_counter()
+            result, failed = None, True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                seconds = time.perf_counter() - start
+                rows_in = [count for count in map(row_count, args) if count is not None]
+                metrics.record(
+                    kind,
+                    label,
+                    seconds,
+                    rows_in=sum(rows_in) if rows_in else None,
+                    rows_out=None if failed else row_count(result),
+                    memory=None if memory_before is None else _end_peak(memory_before),
+                    failed=failed,
+                )
+        return wrapper
+    return decorator
+
+
+def instrumented_callback(func):
+    """``instrumented("callback")`` for Taipy callbacks taking only the state.
+
+    Taipy passes a callback as many arguments as its code declares, so the
+    wrapper must declare ``state`` itself rather than ``*args``.
+    """
+    timed = instrumented("callback")(func)
+
+    @functools.wraps(func)
+    def callback(state):
+        return timed(state)
+    return callback
+
+
+def start_export(path=METRICS_FILE, interval=EXPORT_INTERVAL_SECONDS):
+    """Rewrite the Prometheus file every ``interval`` seconds and at exit."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            metrics.write_prometheus(path)
+
+    threading.Thread(target=loop, name="metrics-export", daemon=True).start()
+    atexit.register(metrics.write_prometheus, path)
@@ -0,0 +1,59 @@
+"""Municipality dimension table: kommun name -> kommunkod -> län.
+
+Built from the municipality GeoJSON. The first two digits of a kommunkod are
+the länskod, so every municipality maps to its region without a hand-written
+dictionary. The table is persisted as Parquet next to the other snapshots and
+rebuilt only when the GeoJSON changes.
+"""
+import json
+
+import pandas as pd
+
+from backend.geometry import GEOJSON_SOURCES
+from backend.snapshot_cache import content_hash
+from utils.constants import CACHE_DIRECTORY
+
+MUNICIPALITY_COLUMNS = ["Kommun", "Kommunkod", "Länskod", "Län"]
+
+
+def build_municipality_table(municipality_geojson, region_to_code):
+    """One row per municipality with its code, länskod and län name."""
+    code_to_region = {code: name for name, code in region_to_code.items()}
+    df = pd.DataFrame(
+        [feature["properties"] for feature in municipality_geojson["features"]],
+        columns=["kom_namn", "id"],
+    ).rename(columns={"kom_namn": "Kommun", "id": "Kommunkod"})
+    df["Kommun"] = df["Kommun"].str.strip()
+    df["Länskod"] = df["Kommunkod"].str[:2]
+    df["Län"] = df["Länskod"].map(code_to_region)
+    return df[MUNICIPALITY_COLUMNS].sort_values("Kommunkod", ignore_index=True)
+
+
+def load_municipality_table(region_to_code):
+    source = GEOJSON_SOURCES["municipalities"]
+    digest = content_hash(source)[:8] + content_hash(GEOJSON_SOURCES["regions"])[:8]
+    cache_path = CACHE_DIRECTORY / f"municipalities-{digest}.parquet"
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+
+    with open(source, encoding="utf-8") as f:
+        df = build_municipality_table(json.load(f), region_to_code)
+    try:
+        CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(cache_path, index=False)
+    except OSError:
+        pass
+    return df
+
+
+def add_region_columns(df, municipalities, kommun_column="Kommun"):
+    """Vectorized join of Kommunkod, Länskod and Län onto ``df`` by municipality name."""
+    names = df[kommun_column].astype("string").str.strip()
+    lookup = municipalities.set_index("Kommun")
+    positions = lookup.index.get_indexer(names)
+    found = positions >= 0
+    result = df.copy()
+    for column in ("Kommunkod", "Länskod", "Län"):
+        values = lookup[column].to_numpy()[positions]
+        result[column] = pd.Series(values, index=df.index).where(found)
+    return result
@@ -0,0 +1,74 @@
+"""Name resolution from free-text region names to GeoJSON codes.
+
+Names are normalized (whitespace, case, unicode form, trailing " län") and
+looked up exactly first. Only names without an exact match go through difflib,
+once per distinct name; the result is memoized. Series are resolved once per
+distinct value and mapped back with integer codes.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from difflib import get_close_matches
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_name(name):
+    name = unicodedata.normalize("NFC", str(name)).casefold()
+    name = re.sub(r"\s+", " ", name).strip()
+    return re.sub(r" län$", "", name)
+
+
+class NameIndex:
+    def __init__(self, names_to_codes, cutoff=0.6):
+        self._exact = {normalize_name(name): code for name, code in names_to_codes.items()}
+        self._keys = list(self._exact)
+        self._cutoff = cutoff
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, name):
+        """Code for ``name``, or None when nothing is close enough."""
+        if name is None or (isinstance(name, float) and np.isnan(name)):
+            return None
+        key = normalize_name(name)
+        if key in self._exact:
+            return self._exact[key]
+        with self._lock:
+            if key not in self._resolved:
+                match = get_close_matches(key, self._keys, n=1, cutoff=self._cutoff)
+                self._resolved[key] = self._exact[match[0]] if match else None
+            return self._resolved[key]
+
+    def resolve_series(self, names):
+        """Codes for a Series of names, resolving each distinct name only once."""
+        codes, uniques = pd.factorize(names)
+        resolved = np.array([self.resolve(name) for name in uniques] + [None], dtype=object)
+        # factorize marks missing values with -1, which picks the trailing None
+        return pd.Series(resolved[codes], index=names.index, name="Länskod")
+
+
+# The most recently used GeoJSONs only: a data refresh replaces the geometry dicts,
+# and the indexes of the old ones must not keep them alive
+_geojson_indexes = OrderedDict()
+_geojson_lock = threading.Lock()
+GEOJSON_INDEXES_MAXSIZE = 4
+
+
+def geojson_name_index(geojson, name_property="name", code_property="ref:se:länskod"):
+    """Memoized NameIndex over a GeoJSON's features (the shared geometry dicts keep a stable id)."""
+    key = (id(geojson), name_property, code_property)
+    with _geojson_lock:
+        cached = _geojson_indexes.get(key)
+        if cached is None or cached[0] is not geojson:
+            index = NameIndex({
+                feature["properties"][name_property]: feature["properties"][code_property]
+                for feature in geojson["features"]
+            })
+            cached = _geojson_indexes[key] = (geojson, index)
+        _geojson_indexes.move_to_end(key)
+        while len(_geojson_indexes) > GEOJSON_INDEXES_MAXSIZE:
+            _geojson_indexes.popitem(last=False)
+        return cached[1]
@@ -0,0 +1,184 @@
+"""Optional DuckDB query backend for the dashboard filters and aggregations.
+
+The course, student, beviljade and region frames from the dataset registry are
+copied into an in-process DuckDB database and the dashboard aggregations are
+served as parameterized SQL. Enable it with ``YH_QUERY_BACKEND=duckdb``; the
+pandas functions in ``backend.data_processing`` stay the reference
+implementation and return the same frames.
+"""
+import os
+import threading
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional, the pandas path is always available
+    duckdb = None
+
+from backend.data_processing import COURSE_DIMENSIONS, datasets
+
+# DuckDB table name -> registry dataset
+TABLES = {
+    "courses": "df_courses",
+    "students": "df_melted",
+    "beviljade": "df_combined",
+    "regions": "df_regions",
+}
+
+SEATS = '"Sökt antal platser 2024"'
+APPROVED = '"Sökt antal platser 2024 (start och avslut 2024)"'
+PLATSER = '"Platser"'
+BEHORIGA = '"Antal behöriga"'
+BEVILJADE = '"Beviljade"'
+
+
+def _isum(column):
+    # SUM over integers is HUGEINT in DuckDB, which pandas would receive as float64
+    return f"CAST(SUM({column}) AS BIGINT)"
+
+
+def _where(filters, base_conditions=()):
+    """Build a WHERE clause and its parameters from the non-empty filters."""
+    conditions = list(base_conditions)
+    params = []
+    for key, value in filters.items():
+        if value:
+            conditions.append(f'"{COURSE_DIMENSIONS[key]}" = ?')
+            params.append(value)
+    clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return clause, params
+
+
+class DuckDBQueryEngine:
+    def __init__(self, registry=datasets, database=":memory:"):
+        if duckdb is None:
+            raise ImportError("duckdb is not installed")
+        self._registry = registry
+        self._con = duckdb.connect(database)
+        self._loaded_versions = {}
+        self._lock = threading.Lock()
+
+    def _table(self, table):
+        """Make sure ``table`` holds the current version of its dataset."""
+        dataset = TABLES[table]
+        version = self._registry.version(dataset)
+        if self._loaded_versions.get(table) != version:
+            with self._lock:
+                if self._loaded_versions.get(table) != version:
+                    frame = self._registry.get(dataset)
+                    # Through its own cursor, like the queries: the shared connection is not thread-safe
+                    cursor = self._con.cursor()
+                    cursor.register("_source_frame", frame)
+                    cursor.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM _source_frame")
+                    cursor.unregister("_source_frame")
+                    cursor.close()
+                    self._loaded_versions[table] = version
+        return table
+
+    def _query(self, sql, params=()):
+        # One cursor per query so callbacks on different threads do not share a connection
+        return self._con.cursor().execute(sql, list(params))
+
+    # === Course applications ===
+    def _applications(self, filters):
+        """FROM/WHERE over the same rows as filtered_df + apply_filters."""
+        where, params = _where(filters, [f"{SEATS} > 0"])
+        return f"FROM {self._table('courses')} {where}", params
+
+    def kpi(self, **filters):
+        source, params = self._applications(filters)
+        total, approved, schools = self._query(
+            f'SELECT COALESCE({_isum(SEATS)}, 0), COALESCE({_isum(APPROVED)}, 0), '
+            f'COUNT(DISTINCT "Anordnare namn") {source}',
+            params,
+        ).fetchone()
+        return {
+            "total_applications": total,
+            "approved_applications": approved,
+            "approval_rate": (approved / total * 100) if total > 0 else 0,
+            "total_approved_places": approved,
+            "unique_schools": schools,
+        }
+
+    def applications_by_field(self, **filters):
+        source, params = self._applications(filters)
+        return self._query(
+            f'SELECT "Sökt utbildningsområde", {_isum(SEATS)} AS {SEATS} {source} '
+            f'GROUP BY 1 ORDER BY 1',
+            params,
+        ).df()
+
+    def approved_by_field(self, **filters):
+        """Same frame as prepare_pie_data_filtered, without the title."""
+        source, params = self._applications(filters)
+        return self._query(
+            f'SELECT "Sökt utbildningsområde", {_isum(APPROVED)} AS {APPROVED} {source} '
+            f'GROUP BY 1 HAVING SUM({APPROVED}) > 0 ORDER BY 1',
+            params,
+        ).df()
+
+    def trend_applications_over_time(self, **filters):
+        where, params = _where(filters)
+        return self._query(
+            f'''
+            WITH filtered AS (SELECT * FROM {self._table('courses')} {where})
+            SELECT CAST(regexp_extract(column_name, '(\\d{{4}})', 1) AS BIGINT) AS "År",
+                   CAST("Sökt utbildningsområde" AS VARCHAR) AS "Sökt utbildningsområde",
+                   {_isum(PLATSER)} AS {PLATSER}
+            FROM (
+                UNPIVOT filtered
+                ON COLUMNS('^Sökt antal platser \\d{{4}}$')
+                INTO NAME column_name VALUE {PLATSER}
+            )
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+            ''',
+            params,
+        ).df()
+
+    def get_top_20_schools_by_applications(self, **filters):
+        source, params = self._applications(filters)
+        return self._query(
+            f'SELECT "Anordnare namn" AS "Skola", {_isum(SEATS)} AS "Antal ansökningar" {source} '
+            f'GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT 20',
+            params,
+        ).df()
+
+    # === Student and region rollups ===
+    def students_by_area(self, year):
+        """Qualified applicants per area for one year, as in create_bub_animated_chart."""
+        return self._query(
+            f'SELECT "utbildningsområde MYH", {_isum(BEHORIGA)} AS {BEHORIGA} '
+            f'FROM {self._table("students")} WHERE "År" = ? GROUP BY 1 ORDER BY 2',
+            [int(year)],
+        ).df()
+
+    def regions(self, year=None):
+        """Rows of df_regions, optionally restricted to one year."""
+        where = 'WHERE "År" = ?' if year is not None else ""
+        params = [int(year)] if year is not None else []
+        return self._query(
+            f'SELECT * FROM {self._table("regions")} {where} ORDER BY "Län", "År"',
+            params,
+        ).df()
+
+    def totals_by_year(self):
+        """Beviljade and Statsbidrag summed per year over the beviljade rows."""
+        return self._query(
+            f'SELECT "År", {_isum(BEVILJADE)} AS {BEVILJADE}, SUM("Statsbidrag") AS "Statsbidrag" '
+            f'FROM {self._table("beviljade")} GROUP BY 1 ORDER BY 1'
+        ).df()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_query_engine():
+    """The shared DuckDB engine when ``YH_QUERY_BACKEND=duckdb``, otherwise None (use pandas)."""
+    global _engine
+    if os.environ.get("YH_QUERY_BACKEND", "pandas").lower() != "duckdb" or duckdb is None:
+        return None
+    with _engine_lock:
+        if _engine is None:
+            _engine = DuckDBQueryEngine()
+    return _engine
@@ -0,0 +1,140 @@
+"""Lazy, memoized dataset registry.
+
+Datasets are registered with a builder and the names of the datasets they are
+derived from. Nothing is loaded until a dataset is first requested; the result
+is then memoized until the dataset (or one of its dependencies) is invalidated.
+"""
+import threading
+
+
+class DatasetRegistry:
+    def __init__(self, wrap_builder=None):
+        """``wrap_builder(name, builder)`` may wrap every builder at registration (e.g. timing)."""
+        self._wrap_builder = wrap_builder
+        self._builders = {}
+        self._depends_on = {}
+        self._values = {}
+        self._versions = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+
+    def register(self, name, builder=None, depends_on=()):
+        """Register ``builder`` under ``name``; usable as a decorator when ``builder`` is omitted.
+
+        The builder is called with the materialized dependencies as positional arguments.
+        """
+        if builder is None:
+            def decorator(func):
+                self.register(name, func, depends_on)
+                return func
+            return decorator
+
+        unknown = [dep for dep in depends_on if dep not in self._builders]
+        if unknown:
+            raise KeyError(f"Dataset '{name}' depends on unregistered datasets: {unknown}")
+        with self._lock:
+            self._builders[name] = self._wrap_builder(name, builder) if self._wrap_builder else builder
+            self._depends_on[name] = tuple(depends_on)
+            self._versions.setdefault(name, 0)
+            self._values.pop(name, None)
+        return builder
+
+    def __contains__(self, name):
+        return name in self._builders
+
+    def names(self):
+        return list(self._builders)
+
+    def depends_on(self, name):
+        return self._depends_on[name]
+
+    def dependents(self, name):
+        """All datasets derived from ``name``, directly or transitively, in build order."""
+        result = []
+        for candidate in self._builders:
+            if candidate != name and name in self._ancestors(candidate):
+                result.append(candidate)
+        return result
+
+    def _ancestors(self, name):
+        seen = set()
+        stack = list(self._depends_on[name])
+        while stack:
+            dep = stack.pop()
+            if dep not in seen:
+                seen.add(dep)
+                stack.extend(self._depends_on[dep])
+        return seen
+
+    def is_loaded(self, name):
+        return name in self._values
+
+    def version(self, name):
+        """Counter bumped every time ``name`` is invalidated or replaced."""
+        return self._versions[name]
+
+    def get(self, name):
+        """Return the dataset, building it (and its dependencies) on first use."""
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name not in self._builders:
+            raise KeyError(f"Unknown dataset '{name}'")
+        with self._lock:
+            if name not in self._values:
+                args = [self.get(dep) for dep in self._depends_on[name]]
+                self._values[name] = self._builders[name](*args)
+            return self._values[name]
+
+    def subscribe(self, callback):
+        """Call ``callback(names)`` with the dataset names after every invalidation or refresh."""
+        self._listeners.append(callback)
+
+    def _notify(self, names):
+        for callback in self._listeners:
+            callback(names)
+
+    def refresh(self, *names):
+        """Rebuild ``names`` and their dependents aside, then swap them in at once.
+
+        Readers keep getting the previous values while the new ones are built.
+        Only loaded datasets (and what they need) are rebuilt; the others are
+        just invalidated. Returns the refreshed names in build order.
+        """
+        affected = list(dict.fromkeys(
+            dataset for name in names for dataset in [name] + self.dependents(name)
+        ))
+        affected.sort(key=list(self._builders).index)
+        staged = {}
+
+        def stage(dataset):
+            if dataset not in staged:
+                args = [stage(dep) if dep in affected else self.get(dep) for dep in self._depends_on[dataset]]
+                staged[dataset] = self._builders[dataset](*args)
+            return staged[dataset]
+
+        with self._refresh_lock:
+            for dataset in affected:
+                if self.is_loaded(dataset):
+                    stage(dataset)
+            with self._lock:
+                for dataset in affected:
+                    if dataset in staged:
+                        self._values[dataset] = staged[dataset]
+                    else:
+                        self._values.pop(dataset, None)
+                    self._versions[dataset] += 1
+        self._notify(affected)
+        return affected
+
+    def invalidate(self, name):
+        """Drop ``name`` and everything derived from it; returns the invalidated names."""
+        invalidated = [name] + self.dependents(name)
+        with self._lock:
+            for dataset in invalidated:
+                self._values.pop(dataset, None)
+                self._versions[dataset] += 1
+        self._notify(invalidated)
+        return invalidated
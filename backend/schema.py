@@ -0,0 +1,195 @@
+"""Declared dtypes per dataset, enforced when a source is loaded.
+
+Low-cardinality labels (kön, regions, areas, municipalities, organizers) are
+categoricals and counts use the smallest integer type that holds them, so the
+frames and the melts built from them stay a fraction of the default
+object/int64 size. Column keys may be glob patterns ("Antal *"). A declared
+integer column that turns out to contain missing values becomes the nullable
+type of the same width; one whose values do not fit is widened with a warning
+rather than failing the load. Cells that are not numbers (and not declared
+missing markers like "..") load as missing with a warning, and are counted
+in the report. Categories are limited to the labels present in the rows.
+
+Every enforcement is recorded in ``SCHEMA_REPORT`` with the memory before and
+after (``memory_report()`` returns it as a table).
+"""
+import fnmatch
+import sys
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+SCHEMAS = {
+    "df_courses": {
+        "Anordnare namn": "category",
+        "Sökt utbildningsområde": "category",
+        "Kommun": "category",
+        "Län": "category",
+        "FA-region": "category",
+        "Sökt antal platser *": "int16",
+        # Multiplied with seat counts, so it keeps the headroom
+        "YH-poäng": "int32",
+        "Antal kommuner": "int8",
+        "Antal län": "int8",
+        "Antal FA-regioner": "int8",
+    },
+    "df_students": {
+        "kön": "category",
+        "utbildningsområde MYH": "category",
+        "region (hemlän)": "category",
+        "utbildningens studietakt": "category",
+        "Antal *": "int32",
+    },
+    "df_graduates": {
+        "kön": "category",
+        "utbildningens *": "category",
+        "region där utbildningen bedrivs": "category",
+        # ".." (suppressed small counts) loads as missing, so these end up nullable
+        "Antal *": "int32",
+    },
+    "df_melted": {
+        "region (hemlän)": "category",
+        "utbildningsområde MYH": "category",
+        "Antal behöriga": "int32",
+    },
+    "df_graduates_melted": {
+        "kön": "category",
+        "region där utbildningen bedrivs": "category",
+        "utbildningens *": "category",
+        "Antal *": "int32",
+    },
+    "df_employment": {
+        "kön": "category",
+        "utbildningsområde MYH": "category",
+        "totalt antal examinerade *": "int32",
+    },
+    "df_employment_melted": {
+        "kön": "category",
+        "utbildningsområde MYH": "category",
+        "Examinerade": "int32",
+    },
+    "df_applications": {
+        "Kön": "category",
+        "Utbildningsområde": "category",
+        "År": "int16",
+        "Antal ansökningar": "int32",
+    },
+    "df_april": {
+        "Utbildningsområde": "category",
+        "Anordnare": "category",
+        "Kommun *": "category",
+        "YH-poäng": "int32",
+        "Platser med start *": "int16",
+    },
+    "df_july": {
+        "Utbildningsområde": "category",
+        "Anordnare": "category",
+        "Kommun *": "category",
+        "YH-poäng": "int32",
+        "Platser med start *": "int16",
+    },
+}
+
+INTEGER_WIDENING = ["int8", "int16", "int32", "int64"]
+
+SCHEMA_REPORT = {}
+_report_lock = threading.Lock()
+
+
+def resolve_schema(schema, columns):
+    """{column: dtype} for the ``columns`` matched by the schema's names or patterns."""
+    resolved = {}
+    for pattern, dtype in schema.items():
+        for column in fnmatch.filter(map(str, columns), pattern):
+            resolved.setdefault(column, dtype)
+    return resolved
+
+
+def categorical_columns(schema):
+    """Names or patterns of the columns declared as categories."""
+    return [column for column, dtype in (schema or {}).items() if dtype == "category"]
+
+
+def default_bytes(series):
+    """Memory of ``series`` with pandas' default dtypes (object strings, 64-bit numbers)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # As object strings: one pointer per row plus each row's string object
+        sizes = np.array([sys.getsizeof(value) for value in series.cat.categories], dtype=np.int64)
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+        return int(len(series) * 8 + (sizes * counts).sum() + (codes < 0).sum() * 16)
+    if series.dtype.kind in "iufb" or pd.api.types.is_extension_array_dtype(series.dtype):
+        return len(series) * 8
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def _integer_dtype(series, dtype, name, column):
+    values = pd.to_numeric(series, errors="coerce")
+    # Malformed cells (not declared missing markers) are loaded as missing, but counted
+    invalid = int((values.isna() & series.notna()).sum())
+    if invalid:
+        warnings.warn(f"{name}: {invalid} non-numeric values in '{column}' loaded as missing")
+    present = values.dropna()
+    width = INTEGER_WIDENING.index(dtype)
+    if len(present):
+        low, high = present.min(), present.max()
+        while width < len(INTEGER_WIDENING) - 1 and not (
+            np.iinfo(INTEGER_WIDENING[width]).min <= low and high <= np.iinfo(INTEGER_WIDENING[width]).max
+        ):
+            width += 1
+        if INTEGER_WIDENING[width] != dtype:
+            warnings.warn(f"{name}: '{column}' does not fit {dtype}; loaded as {INTEGER_WIDENING[width]}")
+    target = INTEGER_WIDENING[width]
+    if values.isna().any():
+        return values.astype(target.capitalize()), invalid
+    return values.astype(target), invalid
+
+
+def enforce_schema(df, schema, name=None):
+    """``df`` with the declared dtypes; records the memory saved under ``name``."""
+    resolved = resolve_schema(schema or {}, df.columns)
+    if not resolved:
+        return df
+    before = sum(default_bytes(df[column]) for column in df.columns)
+    converted = {}
+    invalid = 0
+    for column, dtype in resolved.items():
+        series = df[column]
+        if dtype == "category":
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Dictionary reads keep first-appearance order; sort like astype("category")
+                series = series.cat.reorder_categories(series.cat.categories.sort_values())
+            else:
+                series = series.astype("category")
+            # Labels only seen in filtered-out rows (a "totalt" row) would still show up as categories
+            converted[column] = series.cat.remove_unused_categories()
+        elif dtype in INTEGER_WIDENING:
+            converted[column], column_invalid = _integer_dtype(series, dtype, name, column)
+            invalid += column_invalid
+        else:
+            converted[column] = series.astype(dtype)
+    df = df.assign(**converted)
+    after = int(df.memory_usage(index=False, deep=True).sum())
+    if name is not None:
+        with _report_lock:
+            SCHEMA_REPORT[name] = {"rows": len(df), "before": before, "after": after, "invalid": invalid}
+    return df
+
+
+def memory_report():
+    """Memory per loaded dataset with default dtypes and with the schema."""
+    with _report_lock:
+        rows = [
+            {
+                "Dataset": name,
+                "Rader": entry["rows"],
+                "Före (KiB)": round(entry["before"] / 1024, 1),
+                "Efter (KiB)": round(entry["after"] / 1024, 1),
+                "Sparat (%)": round(100 * (1 - entry["after"] / entry["before"]), 1) if entry["before"] else 0.0,
+                "Ogiltiga värden": entry["invalid"],
+            }
+            for name, entry in SCHEMA_REPORT.items()
+        ]
+    return pd.DataFrame(rows, columns=["Dataset", "Rader", "Före (KiB)", "Efter (KiB)", "Sparat (%)", "Ogiltiga värden"])
@@ -0,0 +1,83 @@
+"""Content-addressed figures and option lists shared by every Taipy session.
+
+Taipy keeps a reference per session to whatever a callback assigns to the
+state; it does not copy it. Values built through SharedStore are interned by
+content: a chart is keyed by its function and a digest of the frame it is
+drawn from, an option list by its items. Sessions that end up with the same
+selection reference one object instead of each callback building its own,
+and an entry is freed once no session references it any more.
+"""
+import hashlib
+import threading
+import weakref
+
+import pandas as pd
+
+
+class SharedList(list):
+    """Read-only list handed to every session.
+
+    Taipy binds shared variables by reference and makes no per-session copies;
+    ``__copy__``/``__deepcopy__`` only guard against one, should a caller make
+    it, so a shared list is never duplicated behind the store's back.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared option lists are read-only")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def content_digest(value):
+    """Stable digest of a DataFrame's values and columns, or of a plain value's repr."""
+    digest = hashlib.sha1()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    else:
+        digest.update(repr(value).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SharedStore:
+    def __init__(self):
+        self._values = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def intern(self, key, build):
+        """Return the live value stored under ``key``, building it with ``build()`` if there is none."""
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            # Another session may have built the same value meanwhile; keep the first
+            return self._values.setdefault(key, value)
+
+    def options(self, values):
+        """Shared, read-only list with the items of ``values``."""
+        items = tuple(values)
+        return self.intern(("options", items), lambda: SharedList(items))
+
+    def figure(self, func, *args):
+        """``func(*args)`` shared by content; DataFrame arguments are keyed by their values."""
+        key = ("figure", func.__module__, func.__qualname__) + tuple(content_digest(arg) for arg in args)
+        return self.intern(key, lambda: func(*args))
+
+    def __len__(self):
+        return len(self._values)
+
+
+shared = SharedStore()
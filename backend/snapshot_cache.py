@@ -0,0 +1,158 @@
+"""Parquet snapshot cache for the raw Excel/CSV sources.
+
+Every source is parsed once and stored as a typed Parquet snapshot under
+``data/.cache/snapshots``. A JSON manifest next to each snapshot records the
+source's mtime, size and SHA-256, so warm starts are a memory-mapped Parquet
+read and the snapshot is only rebuilt when the source content changes.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import warnings
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.constants import CACHE_DIRECTORY
+
+SNAPSHOT_DIRECTORY = CACHE_DIRECTORY / "snapshots"
+
+# Bump when the snapshot layout changes so old snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+READERS = {
+    "excel": pd.read_excel,
+    "csv": pd.read_csv,
+}
+
+
+def content_hash(path):
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_key(path, reader, options):
+    raw = json.dumps(
+        [str(Path(path).resolve()), reader, options, SNAPSHOT_FORMAT_VERSION],
+        sort_keys=True,
+        default=str,
+    )
+    return f"{Path(path).stem}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]}"
+
+
+def snapshot_paths(path, reader="excel", **options):
+    """Return the (parquet, manifest) paths used for a source and read options."""
+    key = _snapshot_key(path, reader, options)
+    return SNAPSHOT_DIRECTORY / f"{key}.parquet", SNAPSHOT_DIRECTORY / f"{key}.json"
+
+
+def _arrow_safe(df):
+    """Parquet needs string column names and single-typed object columns."""
+    if not all(isinstance(col, str) for col in df.columns):
+        df = df.rename(columns=str)
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) in ("mixed", "mixed-integer"):
+            df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+    return df
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(manifest_path, source, stat, digest):
+    manifest = {
+        "source": str(source),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+    }
+    tmp_path = manifest_path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _write_snapshot(df, parquet_path, manifest_path, source, stat, digest):
+    SNAPSHOT_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so concurrent readers never see a partial snapshot
+    tmp_path = parquet_path.with_suffix(f".parquet.{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, parquet_path)
+    _write_manifest(manifest_path, source, stat, digest)
+
+
+def read_snapshot(parquet_path, categories=()):
+    """Memory-mapped read of a Parquet snapshot into a DataFrame.
+
+    Columns matching ``categories`` (names or glob patterns) are read
+    dictionary-encoded and arrive as categoricals, never as object strings.
+    """
+    dictionary = []
+    if categories:
+        names = pq.read_schema(parquet_path).names
+        dictionary = [name for name in names if any(fnmatch.fnmatchcase(name, pattern) for pattern in categories)]
+    return pq.read_table(parquet_path, memory_map=True, read_dictionary=dictionary or None).to_pandas()
+
+
+def _refresh(path, reader, options):
+    """Bring the snapshot of ``path`` up to date.
+
+    Returns ``(parquet_path, frame)``: ``frame`` is the freshly parsed source when the
+    snapshot had to be rebuilt, otherwise None. ``parquet_path`` is None when the
+    rebuilt snapshot could not be written.
+    """
+    path = Path(path)
+    parquet_path, manifest_path = snapshot_paths(path, reader, **options)
+    stat = path.stat()
+    manifest = _read_manifest(manifest_path)
+
+    digest = None
+    if manifest is not None and parquet_path.exists():
+        # Fast path: the source has not been touched since the snapshot was written
+        if manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size:
+            return parquet_path, None
+        # Touched but identical content (e.g. a fresh checkout): keep the snapshot
+        digest = content_hash(path)
+        if manifest["sha256"] == digest:
+            _write_manifest(manifest_path, path, stat, digest)
+            return parquet_path, None
+
+    df = _arrow_safe(READERS[reader](path, **options))
+    try:
+        _write_snapshot(df, parquet_path, manifest_path, path, stat, digest or content_hash(path))
+    except (OSError, pa.ArrowException) as exc:
+        warnings.warn(f"Could not write snapshot for {path}: {exc}")
+        return None, df
+    return parquet_path, df
+
+
+def load_snapshot(path, reader="excel", categories=(), **options):
+    """Load a source through its Parquet snapshot, rebuilding it only when the source changed.
+
+    ``options`` are passed to the pandas reader and are part of the snapshot key,
+    so the same file read with a different sheet or encoding gets its own snapshot.
+    ``categories`` only changes how the snapshot is read (see read_snapshot).
+    """
+    parquet_path, df = _refresh(path, reader, options)
+    return df if df is not None else read_snapshot(parquet_path, categories)
+
+
+def load_snapshot_table(path, reader="excel", **options):
+    """Memory-mapped Arrow table of a source's snapshot, without converting it to pandas."""
+    parquet_path, df = _refresh(path, reader, options)
+    if parquet_path is None:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return pq.read_table(parquet_path, memory_map=True)
@@ -0,0 +1,55 @@
+"""Serve the static dashboard snapshot at /snapshot without loading any data.
+
+The files are written by ``frontend.pages.snapshot``. A ``.gz`` file next to
+a file is sent instead when the client accepts gzip (``gzip;q=0`` refuses it). Every response carries
+an ETag, so unchanged files cost a 304. Figure files are content-addressed
+and cached for a year.
+"""
+import mimetypes
+import os
+from pathlib import Path
+
+from flask import Blueprint, abort, request, send_from_directory
+
+from utils.constants import CACHE_DIRECTORY
+
+SNAPSHOT_DIRECTORY = Path(os.environ.get("YH_SNAPSHOT_DIRECTORY", CACHE_DIRECTORY / "snapshot"))
+ROUTE = "/snapshot"
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+static_blueprint = Blueprint("snapshot", __name__, url_prefix=ROUTE)
+
+
+def best_encoding(accept, encodings):
+    """The first of ``encodings`` with the highest q-value in ``accept``, or None for identity.
+
+    ``accept`` is a parsed Accept-Encoding header (``request.accept_encodings``).
+    An encoding is only chosen if the client does not rate identity higher.
+    """
+    quality, encoding = max(((accept.quality(name), name) for name in encodings), key=lambda q: q[0], default=(0, None))
+    if quality <= 0 or quality < accept.quality("identity"):
+        return None
+    return encoding
+
+
+@static_blueprint.route("/", defaults={"path": "index.html"})
+@static_blueprint.route("/<path:path>")
+def snapshot_file(path):
+    if not (SNAPSHOT_DIRECTORY / path).is_file():
+        abort(404)
+    compressed = (
+        best_encoding(request.accept_encodings, ["gzip"]) == "gzip"
+        and (SNAPSHOT_DIRECTORY / f"{path}.gz").is_file()
+    )
+    response = send_from_directory(
+        SNAPSHOT_DIRECTORY,
+        f"{path}.gz" if compressed else path,
+        mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+        max_age=IMMUTABLE_MAX_AGE if path.startswith("figures/") else 0,
+        conditional=True,
+    )
+    if compressed:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
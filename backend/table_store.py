@@ -0,0 +1,88 @@
+"""Server-side paging over the raw sources' Arrow snapshots.
+
+A TablePager wraps the memory-mapped Arrow table of a snapshot. Searching and
+sorting run in Arrow, row counts come from the table metadata, and only the
+requested window of rows is ever converted to pandas.
+"""
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from backend.snapshot_cache import load_snapshot_table
+
+
+class TablePager:
+    def __init__(self, table, max_cached_orders=16):
+        self.table = table
+        self._orders = OrderedDict()
+        self._max_cached_orders = max_cached_orders
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_source(cls, path, reader="excel", **options):
+        return cls(load_snapshot_table(path, reader, **options))
+
+    @property
+    def columns(self):
+        return self.table.column_names
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    def _search_mask(self, search):
+        """Rows where any text column contains ``search`` (case-insensitive)."""
+        mask = None
+        for field in self.table.schema:
+            column = self.table.column(field.name)
+            if pa.types.is_dictionary(field.type):
+                column = column.cast(pa.string())
+            elif not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+                continue
+            matches = pc.fill_null(pc.match_substring(column, search, ignore_case=True), False)
+            mask = matches if mask is None else pc.or_(mask, matches)
+        return mask
+
+    def _row_order(self, search, sort_by, descending):
+        """Row indices for a search/sort combination, or None for the table's own order."""
+        if not search and not sort_by:
+            return None
+        key = (search, sort_by, descending)
+        with self._lock:
+            if key in self._orders:
+                self._orders.move_to_end(key)
+                return self._orders[key]
+
+        if search:
+            mask = self._search_mask(search)
+            indices = pc.indices_nonzero(mask) if mask is not None else pa.array([], pa.uint64())
+        else:
+            indices = pa.array(range(self.table.num_rows), pa.uint64())
+        if sort_by:
+            order = "descending" if descending else "ascending"
+            subset = self.table.take(indices).select([sort_by])
+            indices = indices.take(pc.sort_indices(subset, sort_keys=[(sort_by, order)]))
+
+        with self._lock:
+            self._orders[key] = indices
+            while len(self._orders) > self._max_cached_orders:
+                self._orders.popitem(last=False)
+        return indices
+
+    def count(self, search=None):
+        """Number of rows matching ``search`` without building any DataFrame."""
+        order = self._row_order(search, None, False)
+        return self.table.num_rows if order is None else len(order)
+
+    def page(self, page=0, page_size=50, sort_by=None, descending=False, search=None):
+        """Return ``(rows, total)`` for one window; ``rows`` is a DataFrame of at most ``page_size`` rows."""
+        order = self._row_order(search or None, sort_by or None, descending)
+        total = self.table.num_rows if order is None else len(order)
+        offset = max(0, min(page, max(0, (total - 1) // page_size))) * page_size
+        if order is None:
+            window = self.table.slice(offset, page_size)
+        else:
+            window = self.table.take(order.slice(offset, page_size))
+        return window.to_pandas(), total
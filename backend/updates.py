@@ -0,0 +1,148 @@
+"""Live data refresh: watch ``data/`` and rebuild only what a changed file feeds.
+
+A watchdog observer reports file changes under DATA_DIRECTORY. Changes are
+debounced (a workbook save fires several events), mapped to the registry
+datasets read from that file, and refreshed through ``DatasetRegistry.refresh``:
+the dataset and its dependents are rebuilt aside and swapped in together, so
+sessions keep rendering the old data until the new data is complete. A new
+beviljade workbook therefore rebuilds df_april/df_july, df_combined and
+df_regions, and leaves df_students and df_melted alone.
+
+Listeners are called with the refreshed names afterwards; ``watch_data`` uses
+one to push page callbacks to every connected Taipy session.
+"""
+import fnmatch
+import logging
+import threading
+from pathlib import Path
+
+from watchdog.events import EVENT_TYPE_OPENED, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from backend.data_processing import APPLICATIONS_SOURCE, MELTS, SOURCES, datasets
+from backend.funding import RATE_TABLES
+from utils.constants import CACHE_DIRECTORY, DATA_DIRECTORY
+
+logger = logging.getLogger(__name__)
+
+# Seconds without new events before a batch of changes is refreshed
+DEBOUNCE_SECONDS = 1.0
+
+
+def watched_sources(registry=datasets):
+    """Resolved source path or glob -> the registry datasets read directly from it."""
+    sources = {}
+    for name, options in SOURCES.items():
+        path = str(Path(options["path"]).resolve())
+        sources[path] = [dataset for dataset in (name, f"{name}_table") if dataset in registry]
+    # Streamed melts read their CSV directly rather than through the source dataset
+    for name, (source, *_) in MELTS.items():
+        if name in registry:
+            sources[str(Path(SOURCES[source]["path"]).resolve())].append(name)
+    if "df_applications" in registry:
+        sources[str(Path(APPLICATIONS_SOURCE).resolve())].append("df_applications")
+    for name, path in RATE_TABLES.items():
+        sources[str(Path(path).resolve())] = [f"rates_{name}"]
+    return sources
+
+
+def datasets_for_path(path, sources=None):
+    """Registry datasets to refresh when ``path`` changes (empty for unrelated files)."""
+    sources = watched_sources() if sources is None else sources
+    path = str(Path(path).resolve())
+    names = []
+    for pattern, dataset_names in sources.items():
+        if fnmatch.fnmatchcase(path, pattern):
+            names.extend(name for name in dataset_names if name not in names)
+    return names
+
+
+def _ignored(path):
+    path = Path(path)
+    # Snapshot/store writes, editor lock files (~$book.xlsx) and hidden temp files
+    return CACHE_DIRECTORY in path.parents or path.name.startswith(("~$", "."))
+
+
+class DataWatcher(FileSystemEventHandler):
+    def __init__(self, registry=datasets, directory=DATA_DIRECTORY, debounce=DEBOUNCE_SECONDS):
+        self._registry = registry
+        self._directory = directory
+        self._debounce = debounce
+        self._sources = watched_sources(registry)
+        self._pending = set()
+        self._timer = None
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._observer = None
+        # Every dataset refreshed since start; sessions opened later catch up from it
+        self.refreshed = set()
+
+    def add_listener(self, callback):
+        """Call ``callback(names)`` after every refresh."""
+        self._listeners.append(callback)
+
+    # === watchdog events ===
+    def on_any_event(self, event):
+        # Reading a workbook during a refresh fires "opened" events of its own
+        if event.is_directory or event.event_type == EVENT_TYPE_OPENED:
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        paths = [path for path in paths if path and not _ignored(path)]
+        if not paths:
+            return
+        with self._lock:
+            self._pending.update(paths)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self._debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        with self._lock:
+            paths, self._pending, self._timer = self._pending, set(), None
+        try:
+            self.refresh_paths(paths)
+        except Exception:
+            # Keep serving the previous data; the next change retries
+            logger.exception("Data refresh failed for %s", sorted(paths))
+
+    # === Refresh ===
+    def refresh_paths(self, paths):
+        """Refresh the datasets fed by ``paths``; returns the refreshed names."""
+        names = []
+        for path in paths:
+            names.extend(name for name in datasets_for_path(path, self._sources) if name not in names)
+        if not names:
+            return []
+        refreshed = self._registry.refresh(*names)
+        logger.info("Refreshed %s", ", ".join(refreshed))
+        self.refreshed.update(refreshed)
+        for callback in self._listeners:
+            callback(refreshed)
+        return refreshed
+
+    def start(self):
+        self._observer = Observer()
+        self._observer.schedule(self, str(self._directory), recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        return self
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+
+def watch_data(gui, callbacks, registry=datasets):
+    """Start a DataWatcher that runs each page callback ``callback(state, names)`` in every session."""
+    watcher = DataWatcher(registry)
+
+    def push(names):
+        for callback in callbacks:
+            gui.broadcast_callback(callback, [names], module_context=callback.__module__)
+
+    watcher.add_listener(push)
+    return watcher.start()
@@ -0,0 +1,227 @@
+"""Multi-worker production mode: one port, N Taipy workers, data built once.
+
+``supervise`` runs the build step in a subprocess: it loads the registry frames
+and writes each one as an uncompressed Arrow IPC file under
+``data/.cache/shared``. It then starts the workers, each a ``main.py`` process
+without the reloader on a private port, and proxies the public port to them.
+A worker registers every shared frame as a memory-mapped read of its file
+(``attach_shared_data``), so numeric and category-code columns point into the
+page cache that all workers share instead of being parsed and held per
+process. The other datasets (indexes, cube, geometry) are built per worker
+from those frames and the on-disk caches the build step warmed.
+
+Taipy keeps each session's state in the worker that created it, so the proxy
+is sticky: a client IP always reaches the same worker.
+
+    YH_WORKERS=4   number of workers; 1 (the default) runs the development server
+    YH_HOST=...    public interface (default 0.0.0.0)
+    YH_PORT=...    public port (default 5000)
+
+Data files are read when the workers start; restart to pick up new data.
+
+Each worker writes its own Prometheus file next to YH_METRICS_FILE
+(``metrics-worker0.prom``, ``metrics-worker1.prom``, ...), with a
+``worker`` label on every series. Scrape all of them, e.g. with
+node_exporter's textfile collector pointed at the directory (it merges
+every ``*.prom`` file there), and sum over ``worker`` for totals.
+
+    python -m backend.workers --export data/.cache/shared   # the build step alone
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import pyarrow as pa
+
+from backend.instrumentation import METRICS_FILE
+from utils.constants import CACHE_DIRECTORY
+
+WORKERS = int(os.environ.get("YH_WORKERS", "1"))
+HOST = os.environ.get("YH_HOST", "0.0.0.0")
+PORT = int(os.environ.get("YH_PORT", "5000"))
+
+# Set by the supervisor for its workers
+WORKER_PORT_ENV = "YH_WORKER_PORT"
+SHARED_DATA_ENV = "YH_SHARED_DATA"
+
+SHARED_DIRECTORY = CACHE_DIRECTORY / "shared"
+MANIFEST = "manifest.json"
+
+# Frames shared between the workers; everything else is derived from them per worker
+SHARED_DATASETS = [
+    "df_courses",
+    "df_students",
+    "df_graduates",
+    "df_employment",
+    "df_april",
+    "df_july",
+    "df_municipalities",
+    "df_combined",
+    "df_regions",
+    "df_melted",
+    "df_graduates_melted",
+    "df_applications",
+]
+# Built by the export too, only to fill their on-disk caches for the workers
+WARMED_DATASETS = ["region_geometry", "municipality_geometry"]
+
+# Seconds to wait for a worker to accept connections
+WORKER_START_TIMEOUT = 300
+PROXY_BUFFER = 1 << 16
+
+
+def is_worker():
+    return WORKER_PORT_ENV in os.environ
+
+
+def worker_port():
+    return int(os.environ[WORKER_PORT_ENV])
+
+
+# === Shared data ===
+def export_datasets(directory=SHARED_DIRECTORY, names=SHARED_DATASETS):
+    """Build the ``names`` frames and write each as an Arrow IPC file; returns the manifest."""
+    from backend.data_processing import datasets
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    exported = {}
+    for name in names:
+        table = pa.Table.from_pandas(datasets.get(name))
+        path = directory / f"{name}.arrow"
+        tmp = path.with_name(path.name + ".tmp")
+        # Uncompressed, so the workers can map the buffers instead of decoding them
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        exported[name] = {"rows": table.num_rows, "bytes": path.stat().st_size}
+    for name in WARMED_DATASETS:
+        datasets.get(name)
+    (directory / MANIFEST).write_text(json.dumps(exported, indent=2), encoding="utf-8")
+    return exported
+
+
+def read_shared(path):
+    """DataFrame over a memory-mapped Arrow file; columns without nulls are not copied."""
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def attach_shared_data(directory=None):
+    """Point the registry's shared frames at the exported files (in a worker, before any page loads)."""
+    from backend.data_processing import datasets
+
+    directory = Path(directory or os.environ[SHARED_DATA_ENV])
+    manifest = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+    for name in manifest:
+        datasets.register(name, lambda path=directory / f"{name}.arrow": read_shared(path))
+    return list(manifest)
+
+
+# === Supervisor ===
+def _wait_for_port(port, process, timeout=WORKER_START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Worker on port {port} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"Worker on port {port} did not start within {timeout} s")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def worker_metrics_file(number, path=METRICS_FILE):
+    """Prometheus file of worker ``number``: metrics.prom -> metrics-worker<number>.prom."""
+    return path.with_name(f"{path.stem}-worker{number}{path.suffix}")
+
+
+def start_workers(script, count, directory):
+    """``count`` worker processes of ``script``; returns {port: process} once all accept connections."""
+    workers = {}
+    for number in range(count):
+        port = _free_port()
+        env = dict(os.environ, **{
+            WORKER_PORT_ENV: str(port),
+            SHARED_DATA_ENV: str(directory),
+            "YH_WATCH_DATA": "0",
+            # One metrics file per worker; they would overwrite each other's
+            "YH_METRICS_FILE": str(worker_metrics_file(number)),
+            "YH_METRICS_WORKER": str(number),
+        })
+        workers[port] = subprocess.Popen([sys.executable, str(script)], env=env)
+    for port, process in workers.items():
+        _wait_for_port(port, process)
+    return workers
+
+
+async def _pipe(reader, writer):
+    try:
+        while data := await reader.read(PROXY_BUFFER):
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _proxy_connection(client_reader, client_writer, ports):
+    client = client_writer.get_extra_info("peername")[0]
+    port = ports[zlib.crc32(client.encode()) % len(ports)]
+    try:
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        client_writer.close()
+        return
+    await asyncio.gather(_pipe(client_reader, upstream_writer), _pipe(upstream_reader, client_writer))
+
+
+async def proxy(ports, host=HOST, port=PORT):
+    """Forward every TCP connection on (``host``, ``port``) to the worker of the client's IP."""
+    ports = sorted(ports)
+    server = await asyncio.start_server(lambda r, w: _proxy_connection(r, w, ports), host, port)
+    print(f"Serving {len(ports)} workers on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def supervise(script, count=WORKERS, host=HOST, port=PORT, directory=SHARED_DIRECTORY):
+    """Build the shared data once, start ``count`` workers and proxy (``host``, ``port``) to them."""
+    subprocess.run([sys.executable, "-m", "backend.workers", "--export", str(directory)], check=True)
+    workers = start_workers(script, count, directory)
+    try:
+        asyncio.run(proxy(list(workers), host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in workers.values():
+            process.terminate()
+        for process in workers.values():
+            process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--export", type=Path, default=SHARED_DIRECTORY, help="directory for the Arrow files")
+    args = parser.parse_args(argv)
+    for name, entry in export_datasets(args.export).items():
+        print(f"{name:20s} {entry['rows']:>9,d} rows {entry['bytes'] / 1024:>10,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Benchmark cases for the data layer and the chart builders.
+
+Each case registers a ``setup(inputs)`` that returns the zero-argument
+callable that is timed. ``Inputs`` holds the source frames at one scale, with
+everything derived from them built once up front so only the measured call
+runs inside the timer. ``Inputs`` is a context manager; files it writes for
+a case live in a temporary directory that is removed when it is closed.
+"""
+import importlib
+import tempfile
+from functools import cached_property
+from pathlib import Path
+
+import pandas as pd
+
+from backend import data_processing as dp
+from backend.geometry import load_geometry
+from backend.graduates import GraduateIndex
+
+
+def load_chart_module():
+    # The pages package is imported as frontend.pages; the directory is frontend/Pages
+    try:
+        return importlib.import_module("frontend.pages.chart")
+    except ModuleNotFoundError:
+        return importlib.import_module("frontend.Pages.chart")
+
+
+# === Scaled inputs ===
+# Columns that get a per-copy suffix when a frame is scaled, so the number of
+# organizers, educations and municipalities grows with the data
+SCALED_NAME_COLUMNS = ["Anordnare namn", "Anordnare", "Utbildningsnamn"]
+
+
+def scale_frame(df, factor):
+    """``factor`` copies of ``df`` with the name columns made distinct per copy."""
+    if factor == 1:
+        return df
+    copies = []
+    for i in range(factor):
+        copy = df.copy()
+        if i:
+            for column in SCALED_NAME_COLUMNS:
+                if column in copy.columns:
+                    copy[column] = copy[column].astype("string") + f" #{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+class Inputs:
+    """Source frames at ``scale`` and the frames derived from them."""
+
+    def __init__(self, scale=1, sources=None):
+        self.scale = scale
+        # Pre-built frames (e.g. benchmarks.synthetic.generate) replace the scaled copies
+        self._sources = sources or {}
+        self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Remove the files written for the cases."""
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+    def source(self, name):
+        if name not in self._sources:
+            self._sources[name] = scale_frame(dp.datasets.get(name), self.scale)
+        return self._sources[name]
+
+    @cached_property
+    def courses(self):
+        return self.source("df_courses")
+
+    @cached_property
+    def filtered(self):
+        return dp.build_filtered_df(self.courses)
+
+    @cached_property
+    def students(self):
+        return self.source("df_students")
+
+    @cached_property
+    def melted(self):
+        return dp.melt_students_over_time(self.students)
+
+    @cached_property
+    def graduates_melted(self):
+        return dp.melt_graduates(self.source("df_graduates"))
+
+    @cached_property
+    def graduate_index(self):
+        return GraduateIndex(self.graduates_melted)
+
+    @cached_property
+    def employment(self):
+        return dp.build_employment(self.source("df_employment"))
+
+    @cached_property
+    def combined(self):
+        return dp.build_combined(
+            self.source("df_april"), self.source("df_july"),
+            dp.datasets.get("df_municipalities"), dp.datasets.get("rates_schablon")
+        )
+
+    @cached_property
+    def cube(self):
+        return dp.build_cube(self.combined, self.courses, dp.datasets.get("df_municipalities"))
+
+    @cached_property
+    def regions(self):
+        return dp.build_regions(self.cube)
+
+    @cached_property
+    def geometry(self):
+        return load_geometry("regions", "coarse")
+
+    @cached_property
+    def applications_csv(self):
+        """The raw student CSV at this scale, for process_applications_data and the streamed melt."""
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(prefix="yh-bench-")
+        path = Path(self._directory.name) / "students.csv"
+        self.students.to_csv(path, index=False, encoding="latin1")
+        return path
+
+
+# === Cases ===
+# Case name -> setup(inputs) returning the callable that is timed
+CASES = {}
+YEAR = 2024
+
+
+def case(name):
+    def decorator(setup):
+        CASES[name] = setup
+        return setup
+    return decorator
+
+
+@case("apply_filters")
+def _apply_filters(i):
+    return lambda: dp.apply_filters(i.filtered, "Data/IT", "", "", "")
+
+
+@case("apply_filters_indexed")
+def _apply_filters_indexed(i):
+    index = dp.DimensionIndex(i.filtered, dp.COURSE_DIMENSIONS.values())
+    return lambda: dp.apply_filters(i.filtered, "Data/IT", "", "", "", index=index)
+
+
+@case("kpi")
+def _kpi(i):
+    return lambda: dp.kpi(i.filtered)
+
+
+@case("melt_students_over_time")
+def _melt_students(i):
+    return lambda: dp.melt_students_over_time(i.students)
+
+
+@case("stream_students_over_time")
+def _stream_students(i):
+    source = i.applications_csv
+    return lambda: dp.stream_melt("df_melted", source)
+
+
+@case("graduate_index")
+def _graduate_index(i):
+    return lambda: GraduateIndex(i.graduates_melted)
+
+
+# A slice answered from the precomputed marginals, and one filtered within a key range
+@case("graduate_slice_marginal")
+def _graduate_slice_marginal(i):
+    return lambda: i.graduate_index.slice("utbildningens inriktning", {"År": YEAR})
+
+
+@case("graduate_slice_filtered")
+def _graduate_slice_filtered(i):
+    where = {"År": YEAR, "kön": "kvinnor", "utbildningens studieform": "Distans"}
+    return lambda: i.graduate_index.slice("region där utbildningen bedrivs", where)
+
+
+@case("process_beviljade")
+def _process_beviljade(i):
+    return lambda: dp.process_beviljade(i.source("df_april"), "Platser med start", dp.kommun_cols_april)
+
+
+@case("process_applications_data")
+def _process_applications(i):
+    source = i.applications_csv
+    return lambda: dp.process_applications_data(str(source), str(source.with_name("processed.csv")))
+
+
+@case("build_cube")
+def _build_cube(i):
+    municipalities = dp.datasets.get("df_municipalities")
+    return lambda: dp.build_cube(i.combined, i.courses, municipalities)
+
+
+@case("funding_scenario")
+def _funding_scenario(i):
+    rates = dp.datasets.get("rates_schablon")
+    scenario = dp.DEFAULT_SCENARIO._replace(moms=True, factor=1.05)
+    return lambda: dp.compute_statsbidrag(i.combined, rates, scenario)
+
+
+@case("cube_rollup")
+def _cube_rollup(i):
+    return lambda: i.cube.rollup(["Län", "År"], where={"År": YEAR})
+
+
+# Every figure builder in frontend/Pages/chart.py, fed the frames the pages pass it
+CHART_ARGUMENTS = {
+    "application_by_field_chart": lambda i: (dp.applications_by_field(i.filtered),),
+    "students_over_time_map": lambda i: (
+        i.melted[i.melted["År"] == YEAR].groupby("region (hemlän)", as_index=False, observed=True)["Antal behöriga"].sum(),
+        i.geometry, YEAR, "Alla"),
+    "seats_by_region_sunburst": lambda i: (dp.get_region_summary(i.filtered),),
+    "trend_over_time_chart": lambda i: (dp.trend_applications_over_time(i.cube),),
+    "choropleth_mapbox_chart": lambda i: (i.melted, None, YEAR),
+    "empty_figure": lambda i: (),
+    "create_top_20_schools_chart": lambda i: (i.filtered,),
+    "create_top_20_schools_bar": lambda i: (dp.get_top_20_schools_by_applications(i.filtered),),
+    "plot_statsbidrag_over_time": lambda i: (i.cube,),
+    "prepare_pie_data_filtered": lambda i: (i.filtered,),
+    "create_pie_chart_with_title": lambda i: load_chart_module().prepare_pie_data_filtered(i.filtered),
+    "create_bub_animated_chart": lambda i: (i.melted, YEAR),
+    "plot_beviljade_by_year": lambda i: (i.cube,),
+    "plot_beviljade_by_region": lambda i: (i.regions, i.geometry, 2021),
+    "plot_statsbidrag_by_region": lambda i: (i.regions, i.geometry, 2021),
+    "plot_beviljade_by_anordnare": lambda i: (i.cube,),
+    "plot_application_trends": lambda i: (dp.application_trends(i.students),),
+    "statsbidrag_chart": lambda i: (i.filtered,),
+    "plot_seats_by_round": lambda i: (dp.datasets.get("df_rounds"), "Data/IT"),
+    "plot_graduates_by_field": lambda i: (i.graduate_index, YEAR),
+    "plot_graduates_by_region": lambda i: (i.graduate_index, YEAR, "kvinnor", "Distans"),
+    "plot_employment_by_field": lambda i: (i.employment, YEAR),
+}
+
+
+def _chart_case(name):
+    def setup(i):
+        builder = getattr(load_chart_module(), name)
+        args = CHART_ARGUMENTS[name](i)
+        return lambda: builder(*args)
+    return setup
+
+
+for _name in CHART_ARGUMENTS:
+    case(f"chart.{_name}")(_chart_case(_name))
@@ -0,0 +1,204 @@
+"""Benchmark runner: import times, per-call latency and peak memory.
+
+    python -m benchmarks.run                      # real data, scales 1, 10 and 100
+    python -m benchmarks.run --scale 1 --filter chart.
+    python -m benchmarks.run --save-baseline      # store this run as the baseline
+    python -m benchmarks.run --synthetic --years 3  # generated data instead of copies
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+
+Results are written as JSON. With a baseline, every case whose median is more
+than ``--threshold`` slower than the baseline is reported as a regression and
+the exit code is 1, so the run can gate a deploy.
+
+No baseline is committed: timings only compare on the machine that made them.
+Create one on the machine that runs the gate, from the commit to compare
+against, with ``--save-baseline`` (written to benchmarks/baseline.json unless
+``--baseline`` names another file); without one the run only records results.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIRECTORY = ROOT / "benchmarks" / "results"
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+# Imports and the first load of the datasets the dashboard renders
+IMPORT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import backend.data_processing as dp
+imported = time.perf_counter()
+for name in ("filtered_df", "df_melted", "df_regions", "cube"):
+    dp.datasets.get(name)
+loaded = time.perf_counter()
+print(json.dumps({"import": imported - start, "load": loaded - imported}))
+"""
+
+
+def _run_import(cache_directory):
+    env = dict(os.environ, YH_CACHE_DIRECTORY=str(cache_directory), PYTHONPATH=str(ROOT))
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_imports(repeat):
+    """Cold (empty snapshot cache) and warm (populated cache) import of backend.data_processing."""
+    results = {}
+    for run in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="yh-cache-") as cache:
+            for phase, timing in (("cold", _run_import(cache)), ("warm", _run_import(cache))):
+                for key, seconds in timing.items():
+                    results.setdefault(f"{phase}_{key}", []).append(seconds * 1000)
+    return {
+        f"import.{name}": {"median_ms": statistics.median(samples), "min_ms": min(samples), "samples": len(samples)}
+        for name, samples in results.items()
+    }
+
+
+def time_call(func, repeat, warmup=1):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "min_ms": samples[0],
+        "peak_kib": peak / 1024,
+        "samples": len(samples),
+    }
+
+
+def bench_cases(scales, repeat, pattern=None, inputs_factory=None):
+    from benchmarks.cases import CASES, Inputs
+
+    inputs_factory = inputs_factory or Inputs
+    results = {}
+    for scale in scales:
+        with inputs_factory(scale) as inputs:
+            for name, setup in CASES.items():
+                if pattern and pattern not in name:
+                    continue
+                key = f"{name}@x{scale}"
+                try:
+                    results[key] = time_call(setup(inputs), repeat)
+                except Exception as exc:  # keep going; a broken case is reported, not fatal
+                    results[key] = {"error": f"{type(exc).__name__}: {exc}"}
+                print(f"{key:55s} {results[key].get('median_ms', float('nan')):10.2f} ms", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Cases slower than the baseline median by more than ``threshold`` (a fraction)."""
+    regressions = {}
+    for key, result in results.items():
+        before = baseline.get("results", {}).get(key, {}).get("median_ms")
+        after = result.get("median_ms")
+        if before and after is not None:
+            ratio = after / before
+            result["baseline_median_ms"] = before
+            result["ratio"] = ratio
+            if ratio > 1 + threshold:
+                regressions[key] = ratio
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--skip-imports", action="store_true")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="scale with benchmarks.synthetic instead of replicating the real frames")
+    parser.add_argument("--years", type=int, default=0, help="extra years in the synthetic data")
+    parser.add_argument("--output", type=Path, help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)  # the data paths are relative to the repository root
+    sys.path.insert(0, str(ROOT))
+
+    results = {}
+    if not args.skip_imports and not args.filter:
+        results.update(bench_imports(max(1, args.repeat // 3)))
+    inputs_factory = None
+    if args.synthetic:
+        from benchmarks.cases import Inputs
+        from benchmarks.synthetic import generate
+
+        def inputs_factory(scale):
+            return Inputs(scale, sources=generate(scale, args.years))
+    results.update(bench_cases(args.scale, args.repeat, args.filter, inputs_factory))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": args.scale,
+            "repeat": args.repeat,
+            "data": f"synthetic (+{args.years} years)" if args.synthetic else "replicated",
+        },
+        "results": results,
+    }
+
+    regressions = {}
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+
+    output = args.output or RESULTS_DIRECTORY / f"{report['meta']['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    for key, ratio in sorted(regressions.items()):
+        print(f"REGRESSION {key}: {ratio:.2f}x baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
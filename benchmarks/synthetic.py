@@ -0,0 +1,248 @@
+"""Synthetic MYH datasets at arbitrary scale, for load and scaling tests.
+
+A profile is learned from each real source: column roles and dtypes, null
+rates, identifier formats, the year-suffixed column families ("Antal sökande
+2020" ... "2024") and their year-over-year growth. Synthetic rows are
+bootstrapped from the real rows, so the joint distribution of areas, regions
+and seat counts is kept, then:
+
+* counts are scaled by one log-normal factor per row (ratios within a row hold),
+* organizer and education names are spread over ``scale`` times as many members,
+* single-municipality rows are moved to municipalities drawn from the full
+  municipality table, so more municipalities appear as the scale grows,
+* identifiers are renumbered so they stay unique,
+* ``years`` extra year columns are appended to every year family.
+
+    python -m benchmarks.synthetic --scale 10 --years 2 --output data/.synthetic/x10
+    python -m benchmarks.synthetic --scale 100 --formats csv parquet
+
+The files keep the source file names and sheet names, so they can be read
+with the same options as the real data (``backend.data_processing.SOURCES``).
+"""
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend import data_processing as dp
+from backend.schema import SCHEMAS, enforce_schema
+
+# === Dataset specifications ===
+# ids: unique identifiers, renumbered per row
+# names: entity names that gain members with the scale
+# municipality: (kommun column, län column or None) moved to other municipalities
+# fixed: numeric columns that are attributes, not counts, and are not scaled
+# report: a report-layout sheet (areas as rows, years as a header row)
+DATASETS = {
+    "df_courses": dict(
+        ids=["Diarienummer"],
+        names=["Anordnare namn", "Utbildningsnamn"],
+        municipality=("Kommun", "Län"),
+        fixed=["YH-poäng", "Antal kommuner", "Antal län", "Antal FA-regioner"],
+    ),
+    "df_students": dict(),
+    "df_april": dict(
+        ids=["Utbildningsnummer"],
+        names=["Anordnare", "Utbildningsnamn"],
+        municipality=("Kommun 1", None),
+        fixed=["YH-poäng"],
+    ),
+    "df_july": dict(
+        ids=["Utbildningsnummer"],
+        names=["Anordnare", "Utbildningsnamn"],
+        municipality=("Kommun 1", None),
+        fixed=["YH-poäng"],
+    ),
+    "df_grants": dict(report=True),
+}
+
+FORMATS = ("xlsx", "csv", "parquet")
+YEAR_COLUMN = re.compile(r"^(.+ )(\d{4})$")
+IDENTIFIER = re.compile(r"^(.*?)(\d+)$")
+
+# Spread of the per-row count factor (log-normal sigma)
+COUNT_NOISE = 0.15
+
+
+# === Profiles ===
+def year_families(columns):
+    """{prefix: [(year, column), ...]} for columns named "<prefix> <year>"."""
+    families = {}
+    for column in columns:
+        match = YEAR_COLUMN.match(str(column))
+        if match:
+            families.setdefault(match.group(1), []).append((int(match.group(2)), column))
+    return {prefix: sorted(members) for prefix, members in families.items()}
+
+
+def year_growth(df, members):
+    """Median year-over-year ratio of a family's column totals (1.0 for a single year)."""
+    totals = [df[column].sum() for _, column in members]
+    ratios = [after / before for before, after in zip(totals, totals[1:]) if before > 0]
+    return float(np.median(ratios)) if ratios else 1.0
+
+
+def identifier_format(values):
+    """(prefix, digits, first number) of identifiers like "MYH 2024/1000" or "YH01239"."""
+    numbers = []
+    prefix, digits = "", 0
+    for value in values.dropna().astype(str):
+        match = IDENTIFIER.match(value)
+        if match:
+            prefix, digits = match.group(1), len(match.group(2))
+            numbers.append(int(match.group(2)))
+    return prefix, digits, min(numbers, default=1)
+
+
+def learn_profile(df, spec=None):
+    """What the generator needs to know about a real source frame."""
+    spec = spec or {}
+    numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+    families = year_families(df.columns)
+    # Names and municipalities get new members, so work on plain object columns
+    categorical = df.select_dtypes("category").columns
+    return dict(
+        spec=spec,
+        rows=df.astype({column: object for column in categorical}).reset_index(drop=True),
+        dtypes=df.dtypes.to_dict(),
+        null_rates=df.isna().mean().to_dict(),
+        counts=[column for column in numeric if column not in spec.get("fixed", ())],
+        ids={column: identifier_format(df[column]) for column in spec.get("ids", ())},
+        names={column: df[column].nunique() for column in spec.get("names", ())},
+        families={prefix: (members, year_growth(df, members)) for prefix, members in families.items()},
+    )
+
+
+# === Generation ===
+def _append_years(df, families, counts, years, rng):
+    """``years`` new columns per year family, grown from the family's last year."""
+    for prefix, (members, growth) in families.items():
+        last_year, column = members[-1]
+        if column not in counts:
+            continue
+        values = df[column].astype("float64")
+        for offset in range(1, years + 1):
+            values = values * growth * rng.lognormal(0.0, COUNT_NOISE / 2, len(df))
+            new_column = f"{prefix}{last_year + offset}"
+            df[new_column] = values.round().astype("int64") if df[column].dtype.kind == "i" else values
+    return df
+
+
+def _move_municipalities(df, spec, scale, municipalities, rng):
+    kommun, lan = spec["municipality"]
+    # Rows already listing several municipalities keep their placeholder
+    single = df[kommun].isin(municipalities["Kommun"])
+    moved = single & (rng.random(len(df)) < 1 - 1 / scale)
+    picks = municipalities.iloc[rng.integers(0, len(municipalities), int(moved.sum()))]
+    df.loc[moved, kommun] = picks["Kommun"].to_numpy()
+    if lan is not None:
+        df.loc[moved, lan] = picks["Län"].to_numpy()
+    return df
+
+
+def synthesize(profile, scale=1, years=0, seed=0, municipalities=None):
+    """A frame with ``scale`` times the rows of the profiled source and ``years`` more years."""
+    rng = np.random.default_rng(seed)
+    spec, source = profile["spec"], profile["rows"]
+    if spec.get("report"):
+        return synthesize_report(source, years, rng)
+
+    n = int(round(len(source) * scale))
+    df = source.iloc[rng.integers(0, len(source), n)].reset_index(drop=True)
+
+    factor = rng.lognormal(0.0, COUNT_NOISE, n)
+    for column in profile["counts"]:
+        values = df[column] * factor
+        df[column] = values.round().astype("int64") if df[column].dtype.kind == "i" else values
+
+    for column, members in profile["names"].items():
+        copy = rng.integers(0, max(1, int(round(scale))), n)
+        suffix = pd.Series(np.where(copy > 0, " #" + copy.astype(str), ""), index=df.index)
+        df[column] = df[column].where(df[column].isna(), df[column].astype(str) + suffix)
+
+    for column, (prefix, digits, start) in profile["ids"].items():
+        df[column] = [f"{prefix}{number:0{digits}d}" for number in range(start, start + n)]
+
+    if "municipality" in spec and scale > 1 and municipalities is not None:
+        df = _move_municipalities(df, spec, scale, municipalities, rng)
+
+    return _append_years(df, profile["families"], profile["counts"], years, rng)
+
+
+def synthesize_report(df, years, rng):
+    """Report-layout sheet (grants): jittered values, ``years`` extra year columns, totals recomputed."""
+    df = df.copy()
+    label = df.columns[0]
+    header = df.index[df[label] == "Utbildningsområde"][0]
+    total = df.index[df[label] == "Totalt"][0]
+    body = df.index[(df.index > header) & (df.index < total)]
+    values = df.columns[1:]
+
+    df.loc[body, values] = df.loc[body, values] * rng.lognormal(0.0, COUNT_NOISE, (len(body), len(values)))
+    years_header = df.loc[header, values].astype(float)
+    growth = (df.loc[body, values[-1]].sum() / df.loc[body, values[-2]].sum()) if len(values) > 1 else 1.0
+    for offset in range(1, years + 1):
+        column = f"Unnamed: {len(df.columns)}"
+        df[column] = np.nan
+        df.loc[header, column] = years_header.iloc[-1] + offset
+        df.loc[body, column] = df.loc[body, df.columns[-2]] * growth * rng.lognormal(0.0, COUNT_NOISE / 2, len(body))
+    df.loc[total, df.columns[1:]] = df.loc[body, df.columns[1:]].sum().to_numpy()
+    return df
+
+
+def generate(scale=1, years=0, seed=0, names=None):
+    """Synthetic frames for every dataset in DATASETS (or ``names``), keyed by dataset name.
+
+    The frames get the same declared dtypes as the loaded sources (backend.schema).
+    """
+    municipalities = dp.datasets.get("df_municipalities")
+    frames = {}
+    for offset, name in enumerate(names or DATASETS):
+        profile = learn_profile(dp.datasets.get(name), DATASETS[name])
+        frames[name] = enforce_schema(synthesize(profile, scale, years, seed + offset, municipalities), SCHEMAS.get(name))
+    return frames
+
+
+# === Output ===
+def write_frame(df, name, directory, formats=FORMATS):
+    """Write one dataset under ``directory`` with its source's relative path and file name."""
+    options = dp.SOURCES[name]
+    relative = Path(options["path"]).relative_to("data")
+    target = Path(directory) / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt in formats:
+        path = target.with_suffix(f".{fmt}")
+        if fmt == "xlsx":
+            df.to_excel(path, sheet_name=options.get("sheet_name", "Sheet1"), index=False)
+        elif fmt == "csv":
+            df.to_csv(path, index=False, encoding=options.get("encoding", "utf-8"), errors="replace")
+        elif fmt == "parquet":
+            df.rename(columns=str).to_parquet(path, index=False)
+        else:
+            raise ValueError(f"Unknown format: {fmt}")
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--years", type=int, default=0, help="extra years appended to every year family")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--output", type=Path, help="output directory (default data/.synthetic/x<scale>)")
+    args = parser.parse_args(argv)
+
+    output = args.output or Path("data/.synthetic") / f"x{args.scale:g}"
+    frames = generate(args.scale, args.years, args.seed, args.datasets)
+    for name, df in frames.items():
+        for path in write_frame(df, name, output, args.formats):
+            print(f"{name:12s} {len(df):>9,d} rows  {path}")
+
+
+if __name__ == "__main__":
+    main()
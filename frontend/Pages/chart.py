@@ -2,10 +2,12 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from difflib import get_close_matches
 
-from backend.data_processing import df_combined, df_regions, region_geojson
-geojson_data = region_geojson
+from backend.data_processing import datasets, funding, get_top_20_schools_by_applications, seats_by_round
+from backend.funding import DEFAULT_SCENARIO, compute_statsbidrag
+from backend.geometry import load_geometry, subset_features
+from backend.instrumentation import instrumented
+from backend.name_index import geojson_name_index
 
 
 
@@ -13,6 +15,7 @@ category_column_medel = "Sökt utbildningsområde"  # or whatever your correct c
 
 
 
+@instrumented("chart")
 def application_by_field_chart(df: pd.DataFrame):
     """Bar chart: Total seats by education area."""
     return px.bar(
@@ -24,14 +27,19 @@ def application_by_field_chart(df: pd.DataFrame):
     )
 
 
+@instrumented("chart")
 def students_over_time_map(df_grouped: pd.DataFrame, geojson_data: dict, year: int, area: str):
     """Choropleth map of qualified students by region and year."""
+    geojson_data = geojson_data or load_geometry("regions", "coarse")
+    # Source names carry stray whitespace, so match on resolved region codes
+    region_codes = geojson_name_index(geojson_data).resolve_series(df_grouped["region (hemlän)"])
     fig = px.choropleth(
         df_grouped,
         geojson=geojson_data,
-        featureidkey="properties.name",
-        locations="region (hemlän)",
+        featureidkey="properties.ref:se:länskod",
+        locations=region_codes,
         color="Antal behöriga",
+        hover_name="region (hemlän)",
         color_continuous_scale="Viridis",
         title=f"Qualified Students in {area} - {year}"
     )
@@ -39,6 +47,7 @@ def students_over_time_map(df_grouped: pd.DataFrame, geojson_data: dict, year: i
     return fig
 
 
+@instrumented("chart")
 def seats_by_region_sunburst(df: pd.DataFrame):
     """Sunburst chart of seats by Län, Kommun, and Anordnare."""
     return px.sunburst(
@@ -49,18 +58,25 @@ def seats_by_region_sunburst(df: pd.DataFrame):
     )
 
 
-def statsbidrag_chart(df: pd.DataFrame, multiplier: int = 7000):
-    """Bar chart of estimated government grants (Statsbidrag)."""
-    df["Statsbidrag"] = df["YH-poäng"] * multiplier
+@instrumented("chart")
+def statsbidrag_chart(df: pd.DataFrame, scenario=DEFAULT_SCENARIO):
+    """Bar chart of estimated government grants (Statsbidrag) for the applied seats."""
+    statsbidrag = compute_statsbidrag(
+        df, datasets.get(f"rates_{scenario.rates}"), scenario,
+        seats="Sökt antal platser 2024", area="Sökt utbildningsområde"
+    )
+    per_area = statsbidrag.groupby(df["Sökt utbildningsområde"], observed=True).sum().reset_index()
+    moms = "inkl." if scenario.moms else "exkl."
     return px.bar(
-        df,
+        per_area,
         x="Sökt utbildningsområde",
         y="Statsbidrag",
-        title=f"Statsbidrag per Education Area (YH-poäng × {multiplier})",
+        title=f"Statsbidrag per Education Area (schablon, {moms} moms)",
         labels={"Sökt utbildningsområde": "Education Area", "Statsbidrag": "SEK"}
     )
 
 
+@instrumented("chart")
 def trend_over_time_chart(df: pd.DataFrame):
     """Line chart showing application trends by field over years."""
     return px.line(
@@ -72,30 +88,22 @@ def trend_over_time_chart(df: pd.DataFrame):
     )
 
 
+@instrumented("chart")
 def choropleth_mapbox_chart(df: pd.DataFrame, geojson_data: dict, selected_year: int):
     """Mapbox choropleth using region codes and dropdown year selection."""
-    # Create region code mapping from GeoJSON
-    region_codes = {
-        feature["properties"]["name"]: feature["properties"]["ref:se:länskod"]
-        for feature in geojson_data["features"]
-    }
-
-    # Fuzzy match regions in the data
-    region_codes_map = []
-    for name in df["region (hemlän)"]:
-        match = get_close_matches(name, region_codes.keys(), n=1)
-        region_codes_map.append(region_codes[match[0]] if match else None)
-
-    df["Länskod"] = region_codes_map
-    df["log_val"] = np.log(df["Antal behöriga"] + 1)
-
-    # Filter by year
+    # Zoomable map, so use the finer simplification by default
+    geojson_data = geojson_data or load_geometry("regions", "fine")
+    # Filter by year; the caller's frame is left untouched
     df_year = df[df["År"] == selected_year]
 
+    # Resolve region codes once per distinct name (exact match first, fuzzy fallback memoized)
+    region_codes = geojson_name_index(geojson_data).resolve_series(df_year["region (hemlän)"])
+    log_val = np.log(df_year["Antal behöriga"] + 1)
+
     fig = go.Figure(go.Choroplethmapbox(
         geojson=geojson_data,
-        locations=df_year["Länskod"],
-        z=df_year["log_val"],
+        locations=region_codes,
+        z=log_val,
         featureidkey="properties.ref:se:länskod",
         colorscale="YlGnBu",
         marker_line_width=0.3,
@@ -114,17 +122,20 @@ def choropleth_mapbox_chart(df: pd.DataFrame, geojson_data: dict, selected_year:
     return fig
 
 
+@instrumented("chart")
 def empty_figure():
     """Returns an empty Plotly figure."""
     return go.Figure()
 
 
-# added newly
-from backend.data_processing import get_top_20_schools_by_applications
+@instrumented("chart")
+def create_top_20_schools_chart(df):
+    return create_top_20_schools_bar(get_top_20_schools_by_applications(df))
 
 
-def create_top_20_schools_chart(df):
-    top_schools_df = get_top_20_schools_by_applications(df)
+@instrumented("chart")
+def create_top_20_schools_bar(top_schools_df):
+    """Bar chart from an already aggregated top-20 frame (Skola, Antal ansökningar)."""
     fig = px.bar(
         top_schools_df,
         x="Antal ansökningar",
@@ -136,8 +147,13 @@ def create_top_20_schools_chart(df):
     return fig
 
 # fixed 
-def plot_statsbidrag_over_time(df_combined):
-    df_grouped = df_combined.groupby("År")["Statsbidrag"].sum().reset_index()
+@instrumented("chart")
+def plot_statsbidrag_over_time(cube, scenario=None):
+    # The cube holds the default scenario; what-if scenarios come from the funding engine
+    if scenario is None:
+        df_grouped = cube.rollup(["År"], ["Statsbidrag"]).dropna(subset=["Statsbidrag"])
+    else:
+        df_grouped = funding.totals(scenario, ["År"]).dropna(subset=["Statsbidrag"])
     df_grouped["Statsbidrag"] = df_grouped["Statsbidrag"] / 1_000_000  # millions
     fig = px.bar(
         df_grouped,
@@ -149,17 +165,20 @@ def plot_statsbidrag_over_time(df_combined):
     return fig
 #-----------
 
+PIE_TITLE = "Beviljade platser per utbildningsområde"
+
+@instrumented("chart")
 def prepare_pie_data_filtered(df):
-    df_grouped = df.groupby("Sökt utbildningsområde")["Sökt antal platser 2024 (start och avslut 2024)"].sum().reset_index()
+    df_grouped = df.groupby("Sökt utbildningsområde", observed=True)["Sökt antal platser 2024 (start och avslut 2024)"].sum().reset_index()
     df_grouped = df_grouped[df_grouped["Sökt antal platser 2024 (start och avslut 2024)"] > 0]
-    title = "Beviljade platser per utbildningsområde"
-    return df_grouped, title
+    return df_grouped, PIE_TITLE
 
 
 
+@instrumented("chart")
 def create_bub_animated_chart(df, selected_year):
     filtered = df[df["År"] == int(selected_year)]
-    grouped = filtered.groupby("utbildningsområde MYH")["Antal behöriga"].sum().reset_index()
+    grouped = filtered.groupby("utbildningsområde MYH", observed=True)["Antal behöriga"].sum().reset_index()
 
     fig = px.bar(
         grouped.sort_values("Antal behöriga", ascending=True),
@@ -179,6 +198,7 @@ def create_bub_animated_chart(df, selected_year):
 
 
 
+@instrumented("chart")
 def create_pie_chart_with_title(df, title):
     fig = px.pie(
         df,
@@ -192,8 +212,9 @@ def create_pie_chart_with_title(df, title):
 
 #Map
 
-def plot_beviljade_by_year(df_combined):
-    df_grouped = df_combined.groupby("År", as_index=False)["Beviljade"].sum()
+@instrumented("chart")
+def plot_beviljade_by_year(cube):
+    df_grouped = cube.rollup(["År"], ["Beviljade"]).dropna(subset=["Beviljade"])
     fig = px.bar(
         df_grouped,
         x="År", y="Beviljade",
@@ -204,6 +225,7 @@ def plot_beviljade_by_year(df_combined):
     return fig
 
 
+@instrumented("chart")
 def plot_beviljade_by_region(df_regions, geojson_data, year):
     df_year = df_regions[df_regions["År"] == year].copy()
     df_year = df_year.dropna(subset=["Länskod"])
@@ -211,7 +233,8 @@ def plot_beviljade_by_region(df_regions, geojson_data, year):
 
     fig = px.choropleth(
         df_year,
-        geojson=geojson_data,
+        # Only ship the regions that are drawn
+        geojson=subset_features(geojson_data, "ref:se:länskod", df_year["Länskod"]),
         locations="Länskod",
         featureidkey="properties.ref:se:länskod",
         color="Beviljade",
@@ -224,14 +247,18 @@ def plot_beviljade_by_region(df_regions, geojson_data, year):
     return fig
 
 
-def plot_statsbidrag_by_region(df_regions, geojson_data, year):
+@instrumented("chart")
+def plot_statsbidrag_by_region(df_regions, geojson_data, year, scenario=None):
+    if scenario is not None:
+        df_regions = funding.totals(scenario._replace(year=year), ["Län", "Länskod", "År"])
     df_year = df_regions[df_regions["År"] == year].copy()
     df_year = df_year.dropna(subset=["Länskod"])
     df_year["Länskod"] = df_year["Länskod"].astype(str)
 
     fig = px.choropleth(
         df_year,
-        geojson=geojson_data,
+        # Only ship the regions that are drawn
+        geojson=subset_features(geojson_data, "ref:se:länskod", df_year["Länskod"]),
         locations="Länskod",
         featureidkey="properties.ref:se:länskod",
         color="Statsbidrag",
@@ -243,14 +270,9 @@ def plot_statsbidrag_by_region(df_regions, geojson_data, year):
     fig.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0})
     return fig
 
-def plot_beviljade_by_anordnare(df_combined, top_n=10):
-    df_top = (
-        df_combined.groupby("Anordnare")["Beviljade"]
-        .sum()
-        .sort_values(ascending=False)
-        .head(top_n)
-        .reset_index()
-    )
+@instrumented("chart")
+def plot_beviljade_by_anordnare(cube, top_n=10):
+    df_top = cube.top("Anordnare", "Beviljade", top_n)
     fig = px.bar(
         df_top,
         x="Beviljade", y="Anordnare",
@@ -265,17 +287,9 @@ def plot_beviljade_by_anordnare(df_combined, top_n=10):
 # trend_applications_over_time
 
 # === Application Trend Line Chart ===
-df = pd.read_csv("data/processed_applications.csv")
-
-# Extract dropdown options
-genders = df["Kön"].dropna().unique().tolist()
-areas = df["Utbildningsområde"].dropna().unique().tolist()
-
-
-# Load the processed applications data
-df_trends = pd.read_csv("data/processed_applications.csv")
-
-def plot_application_trends():
+# df_trends is the managed artifact (see data_processing.load_applications)
+@instrumented("chart")
+def plot_application_trends(df_trends):
     fig = px.line(
         df_trends,
         x="År",
@@ -288,5 +302,71 @@ def plot_application_trends():
     fig.update_layout(xaxis=dict(dtick=1))
     return fig
 
-# Create a static figure (used in dashboard.py)
-application_trend_figure = plot_application_trends()
+# === Application Rounds ===
+# Every program and course round from the ingested store (see backend.ingestion)
+@instrumented("chart")
+def plot_seats_by_round(df_rounds, area=""):
+    df = pd.concat(
+        [seats_by_round(df_rounds, measure, area).assign(Mått=measure) for measure in ("Sökta platser", "Beviljade platser")],
+        ignore_index=True
+    )
+    fig = px.bar(
+        df,
+        x="Omgång", y="Värde", color="Mått", facet_col="Typ",
+        barmode="group",
+        title=f"Sökta och beviljade platser per ansökningsomgång{f' ({area})' if area else ''}",
+        labels={"Värde": "Platser", "Omgång": "Omgång", "Mått": ""}
+    )
+    fig.update_xaxes(dtick=1)
+    fig.update_layout(margin={"r": 0, "t": 60, "l": 0, "b": 0})
+    return fig
+
+# Graduates: slices of the graduate index (see backend.graduates) and the employment follow-up
+@instrumented("chart")
+def plot_graduates_by_field(index, year, gender="totalt", form=""):
+    df = index.slice("utbildningens inriktning", {"År": int(year), "kön": gender, "utbildningens studieform": form})
+    fig = px.bar(
+        df.dropna(subset=["Antal examinerade"]),
+        x="Antal examinerade",
+        y="utbildningens inriktning",
+        orientation="h",
+        title=f"Examinerade per inriktning ({year})",
+        labels={"utbildningens inriktning": "Inriktning"}
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, margin={"r": 0, "t": 40, "l": 0, "b": 0})
+    return fig
+
+@instrumented("chart")
+def plot_graduates_by_region(index, year, gender="totalt", form=""):
+    df = index.slice("region där utbildningen bedrivs", {"År": int(year), "kön": gender, "utbildningens studieform": form})
+    fig = px.bar(
+        df.dropna(subset=["Antal examinerade"]),
+        x="Antal examinerade",
+        y="region där utbildningen bedrivs",
+        orientation="h",
+        title=f"Examinerade per region ({year})",
+        labels={"region där utbildningen bedrivs": "Region"}
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, margin={"r": 0, "t": 40, "l": 0, "b": 0})
+    return fig
+
+@instrumented("chart")
+def plot_employment_by_field(df_employment_melted, year, gender="totalt"):
+    df = df_employment_melted[(df_employment_melted["År"] == int(year)) & (df_employment_melted["kön"] == gender)]
+    df = df.melt(
+        id_vars=["utbildningsområde MYH"],
+        value_vars=["Arbete", "Arbetssökande", "Studerande", "Annat"],
+        var_name="Sysselsättning",
+        value_name="Procent"
+    )
+    fig = px.bar(
+        df,
+        x="Procent",
+        y="utbildningsområde MYH",
+        color="Sysselsättning",
+        orientation="h",
+        title=f"Sysselsättning efter examen per utbildningsområde ({year})",
+        labels={"utbildningsområde MYH": "Utbildningsområde", "Procent": "Procent"}
+    )
+    fig.update_layout(barmode="stack", margin={"r": 0, "t": 40, "l": 0, "b": 0})
+    return fig
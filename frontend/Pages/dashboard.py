@@ -1,51 +1,82 @@
+import os
+import threading
+from functools import partial
+
 import taipy.gui.builder as tgb
 import plotly.express as px
 import plotly.graph_objects as go
-from frontend.pages.chart import application_trend_figure
 
 
 from frontend.pages.chart import (
     plot_application_trends,
-    application_trend_figure,
     category_column_medel,
     plot_statsbidrag_over_time,
     prepare_pie_data_filtered,
     create_pie_chart_with_title,
-    create_top_20_schools_chart,
+    create_top_20_schools_bar,
+    PIE_TITLE,
     create_bub_animated_chart,
     plot_beviljade_by_region,
     plot_statsbidrag_by_region,
     plot_beviljade_by_year,
-    plot_beviljade_by_anordnare
+    plot_beviljade_by_anordnare,
+    plot_seats_by_round,
+    plot_graduates_by_field,
+    plot_graduates_by_region,
+    plot_employment_by_field
 )
 
 from backend.data_processing import (
-    df_combined,
-    df_regions,
-    region_geojson,
-    filtered_df,
+    datasets,
     kpi,
     get_educational_areas,
     get_municipalities,
     get_schools,
     get_educations,
+    get_filter_options,
     apply_filters,
-    df_melted,
+    get_top_20_schools_by_applications,
     category_column
 )
+from backend.executor import dispatch
+from backend.figure_cache import figure_cache
+from backend.figure_delivery import FIGURE_DELIVERY
+from backend.funding import DEFAULT_SCENARIO, Scenario
+from backend.instrumentation import instrumented_callback
+from backend.shared import shared
+from backend.query_engine import get_query_engine
+
+# Datasets rendered on this page; loaded on first use by the registry
+df_regions = datasets.get("df_regions")
+filtered_df = datasets.get("filtered_df")
+df_melted = datasets.get("df_melted")
+graduate_index = datasets.get("graduate_index")
+
+# Sessions keep their own selections; figures and option lists are shared,
+# content-addressed objects (see backend.shared) that sessions only reference
+def available_years():
+    return sorted(set(datasets.get("df_regions")["År"]).union(datasets.get("df_melted")["År"]))
 
-# Initial dropdown selections and options
 selected_year = "2024"
-years_available = sorted(set(df_regions["År"]).union(df_melted["År"]))
+years_available = shared.options(available_years())
 selected_educational_area = ""
 selected_municipality = ""
 selected_school = ""
 selected_education = ""
+# What-if funding: momskompensation and a uniform change (%) of the schablon rates
+with_moms = False
+rate_change = 0
+# Graduate views: kön and studieform ("Alla" sums over both)
+ALL_FORMS = "Alla"
+graduate_gender = "totalt"
+graduate_genders = shared.options(graduate_index.options("kön"))
+graduate_form = ALL_FORMS
+graduate_forms = shared.options([ALL_FORMS] + graduate_index.options("utbildningens studieform"))
 
-educational_areas = get_educational_areas()
-municipalities = get_municipalities()
-schools = get_schools()
-educations = get_educations()
+educational_areas = shared.options(get_educational_areas())
+municipalities = shared.options(get_municipalities())
+schools = shared.options(get_schools())
+educations = shared.options(get_educations())
 
 # KPIs
 initial_kpi_results = kpi(filtered_df)
@@ -57,50 +88,246 @@ unique_schools = initial_kpi_results['unique_schools']
 approval_rate = initial_kpi_results['approval_rate']
 
 # Charts
-statsbidrag_over_time_figure = plot_statsbidrag_over_time(df_combined)
+statsbidrag_over_time_figure = figure_cache.get(plot_statsbidrag_over_time, ("cube",), scenario=None)
 pie_data, pie_title = prepare_pie_data_filtered(filtered_df)
-pie_figure = create_pie_chart_with_title(pie_data, pie_title)
-region_beviljade_map = plot_beviljade_by_region(df_regions, region_geojson, int(selected_year))
-region_statsbidrag_map = plot_statsbidrag_by_region(df_regions, region_geojson, int(selected_year))
-top_20_schools_figure = create_top_20_schools_chart(filtered_df)
-bub_animated_figure = create_bub_animated_chart(df_melted, selected_year)
+pie_figure = shared.figure(create_pie_chart_with_title, pie_data, pie_title)
+top_20_schools_figure = shared.figure(create_top_20_schools_bar, get_top_20_schools_by_applications(filtered_df))
+application_trend_figure = figure_cache.get(plot_application_trends, ("df_applications",))
+# Every application round; follows the area filter
+rounds_figure = figure_cache.get(plot_seats_by_round, ("df_rounds",), area="")
+
+# The default scenario is read from the cube; others go through the funding engine
+def funding_scenario(state):
+    scenario = Scenario(moms=bool(state.with_moms), factor=1 + float(state.rate_change or 0) / 100)
+    return None if scenario == DEFAULT_SCENARIO else scenario
+
+# Both Statsbidrag charts follow the scenario controls
+def funding_jobs(year, scenario=None):
+    return {
+        "region_statsbidrag_map": partial(figure_cache.get, plot_statsbidrag_by_region, ("df_regions", "region_geometry"), year=int(year), scenario=scenario),
+        "statsbidrag_over_time_figure": partial(figure_cache.get, plot_statsbidrag_over_time, ("cube",), scenario=scenario),
+    }
+
+# Examinations are published a year after the students, so the newest year has none;
+# the graduate charts then show the latest year that has them and say so
+def graduate_year(year):
+    return datasets.get("graduate_index").latest_year("Antal examinerade", upto=year) or int(year)
+
+def examinations_note(year, shown):
+    if shown == int(year):
+        return ""
+    return f"Inga examinerade för {year} ännu; visar {shown}, det senaste året med examinationer."
+
+# Graduate charts are slices of the graduate index, so a selection change is a lookup or a few ms
+def graduate_jobs(year, gender="totalt", form=ALL_FORMS):
+    requested, year, form = year, graduate_year(year), "" if form == ALL_FORMS else form
+    return {
+        "graduate_note": partial(examinations_note, requested, year),
+        "graduates_by_field_figure": partial(figure_cache.get, plot_graduates_by_field, ("graduate_index",), year=year, gender=gender, form=form),
+        "graduates_by_region_figure": partial(figure_cache.get, plot_graduates_by_region, ("graduate_index",), year=year, gender=gender, form=form),
+        "employment_by_field_figure": partial(figure_cache.get, plot_employment_by_field, ("df_employment_melted",), year=int(requested), gender=gender),
+    }
+
+# Year-driven charts come from the shared figure cache, so a year switch is a lookup
+def year_view_jobs(year, scenario=None):
+    """One independent build per year- or scenario-driven chart, keyed by its state variable."""
+    year = int(year)
+    return {
+        "region_beviljade_map": partial(figure_cache.get, plot_beviljade_by_region, ("df_regions", "region_geometry"), year=year),
+        **funding_jobs(year, scenario),
+        "bub_animated_figure": partial(figure_cache.get, create_bub_animated_chart, ("df_melted",), selected_year=year),
+    }
+
+def year_view_figures(year):
+    """The default view's year-driven figures (graduate charts included), keyed by state variable."""
+    jobs = {**year_view_jobs(year), **graduate_jobs(year)}
+    return {name: job() for name, job in jobs.items()}
 
-# Update views dynamically
+def warm_up_year_views():
+    for year in years_available:
+        year_view_figures(year)
+
+_year_figures = year_view_figures(selected_year)
+region_beviljade_map = _year_figures["region_beviljade_map"]
+region_statsbidrag_map = _year_figures["region_statsbidrag_map"]
+bub_animated_figure = _year_figures["bub_animated_figure"]
+graduates_by_field_figure = _year_figures["graduates_by_field_figure"]
+graduates_by_region_figure = _year_figures["graduates_by_region_figure"]
+employment_by_field_figure = _year_figures["employment_by_field_figure"]
+graduate_note = _year_figures["graduate_note"]
+
+# Build every year's figures in the background when YH_WARM_FIGURES=1
+if os.environ.get("YH_WARM_FIGURES", "0") == "1":
+    threading.Thread(target=warm_up_year_views, daemon=True).start()
+
+# Assign background results to the session that asked for them
+def apply_results(state, results):
+    for name, value in results.items():
+        setattr(state, name, value)
+
+# Latest-wins only holds within a channel, so each chart belongs to exactly one channel:
+# "year_views" for the charts following the year or the scenario, rebuilt by both controls,
+# and "graduates" for the graduate charts, rebuilt by the year and their own selectors
+def year_views(state):
+    return year_view_jobs(state.selected_year, funding_scenario(state))
+
+def graduate_views(state):
+    return graduate_jobs(state.selected_year, state.graduate_gender, state.graduate_form)
+
+# Update views dynamically; a newer year selection supersedes a pending one
+@instrumented_callback
 def update_all_year_views(state):
-    year = int(state.selected_year)
-    state.region_beviljade_map = plot_beviljade_by_region(df_regions, region_geojson, year)
-    state.region_statsbidrag_map = plot_statsbidrag_by_region(df_regions, region_geojson, year)
-    state.bub_animated_figure = create_bub_animated_chart(df_melted, state.selected_year)
+    dispatch(state, "year_views", year_views(state), apply_results)
+    dispatch(state, "graduates", graduate_views(state), apply_results)
+
+@instrumented_callback
+def update_graduate_views(state):
+    dispatch(state, "graduates", graduate_views(state), apply_results)
+
+# A scenario change supersedes a pending year switch and the other way around
+@instrumented_callback
+def update_funding_views(state):
+    dispatch(state, "year_views", year_views(state), apply_results)
 
 # Filter logic
-def apply_filters_to_dashboard(state):
-    filtered_df_local, kpi_result = apply_filters(
-        filtered_df,
-        state.selected_educational_area,
-        state.selected_municipality,
-        state.selected_school,
-        state.selected_education
+def selected_filters(state):
+    return dict(
+        area=state.selected_educational_area,
+        municipality=state.selected_municipality,
+        school=state.selected_school,
+        education=state.selected_education
     )
 
+def filtered_applications(filters):
+    return apply_filters(
+        datasets.get("filtered_df"),
+        filters["area"],
+        filters["municipality"],
+        filters["school"],
+        filters["education"],
+        index=datasets.get("filtered_index")
+    )
+
+def kpi_view(filters):
+    engine = get_query_engine()
+    if engine is not None:
+        # DuckDB backend: every aggregation is one parameterized query
+        return engine.kpi(**filters)
+    return filtered_applications(filters)[1]
+
+# Identical selections (or selections drawing the same data) share one figure
+def pie_view(filters):
+    engine = get_query_engine()
+    if engine is not None:
+        pie_data, pie_title = engine.approved_by_field(**filters), PIE_TITLE
+    else:
+        pie_data, pie_title = prepare_pie_data_filtered(filtered_applications(filters)[0])
+    return shared.figure(create_pie_chart_with_title, pie_data, pie_title)
+
+def top_schools_view(filters):
+    engine = get_query_engine()
+    if engine is not None:
+        top_schools_df = engine.get_top_20_schools_by_applications(**filters)
+    else:
+        top_schools_df = get_top_20_schools_by_applications(filtered_applications(filters)[0])
+    return shared.figure(create_top_20_schools_bar, top_schools_df)
+
+def apply_filter_results(state, results):
+    kpi_result = results["kpi"]
     state.total_applications = kpi_result.get("total_applications", 0)
     state.approved_applications = kpi_result.get("approved_applications", 0)
     state.rejected_applications = state.total_applications - state.approved_applications
     state.total_approved_places = kpi_result.get("total_approved_places", 0)
     state.unique_schools = kpi_result.get("unique_schools", 0)
     state.approval_rate = kpi_result.get("approval_rate", 0.0)
+    state.pie_figure = results["pie_figure"]
+    state.top_20_schools_figure = results["top_20_schools_figure"]
+    state.rounds_figure = results["rounds_figure"]
+
+# The unfiltered view is the same for everyone (and is what the static snapshot serves):
+# built once per data version; the argument only keys the cache
+def default_filter_results(filtered_df):
+    filters = dict(area="", municipality="", school="", education="")
+    return {
+        "kpi": kpi_view(filters),
+        "pie_figure": pie_view(filters),
+        "top_20_schools_figure": top_schools_view(filters),
+        "rounds_figure": figure_cache.get(plot_seats_by_round, ("df_rounds",), area=""),
+    }
 
-    pie_data, pie_title = prepare_pie_data_filtered(filtered_df_local)
-    state.pie_figure = create_pie_chart_with_title(pie_data, pie_title)
-    state.top_20_schools_figure = create_top_20_schools_chart(filtered_df_local)
+def fixed_figures():
+    """The default view's charts that do not follow the year, built from the current data."""
+    default = figure_cache.get(default_filter_results, ("filtered_df",))
+    return {
+        "pie_figure": default["pie_figure"],
+        "statsbidrag_over_time_figure": figure_cache.get(plot_statsbidrag_over_time, ("cube",), scenario=None),
+        "top_20_schools_figure": default["top_20_schools_figure"],
+        "rounds_figure": default["rounds_figure"],
+        "application_trend_figure": figure_cache.get(plot_application_trends, ("df_applications",)),
+    }
+
+def apply_default_filter_results(state, results):
+    apply_filter_results(state, results["default"])
+
+# KPIs and both charts are built in parallel; only the latest filter request is applied.
+# The cached default goes through the same channel, so it supersedes a pending filtered build
+@instrumented_callback
+def apply_filters_to_dashboard(state):
+    filters = selected_filters(state)
+    if not any(filters.values()):
+        dispatch(state, "filters", {"default": partial(figure_cache.get, default_filter_results, ("filtered_df",))},
+                 apply_default_filter_results)
+        return
+    dispatch(state, "filters", {
+        "kpi": partial(kpi_view, filters),
+        "pie_figure": partial(pie_view, filters),
+        "top_20_schools_figure": partial(top_schools_view, filters),
+        "rounds_figure": partial(figure_cache.get, plot_seats_by_round, ("df_rounds",), area=filters["area"]),
+    }, apply_filter_results)
+
+# Narrow each dropdown to the values that exist with the other selections
+@instrumented_callback
+def update_filter_options(state):
+    options = get_filter_options(**selected_filters(state))
+    state.educational_areas = shared.options(options["area"])
+    state.municipalities = shared.options(options["municipality"])
+    state.schools = shared.options(options["school"])
+    state.educations = shared.options(options["education"])
 
 # Reset filters
+@instrumented_callback
 def reset_filters(state):
     state.selected_educational_area = ""
     state.selected_municipality = ""
     state.selected_school = ""
     state.selected_education = ""
+    update_filter_options(state)
     apply_filters_to_dashboard(state)
 
+# Datasets behind this page's views; a refresh of any of them re-renders the page
+PAGE_DATASETS = {"df_courses", "filtered_df", "cube", "df_regions", "df_melted", "df_applications", "graduate_index", "df_employment_melted"}
+
+# Pushed to every session by backend.updates after a data refresh
+def refresh_dashboard(state, names=()):
+    if names and not PAGE_DATASETS.intersection(names):
+        return
+    state.years_available = shared.options(available_years())
+    state.application_trend_figure = figure_cache.get(plot_application_trends, ("df_applications",))
+    index = datasets.get("graduate_index")
+    state.graduate_genders = shared.options(index.options("kön"))
+    state.graduate_forms = shared.options([ALL_FORMS] + index.options("utbildningens studieform"))
+    update_filter_options(state)
+    apply_filters_to_dashboard(state)
+    update_all_year_views(state)
+
+# Charts are sent through Taipy's websocket, or with YH_FIGURE_DELIVERY=http fetched as
+# pre-serialized, compressed JSON from the figures endpoint (see backend.figure_delivery)
+def figure_view(variable):
+    if FIGURE_DELIVERY == "http":
+        tgb.part(content="{" + variable + "}", height="450px")
+    else:
+        tgb.chart(figure="{" + variable + "}")
+
 # Build the Taipy dashboard
 with tgb.Page() as dashboard_page:
     with tgb.part(class_name="container-card"):
@@ -115,11 +342,14 @@ with tgb.Page() as dashboard_page:
                     with tgb.part(class_name="filter-grid"):
                         with tgb.part(class_name="card"):
                             tgb.text("# Filter", mode="md")
-                            tgb.selector("{selected_educational_area}", lov="{educational_areas}", label="Välj utbildningsområde", dropdown=True)
-                            tgb.selector("{selected_municipality}", lov="{municipalities}", label="Välj kommun", dropdown=True)
-                            tgb.selector("{selected_school}", lov="{schools}", label="Välj skola", dropdown=True)
-                            tgb.selector("{selected_education}", lov="{educations}", label="Välj utbildning", dropdown=True)
+                            tgb.selector("{selected_educational_area}", lov="{educational_areas}", label="Välj utbildningsområde", dropdown=True, on_change=update_filter_options)
+                            tgb.selector("{selected_municipality}", lov="{municipalities}", label="Välj kommun", dropdown=True, on_change=update_filter_options)
+                            tgb.selector("{selected_school}", lov="{schools}", label="Välj skola", dropdown=True, on_change=update_filter_options)
+                            tgb.selector("{selected_education}", lov="{educations}", label="Välj utbildning", dropdown=True, on_change=update_filter_options)
                             tgb.selector("{selected_year}", lov="{years_available}", label="Välj år:", dropdown=True, on_change=update_all_year_views)
+                            tgb.toggle("{with_moms}", label="Med momskompensation", on_change=update_funding_views)
+                            tgb.text("Ändring av schablonbelopp: {rate_change} %", mode="md")
+                            tgb.slider("{rate_change}", min=-20, max=20, step=1, on_change=update_funding_views)
                             tgb.button("Filtrera", on_action=apply_filters_to_dashboard, class_name="button-primary")
                             tgb.button("Rensa alla filter", on_action=reset_filters, class_name="button-secondary")
 
@@ -138,32 +368,48 @@ with tgb.Page() as dashboard_page:
                 with tgb.part(class_name="middle-grid"):
                     with tgb.part(class_name="map-card"):
                         tgb.text("### Fördelning av beviljade platser", mode="md")
-                        tgb.chart(figure="{pie_figure}")
+                        figure_view("pie_figure")
 
                     with tgb.part(class_name="map-card"):
                         tgb.text("### Geografisk fördelning per region", mode="md")
-                        tgb.chart(figure="{region_beviljade_map}")
+                        figure_view("region_beviljade_map")
 
             with tgb.part(class_name="right-column"):
                 with tgb.part(class_name="map-card"):
                     tgb.text("### Statsbidrag per region", mode="md")
-                    tgb.chart(figure="{region_statsbidrag_map}")
+                    figure_view("region_statsbidrag_map")
 
                 with tgb.part(class_name="map-card"):
                     tgb.text("### Studerande per utbildningsområde", mode="md")
-                    tgb.chart(figure="{bub_animated_figure}")
+                    figure_view("bub_animated_figure")
 
                 with tgb.part(class_name="map-card"):
                     tgb.text("### Utbetalda statliga medel (miljoner kronor)", mode="md")
-                    tgb.chart(figure="{statsbidrag_over_time_figure}")
+                    figure_view("statsbidrag_over_time_figure")
 
                 with tgb.part(class_name="map-card"):
                     tgb.text("### Topp 20 skolor efter antal ansökningar", mode="md")
-                    tgb.chart(figure="{top_20_schools_figure}")
+                    figure_view("top_20_schools_figure")
+
+                with tgb.part(class_name="map-card"):
+                    tgb.text("### Platser per ansökningsomgång", mode="md")
+                    figure_view("rounds_figure")
 
                 with tgb.part(class_name="map-card"):
                     tgb.text("### Ansökningstrender per utbildningsområde (2020–2024)", mode="md")
-                    tgb.chart(figure="{application_trend_figure}")
+                    figure_view("application_trend_figure")
+
+                with tgb.part(class_name="map-card"):
+                    tgb.text("### Examinerade", mode="md")
+                    tgb.text("{graduate_note}")
+                    tgb.selector("{graduate_gender}", lov="{graduate_genders}", label="Kön", dropdown=True, on_change=update_graduate_views)
+                    tgb.selector("{graduate_form}", lov="{graduate_forms}", label="Studieform", dropdown=True, on_change=update_graduate_views)
+                    figure_view("graduates_by_field_figure")
+                    figure_view("graduates_by_region_figure")
+
+                with tgb.part(class_name="map-card"):
+                    tgb.text("### Sysselsättning efter examen", mode="md")
+                    figure_view("employment_by_field_figure")
 
 __all__ = [
     "dashboard_page",
@@ -173,6 +419,8 @@ __all__ = [
     "selected_municipality",
     "selected_school",
     "selected_education",
+    "with_moms",
+    "rate_change",
     "educational_areas",
     "municipalities",
     "schools",
@@ -188,6 +436,15 @@ __all__ = [
     "region_beviljade_map",
     "region_statsbidrag_map",
     "top_20_schools_figure",
+    "rounds_figure",
     "bub_animated_figure",
-    "application_trend_figure"
+    "application_trend_figure",
+    "graduate_gender",
+    "graduate_genders",
+    "graduate_form",
+    "graduate_forms",
+    "graduates_by_field_figure",
+    "graduates_by_region_figure",
+    "employment_by_field_figure",
+    "graduate_note"
 ]
@@ -1,5 +1,75 @@
 import taipy.gui.builder as tgb
-from backend.data_processing import df_courses, df_students, df_grants, df_graduates
+from backend.data_processing import datasets
+
+# Rows per window sent to the browser
+PAGE_SIZE = 50
+
+# Table key -> (title, registry pager). The pagers read the Arrow snapshots,
+# so opening this page never materializes the full raw frames.
+RAW_TABLES = {
+    "courses": ("Ansökningar för kurser 2024", "df_courses_table"),
+    "students": ("Behöriga studerande 2020–2024", "df_students_table"),
+    "grants": ("Utbetalda statsbidrag per år", "df_grants_table"),
+    "graduates": ("Examinerade inom yrkesområden", "df_graduates_table"),
+    "employment": ("Sysselsättning efter examen", "df_employment_table"),
+}
+
+
+def table_window(key, page=0, sort_by="", descending=False, search=""):
+    """One window of a raw table plus the summary line shown under it."""
+    rows, total = datasets.get(RAW_TABLES[key][1]).page(
+        page, PAGE_SIZE, sort_by=sort_by, descending=descending, search=search
+    )
+    page = min(page, max(0, (total - 1) // PAGE_SIZE))
+    first = page * PAGE_SIZE + 1 if total else 0
+    info = f"Rader {first}–{page * PAGE_SIZE + len(rows)} av {total}"
+    return rows, page, info
+
+
+def refresh_table(state, key, page=None):
+    if page is None:
+        page = getattr(state, f"{key}_page")
+    rows, page, info = table_window(
+        key,
+        page,
+        sort_by=getattr(state, f"{key}_sort"),
+        descending=getattr(state, f"{key}_descending"),
+        search=getattr(state, f"{key}_search"),
+    )
+    setattr(state, f"{key}_rows", rows)
+    setattr(state, f"{key}_page", page)
+    setattr(state, f"{key}_info", info)
+
+
+# Search, sort and direction changes go back to the first window
+def on_table_query_change(state, var_name, value):
+    refresh_table(state, var_name.split("_")[0], page=0)
+
+
+def on_table_page(state, id):
+    key, direction = id.split("-")
+    step = 1 if direction == "next" else -1
+    refresh_table(state, key, page=max(0, getattr(state, f"{key}_page") + step))
+
+
+# Pushed to every session by backend.updates after a data refresh
+def refresh_data_page(state, names=()):
+    for key, (_, pager) in RAW_TABLES.items():
+        if not names or pager in names:
+            columns = datasets.get(pager).columns
+            setattr(state, f"{key}_columns", [""] + columns)
+            if getattr(state, f"{key}_sort") not in columns:
+                setattr(state, f"{key}_sort", "")
+            refresh_table(state, key)
+
+
+# Per-table state: current window, page number, search text, sort column and summary
+for _key, (_title, _pager) in RAW_TABLES.items():
+    globals()[f"{_key}_rows"], globals()[f"{_key}_page"], globals()[f"{_key}_info"] = table_window(_key)
+    globals()[f"{_key}_search"] = ""
+    globals()[f"{_key}_sort"] = ""
+    globals()[f"{_key}_descending"] = False
+    globals()[f"{_key}_columns"] = [""] + datasets.get(_pager).columns
 
 with tgb.Page() as data_page:
     with tgb.part(class_name="container card stack-large"):
@@ -7,18 +77,15 @@ with tgb.Page() as data_page:
 
         tgb.text("# Rådata", mode="md")
 
-        with tgb.part(class_name="card"):
-            tgb.text("### Ansökningar för kurser 2024", mode="md")
-            tgb.table("{df_courses}")
-
-        with tgb.part(class_name="card"):
-            tgb.text("### Behöriga studerande 2020–2024", mode="md")
-            tgb.table("{df_students}")
-
-        with tgb.part(class_name="card"):
-            tgb.text("### Utbetalda statsbidrag per år", mode="md")
-            tgb.table("{df_grants}")
-
-        with tgb.part(class_name="card"):
-            tgb.text("### Examinerade inom yrkesområden", mode="md")
-            tgb.table("{df_graduates}")
+        for _key, (_title, _pager) in RAW_TABLES.items():
+            with tgb.part(class_name="card"):
+                tgb.text(f"### {_title}", mode="md")
+                with tgb.layout(columns="2 2 1"):
+                    tgb.input(f"{{{_key}_search}}", label="Sök", on_change=on_table_query_change)
+                    tgb.selector(f"{{{_key}_sort}}", lov=f"{{{_key}_columns}}", label="Sortera efter", dropdown=True, on_change=on_table_query_change)
+                    tgb.toggle(f"{{{_key}_descending}}", label="Fallande", on_change=on_table_query_change)
+                tgb.table(f"{{{_key}_rows}}", page_size=PAGE_SIZE, show_all=True)
+                with tgb.layout(columns="1 1 4"):
+                    tgb.button("Föregående", id=f"{_key}-prev", on_action=on_table_page, class_name="button-secondary")
+                    tgb.button("Nästa", id=f"{_key}-next", on_action=on_table_page, class_name="button-secondary")
+                    tgb.text(f"{{{_key}_info}}")
@@ -0,0 +1,64 @@
+import taipy.gui.builder as tgb
+from taipy.gui import notify
+
+from backend.figure_cache import figure_cache
+from backend.figure_delivery import payloads
+from backend.instrumentation import metrics
+from backend.schema import memory_report
+from backend.shared import shared
+from backend.streaming import stream_report
+
+
+def cache_summary():
+    stored, json_bytes, gzip_bytes = payloads.summary()
+    return (
+        f"Figurcache: {len(figure_cache)} figurer, {figure_cache.hits} träffar, {figure_cache.misses} missar · "
+        f"Delade värden: {len(shared)} objekt, {shared.hits} träffar, {shared.misses} missar · "
+        f"Figur-JSON: {stored} figurer, {json_bytes / 1024:.0f} KiB ({gzip_bytes / 1024:.0f} KiB gzip)"
+    )
+
+
+def refresh_diagnostics(state):
+    state.timings = metrics.table()
+    state.memory = memory_report()
+    state.streamed = stream_report()
+    state.cache_info = cache_summary()
+
+
+def reset_diagnostics(state):
+    metrics.reset()
+    refresh_diagnostics(state)
+
+
+def export_diagnostics(state):
+    path = metrics.write_prometheus()
+    notify(state, "success", f"Mätvärden skrivna till {path}")
+
+
+timings = metrics.table()
+memory = memory_report()
+streamed = stream_report()
+cache_info = cache_summary()
+
+with tgb.Page() as diagnostics_page:
+    with tgb.part(class_name="container card stack-large"):
+        tgb.navbar()
+
+        tgb.text("# Diagnostik", mode="md")
+        tgb.text("Tid, rader och minne per laddare, diagram och callback sedan start.", mode="md")
+        if not metrics.enabled:
+            tgb.text("Mätningen är avstängd; starta med YH_INSTRUMENT=1 (och YH_INSTRUMENT_MEMORY=1 för minnestopp).", mode="md")
+
+        with tgb.layout(columns="1 1 1 3"):
+            tgb.button("Uppdatera", on_action=refresh_diagnostics, class_name="button-primary")
+            tgb.button("Nollställ", on_action=reset_diagnostics, class_name="button-secondary")
+            tgb.button("Exportera", on_action=export_diagnostics, class_name="button-secondary")
+            tgb.text("{cache_info}")
+
+        tgb.table("{timings}", page_size=50, filter=True)
+
+        tgb.text("### Minne per dataset (standardtyper mot schema)", mode="md")
+        tgb.table("{memory}", show_all=True)
+
+        tgb.text("### Strömmad inläsning (rader lästa, behållna och överhoppade)", mode="md")
+        tgb.table("{streamed}", show_all=True)
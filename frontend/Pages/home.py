@@ -13,5 +13,6 @@ This dashboard provides interactive insights into:
 - Organizer-level analysis and summaries  
 - Estimated state funding based on YH-points  
 
-Use the navigation menu to explore each section.
+**[Quick overview](/snapshot)** — the dashboard's default view as a static page that loads instantly.
+Choose filters in the **[interactive dashboard](/dashboard)**, or use the navigation menu to explore each section.
 """
@@ -0,0 +1,194 @@
+"""Static snapshot of the dashboard's default view.
+
+With no filters selected and the default funding scenario the dashboard is
+the same for every visitor, so it is rendered once to plain files:
+
+    index.html                  the page; plotly.js draws the charts in the browser
+    dashboard.json              KPIs, years and each chart's figure file, per year
+    figures/<etag>.json(.gz)    content-addressed figure JSON, shared between years
+    plotly.min.js(.gz)
+
+``backend.static_site`` serves the directory at /snapshot without touching
+pandas; the home page links to it, and choosing a filter links to the live
+dashboard. The server writes it at start and again after every data refresh
+that touches the dashboard (``rebuild_snapshot``); to write it by hand (the
+package directory is ``Pages``, so use that spelling on a case-sensitive
+filesystem):
+
+    python -m frontend.Pages.snapshot
+    python -m frontend.Pages.snapshot --output dist/snapshot
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from backend.figure_delivery import payloads
+from backend.static_site import SNAPSHOT_DIRECTORY
+
+try:
+    from frontend.pages import dashboard
+except ModuleNotFoundError:
+    # Run as frontend.Pages.snapshot: the pages import each other as frontend.pages
+    import frontend.Pages
+    sys.modules.setdefault("frontend.pages", frontend.Pages)
+    from frontend.pages import dashboard
+
+logger = logging.getLogger(__name__)
+
+# Charts that do not depend on the year (the keys of dashboard.fixed_figures): state variable -> title
+FIXED_CHARTS = {
+    "pie_figure": "Fördelning av beviljade platser",
+    "statsbidrag_over_time_figure": "Utbetalda statliga medel (miljoner kronor)",
+    "top_20_schools_figure": "Topp 20 skolor efter antal ansökningar",
+    "rounds_figure": "Platser per ansökningsomgång",
+    "application_trend_figure": "Ansökningstrender per utbildningsområde (2020–2024)",
+}
+# Charts rebuilt per selected year (the keys of dashboard.year_view_figures)
+YEAR_CHARTS = {
+    "region_beviljade_map": "Geografisk fördelning per region",
+    "region_statsbidrag_map": "Statsbidrag per region",
+    "bub_animated_figure": "Studerande per utbildningsområde",
+    "graduates_by_field_figure": "Examinerade per inriktning",
+    "graduates_by_region_figure": "Examinerade per region",
+    "employment_by_field_figure": "Sysselsättning efter examen",
+}
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html lang="sv"><head><meta charset="utf-8">
+<title>YH Dashboard</title>
+<script src="plotly.min.js"></script>
+<style>
+body {{ font-family: sans-serif; margin: 1rem 2rem; }}
+.kpis, .charts {{ display: grid; gap: 1rem; grid-template-columns: repeat(auto-fill, minmax(28rem, 1fr)); }}
+.kpis {{ grid-template-columns: repeat(auto-fill, minmax(12rem, 1fr)); margin-bottom: 1rem; }}
+.card {{ border: 1px solid #ddd; border-radius: 8px; padding: 0.5rem 1rem; }}
+.chart {{ height: 450px; }}
+</style>
+</head><body>
+<h1>YH Dashboard</h1>
+<p>Standardvyn utan filter. <a href="/dashboard">Filtrera i den interaktiva dashboarden</a></p>
+<label>Välj år <select id="year"></select></label>
+<p id="note"></p>
+<div class="kpis" id="kpis"></div>
+<div class="charts">{cards}</div>
+<script>
+const KPIS = {kpis};
+function draw(id, file) {{
+    fetch(file).then((response) => response.json())
+        .then((figure) => Plotly.react(id, figure.data, figure.layout, {{responsive: true}}));
+}}
+fetch("dashboard.json").then((response) => response.json()).then((snapshot) => {{
+    document.getElementById("kpis").innerHTML = Object.entries(KPIS)
+        .map(([key, label]) => `<div class="card"><b>${{label}}:</b> ${{snapshot.kpi[key]}}</div>`).join("");
+    for (const [id, file] of Object.entries(snapshot.figures)) draw(id, file);
+    const select = document.getElementById("year");
+    select.innerHTML = snapshot.years.map((year) => `<option>${{year}}</option>`).join("");
+    select.value = snapshot.year;
+    const showYear = () => {{
+        for (const [id, file] of Object.entries(snapshot.year_figures[select.value])) draw(id, file);
+        document.getElementById("note").textContent = snapshot.notes[select.value];
+    }};
+    select.onchange = showYear;
+    showYear();
+}});
+</script>
+</body></html>
+"""
+
+KPI_LABELS = {
+    "total_applications": "Totalt antal ansökningar",
+    "approved_applications": "Beviljade ansökningar",
+    "rejected_applications": "Avslag",
+    "approval_rate": "Beviljandegrad (%)",
+    "unique_schools": "Antal anordnare",
+}
+
+
+def _write(path, data):
+    """Write ``data`` and a gzip copy next to it, each atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for target, body in ((path, data), (path.with_name(path.name + ".gz"), gzip.compress(data, 9, mtime=0))):
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, target)
+
+
+def write_figure(figure, directory):
+    """Write a figure under its ETag; returns its path relative to ``directory``."""
+    payload = payloads.payload(figure)
+    relative = f"figures/{payload.etag}.json"
+    if not (directory / relative).exists():
+        _write(directory / relative, payload.json)
+    return relative
+
+
+def default_kpis():
+    results = dashboard.figure_cache.get(dashboard.default_filter_results, ("filtered_df",))["kpi"]
+    return {
+        "total_applications": int(results["total_applications"]),
+        "approved_applications": int(results["approved_applications"]),
+        "rejected_applications": int(results["total_applications"] - results["approved_applications"]),
+        "approval_rate": round(float(results["approval_rate"]), 1),
+        "unique_schools": int(results["unique_schools"]),
+    }
+
+
+def export_snapshot(directory=SNAPSHOT_DIRECTORY):
+    """Render the default view and every year's variants to ``directory``; returns the manifest."""
+    directory = Path(directory)
+    years = [str(year) for year in dashboard.available_years()]
+    figures = dashboard.fixed_figures()
+    snapshot = {
+        "year": str(dashboard.selected_year),
+        "years": years,
+        "kpi": default_kpis(),
+        "figures": {name: write_figure(figures[name], directory) for name in FIXED_CHARTS},
+        "year_figures": {
+            year: {
+                name: write_figure(figure, directory)
+                for name, figure in dashboard.year_view_figures(year).items()
+                if name in YEAR_CHARTS
+            }
+            for year in years
+        },
+        # e.g. the newest year has no examinations yet and its graduate charts show the year before
+        "notes": {year: dashboard.examinations_note(year, dashboard.graduate_year(year)) for year in years},
+    }
+    cards = "".join(
+        f'<div class="card"><h3>{title}</h3><div class="chart" id="{name}"></div></div>'
+        for name, title in {**FIXED_CHARTS, **YEAR_CHARTS}.items()
+    )
+    _write(directory / "plotly.min.js", get_plotlyjs().encode("utf-8"))
+    _write(directory / "index.html", INDEX_PAGE.format(cards=cards, kpis=json.dumps(KPI_LABELS, ensure_ascii=False)).encode("utf-8"))
+    _write(directory / "dashboard.json", json.dumps(snapshot, ensure_ascii=False, indent=1).encode("utf-8"))
+    return snapshot
+
+
+def rebuild_snapshot(names=()):
+    """Data-refresh listener: rewrite the snapshot when a dataset behind the dashboard changed."""
+    if names and not dashboard.PAGE_DATASETS.intersection(names):
+        return
+    try:
+        export_snapshot()
+    except Exception:
+        # /snapshot keeps the previous files; the next refresh retries
+        logger.exception("Snapshot rebuild failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_DIRECTORY)
+    args = parser.parse_args(argv)
+    snapshot = export_snapshot(args.output)
+    files = len(set(snapshot["figures"].values()).union(*(set(v.values()) for v in snapshot["year_figures"].values())))
+    print(f"Snapshot of {len(snapshot['years'])} years, {files} figure files, written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,78 @@
-from taipy.gui import Gui
+import os
+import subprocess
+import sys
+import threading
+
+from backend.workers import WORKERS, attach_shared_data, is_worker, supervise, worker_port
+
+if __name__ == "__main__" and WORKERS > 1 and not is_worker():
+    # Production (YH_WORKERS=N): build the data and the /snapshot files once,
+    # start N workers and proxy one port to them
+    subprocess.run([sys.executable, "-m", "frontend.Pages.snapshot"], check=True)
+    supervise(__file__)
+    raise SystemExit
+
+if is_worker():
+    # Before any page loads: the shared frames come memory-mapped from the build step
+    attach_shared_data()
+
+from flask import Flask
+from taipy.gui import Gui, get_state_id
 from frontend.pages.home import home_page
-from frontend.pages.dashboard import dashboard_page
-from frontend.pages.data import data_page
+from frontend.pages.dashboard import dashboard_page, refresh_dashboard
+from frontend.pages.data import data_page, refresh_data_page
+from frontend.pages.diagnostics import diagnostics_page
+from frontend.pages.snapshot import rebuild_snapshot
+from backend.figure_delivery import figures_blueprint
+from backend.instrumentation import metrics, start_export
+from backend.static_site import static_blueprint
+from backend.updates import watch_data
 
 # Define the page routing dictionary
 pages = {
     "/": home_page,
     "dashboard": dashboard_page,
-    "data": data_page
+    "data": data_page,
+    "diagnostics": diagnostics_page
 }
 
-if __name__ == "__main__":
-    Gui(pages=pages).run(
-        use_navigation=True,
-        use_reloader=True,
-        port="auto"
-    )
+# Page callbacks re-run in every session when the data under data/ changes
+REFRESH_CALLBACKS = [refresh_dashboard, refresh_data_page]
+
+# Taipy runs on our Flask app, which also serves the pre-serialized figures (/figures)
+# and the static snapshot of the default dashboard (/snapshot, see frontend.pages.snapshot)
+app = Flask(__name__)
+app.register_blueprint(figures_blueprint)
+app.register_blueprint(static_blueprint)
 
+gui = Gui(pages=pages, flask=app)
+watcher = None
 
+# Sessions opened after a refresh start from the page defaults; bring them up to date
+def on_init(state):
+    if watcher is not None and watcher.refreshed:
+        for callback in REFRESH_CALLBACKS:
+            gui.invoke_callback(get_state_id(state), callback, [sorted(watcher.refreshed)], module_context=callback.__module__)
 
+if __name__ == "__main__":
+    # Set YH_WATCH_DATA=0 to disable live reloading of the data files
+    if os.environ.get("YH_WATCH_DATA", "1") == "1":
+        watcher = watch_data(gui, REFRESH_CALLBACKS)
+        # The static snapshot follows the data too
+        watcher.add_listener(rebuild_snapshot)
+    # Prometheus text export of the timings (YH_METRICS_FILE, default data/.cache/metrics.prom;
+    # with YH_WORKERS>1 one file per worker, see backend.workers)
+    if metrics.enabled:
+        start_export()
+    if not is_worker():
+        # Write the /snapshot files the home page links to, without delaying the start
+        threading.Thread(target=rebuild_snapshot, name="snapshot", daemon=True).start()
+    if is_worker():
+        # Behind the supervisor's proxy: no reloader, no browser, private port
+        gui.run(use_navigation=True, use_reloader=False, run_browser=False, host="127.0.0.1", port=worker_port())
+    else:
+        gui.run(
+            use_navigation=True,
+            use_reloader=True,
+            port="auto"
+        )
@@ -0,0 +1,56 @@
+"""AggregateCube.rollup must match a pandas groupby over the fact rows."""
+import pandas as pd
+import pytest
+
+from backend.cube import AggregateCube
+from backend.data_processing import CUBE_DIMENSIONS, CUBE_MEASURES, application_facts, datasets
+
+QUERIES = [
+    (["År"], {}),
+    (["Län", "År"], {}),
+    (["Utbildningsområde"], {"År": 2021}),
+    (["Anordnare"], {"Län": "Stockholms län", "År": 2020}),
+    (["År", "Utbildningsområde"], {"Län": ["Skåne län", "Västra Götalands län"]}),
+    ([], {"År": [2020, 2021]}),
+]
+
+
+@pytest.fixture(scope="module")
+def facts():
+    df_combined = datasets.get("df_combined")
+    df_courses = datasets.get("df_courses")
+    df_municipalities = datasets.get("df_municipalities")
+    facts = pd.concat([df_combined, application_facts(df_courses, df_municipalities)], ignore_index=True)
+    return facts[CUBE_DIMENSIONS + ["Länskod"] + CUBE_MEASURES]
+
+
+@pytest.fixture(scope="module")
+def cube(facts):
+    return AggregateCube(facts, CUBE_DIMENSIONS, CUBE_MEASURES, attributes={"Län": ["Länskod"]})
+
+
+def groupby(facts, by, where):
+    for dim, value in where.items():
+        values = value if isinstance(value, list) else [value]
+        facts = facts[facts[dim].isin(values)]
+    if not by:
+        return facts[CUBE_MEASURES].sum(min_count=1).to_frame().T
+    return facts.groupby(by, dropna=False, observed=True, sort=True)[CUBE_MEASURES].sum(min_count=1).reset_index()
+
+
+@pytest.mark.parametrize("by, where", QUERIES)
+def test_rollup_matches_groupby(cube, facts, by, where):
+    expected = groupby(facts, by, where)
+    got = cube.rollup(by, CUBE_MEASURES, where)[by + CUBE_MEASURES]
+    pd.testing.assert_frame_equal(
+        got.astype({m: "float64" for m in CUBE_MEASURES}),
+        expected.astype({m: "float64" for m in CUBE_MEASURES}),
+        check_dtype=False, check_categorical=False
+    )
+
+
+def test_seat_counts_stay_integer(cube):
+    rollup = cube.rollup(["År"], ["Beviljade", "Platser", "Statsbidrag"])
+    assert str(rollup["Beviljade"].dtype) == "Int64"
+    assert str(rollup["Platser"].dtype) == "Int64"
+    assert rollup["Statsbidrag"].dtype == "float64"
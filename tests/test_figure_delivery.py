@@ -0,0 +1,43 @@
+"""Encoding negotiation and the lifetime of served figure payloads."""
+import gc
+
+import plotly.graph_objects as go
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from backend.figure_delivery import FigurePayloads, make_payload
+
+
+@pytest.mark.parametrize("header, encoding", [
+    ("gzip", "gzip"),
+    ("gzip;q=0, identity", None),
+    ("identity;q=1, gzip;q=0.5", None),
+    ("*", "gzip"),
+    ("", None),
+    ("deflate, gzip;q=0.8", "gzip"),
+])
+def test_encoded_honors_q_values(header, encoding):
+    payload = make_payload(b'{"data": []}')._replace(brotli=None)
+    body, chosen = payload.encoded(parse_accept_header(header, Accept))
+    assert chosen == encoding
+    assert body == (payload.gzip if encoding == "gzip" else payload.json)
+
+
+def test_brotli_only_when_preferred():
+    payload = make_payload(b'{"data": []}')._replace(brotli=b"br-bytes")
+    assert payload.encoded(parse_accept_header("gzip, br", Accept))[1] == "br"
+    assert payload.encoded(parse_accept_header("gzip, br;q=0.5", Accept))[1] == "gzip"
+
+
+def test_payload_lives_as_long_as_its_figure():
+    payloads = FigurePayloads()
+    figures = [go.Figure(go.Bar(x=[i], y=[i])) for i in range(300)]
+    etags = [payloads.payload(figure).etag for figure in figures]
+    # No bound: the first figure's page can still fetch it after many others
+    assert payloads.get(etags[0]) is figures[0]._yh_payload
+
+    del figures
+    gc.collect()
+    assert payloads.get(etags[0]) is None
+    assert len(payloads) == 0
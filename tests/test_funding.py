@@ -0,0 +1,68 @@
+"""Rate parsing, rate lookup and the Statsbidrag of a scenario."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.funding import (
+    POINTS_PER_YEAR, RATE_COLUMNS, Scenario, area_key, area_rates, compute_statsbidrag, parse_amount,
+)
+
+
+@pytest.fixture
+def rates():
+    areas = ["Data/IT", "Ekonomi, administration och försäljning"]
+    rates = pd.DataFrame({
+        "Utbildningsområde": areas,
+        RATE_COLUMNS[False]: [69900, 62500],
+        RATE_COLUMNS[True]: [74100, 66600],
+    })
+    rates.index = rates["Utbildningsområde"].map(area_key)
+    return rates
+
+
+@pytest.mark.parametrize("text, amount", [("69 900", 69900), ("69 900 kr", 69900), ("69\xa0900", 69900), ("1200", 1200)])
+def test_parse_amount(text, amount):
+    assert parse_amount(text) == amount
+
+
+def test_parse_amount_without_digits():
+    assert np.isnan(parse_amount("saknas"))
+
+
+def test_area_rates_matches_names_loosely(rates):
+    areas = pd.Series(["Data/It", "data / IT", "Ekonomi, administration och försäljning"])
+    np.testing.assert_array_equal(area_rates(areas, rates), [69900, 69900, 62500])
+
+
+def test_area_rates_missing_area_is_nan(rates):
+    areas = pd.Series(["Data/IT", "Okänt område"], dtype="category")
+    with pytest.warns(UserWarning, match="Okänt område"):
+        result = area_rates(areas, rates)
+    assert result[0] == 69900
+    assert np.isnan(result[1])
+
+
+def test_compute_statsbidrag_with_moms_and_factor(rates):
+    df = pd.DataFrame({
+        "År": [2023, 2024, 2024],
+        "Beviljade": [10, 20, 5],
+        "YH-poäng": [400, 200, 300],
+        "Utbildningsområde": ["Data/IT", "Data/IT", "Ekonomi, administration och försäljning"],
+    }, index=[7, 8, 9])
+    scenario = Scenario(moms=True, year=2024, factor=1.1)
+
+    result = compute_statsbidrag(df, rates, scenario)
+
+    expected = pd.Series(
+        [20 * 200 / POINTS_PER_YEAR * 74100 * 1.1, 5 * 300 / POINTS_PER_YEAR * 66600 * 1.1],
+        index=[8, 9], name="Statsbidrag",
+    )
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_compute_statsbidrag_all_years(rates):
+    df = pd.DataFrame({"År": [2023, 2024], "Beviljade": [1, 2], "YH-poäng": [200, 100],
+                       "Utbildningsområde": ["Data/IT", "Data/IT"]})
+    result = compute_statsbidrag(df, rates, Scenario())
+    np.testing.assert_allclose(result.to_numpy(), [69900, 69900])
+    assert result.index.tolist() == [0, 1]
@@ -0,0 +1,93 @@
+"""GraduateIndex.slice must match a pandas groupby over the melted graduate rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.data_processing import datasets
+from backend.graduates import DEFAULT_GENDER, GRADUATE_MEASURES, GraduateIndex
+
+FIELD = "utbildningens inriktning"
+REGION = "region där utbildningen bedrivs"
+FORM = "utbildningens studieform"
+
+QUERIES = [
+    (FIELD, {"År": 2023}),
+    (REGION, {"År": 2022, "kön": "kvinnor"}),
+    (FIELD, {"År": 2024, FORM: "Distans"}),
+    (["År", FORM], {REGION: "Skåne län"}),
+    (REGION, {"År": [2020, 2021], FIELD: ["Data/It", "Ekonomi, administration och försäljning"]}),
+    ([], {"År": 2021}),
+]
+
+
+@pytest.fixture(scope="module")
+def melted():
+    return datasets.get("df_graduates_melted")
+
+
+@pytest.fixture(scope="module")
+def index(melted):
+    return GraduateIndex(melted)
+
+
+def expected_slice(df, by, where):
+    where = {"kön": DEFAULT_GENDER, **where}
+    for dim, value in where.items():
+        values = value if isinstance(value, list) else [value]
+        df = df[df[dim].isin(values)]
+    if not by:
+        return pd.DataFrame([{measure: df[measure].sum(min_count=1) for measure in GRADUATE_MEASURES}])
+    return df.groupby(by, observed=True)[GRADUATE_MEASURES].sum(min_count=1).reset_index()
+
+
+def assert_same_slice(result, expected, by):
+    by = [by] if isinstance(by, str) else list(by)
+    if by:
+        result = result.sort_values(by, ignore_index=True)
+        expected = expected.sort_values(by, ignore_index=True)
+    for dim in by:
+        assert result[dim].astype(str).tolist() == expected[dim].astype(str).tolist()
+    for measure in GRADUATE_MEASURES:
+        np.testing.assert_allclose(result[measure].astype(float), expected[measure].astype(float))
+
+
+@pytest.mark.parametrize("by, where", QUERIES)
+def test_slice_matches_groupby(melted, index, by, where):
+    by_list = [by] if isinstance(by, str) else by
+    assert_same_slice(index.slice(by, where), expected_slice(melted, by_list, where), by)
+
+
+def test_unknown_value_gives_an_empty_slice(index):
+    assert index.select({"kön": DEFAULT_GENDER, "År": 1999}).size == 0
+
+
+def test_suppressed_counts_stay_missing():
+    df = pd.DataFrame({
+        "kön": ["totalt"] * 3,
+        "År": [2024] * 3,
+        FIELD: ["a", "a", "b"],
+        REGION: ["r"] * 3,
+        FORM: ["Bunden"] * 3,
+        "utbildningens längd": ["1 år"] * 3,
+        "Antal studerande": [5.0, np.nan, np.nan],
+        "Antal examinerade": [1.0, 2.0, np.nan],
+    })
+    result = GraduateIndex(df).slice(FIELD, {"År": 2024, FORM: "Bunden"}).set_index(FIELD)
+    assert result.loc["a", "Antal studerande"] == 5
+    assert result.loc["a", "Antal examinerade"] == 3
+    assert np.isnan(result.loc["b", "Antal studerande"])
+
+
+def test_marginal_and_filtered_slices_have_the_same_dtypes(index):
+    marginal = index.slice(FIELD, {"År": 2023})
+    filtered = index.slice(FIELD, {"År": 2023, FORM: "Distans"})
+    missing = index.slice(FIELD, {"År": 1999})
+    for measure in GRADUATE_MEASURES:
+        assert marginal[measure].dtype == filtered[measure].dtype == missing[measure].dtype == "float64"
+
+
+def test_latest_year_with_examinations(melted, index):
+    years = melted.dropna(subset=["Antal examinerade"])["År"].astype(int)
+    assert index.latest_year("Antal examinerade") == years.max()
+    assert index.latest_year("Antal examinerade", upto=years.min()) == years.min()
+    assert index.latest_year("Antal examinerade", upto=years.min() - 1) is None
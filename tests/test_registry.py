@@ -0,0 +1,70 @@
+import pytest
+
+from backend.registry import DatasetRegistry
+
+
+def counting_registry():
+    """raw -> doubled -> total, with a count of builds per dataset."""
+    builds = {"raw": 0, "doubled": 0, "total": 0}
+    source = {"values": [1, 2, 3]}
+    registry = DatasetRegistry()
+
+    @registry.register("raw")
+    def raw():
+        builds["raw"] += 1
+        return list(source["values"])
+
+    @registry.register("doubled", depends_on=("raw",))
+    def doubled(raw):
+        builds["doubled"] += 1
+        return [value * 2 for value in raw]
+
+    @registry.register("total", depends_on=("doubled",))
+    def total(doubled):
+        builds["total"] += 1
+        return sum(doubled)
+
+    return registry, builds, source
+
+
+def test_get_builds_lazily_and_memoizes():
+    registry, builds, _ = counting_registry()
+    assert builds == {"raw": 0, "doubled": 0, "total": 0}
+    assert registry.get("total") == 12
+    assert registry.get("total") == 12
+    assert builds == {"raw": 1, "doubled": 1, "total": 1}
+
+
+def test_invalidate_drops_dependents_and_bumps_versions():
+    registry, builds, source = counting_registry()
+    registry.get("total")
+    versions = {name: registry.version(name) for name in registry.names()}
+
+    assert registry.invalidate("raw") == ["raw", "doubled", "total"]
+    assert not any(registry.is_loaded(name) for name in registry.names())
+    assert all(registry.version(name) == versions[name] + 1 for name in registry.names())
+
+    source["values"] = [10]
+    assert registry.get("total") == 20
+    assert builds == {"raw": 2, "doubled": 2, "total": 2}
+
+
+def test_refresh_rebuilds_loaded_datasets_and_notifies():
+    registry, builds, source = counting_registry()
+    registry.get("doubled")
+    notified = []
+    registry.subscribe(notified.append)
+
+    source["values"] = [5]
+    assert registry.refresh("raw") == ["raw", "doubled", "total"]
+    assert notified == [["raw", "doubled", "total"]]
+    # Loaded datasets are swapped in rebuilt, the others only invalidated
+    assert registry.get("doubled") == [10]
+    assert not registry.is_loaded("total")
+    assert builds == {"raw": 2, "doubled": 2, "total": 0}
+
+
+def test_unknown_dependency_is_rejected():
+    registry = DatasetRegistry()
+    with pytest.raises(KeyError):
+        registry.register("orphan", lambda missing: missing, depends_on=("missing",))
@@ -1,8 +1,11 @@
+import os
 from pathlib import Path
 
 DATA_DIRECTORY = Path(__file__).parents[1] / "data"
+# YH_CACHE_DIRECTORY points the snapshot/geometry caches elsewhere (e.g. cold-start benchmarks)
+CACHE_DIRECTORY = Path(os.environ.get("YH_CACHE_DIRECTORY", DATA_DIRECTORY / ".cache"))
 
 if __name__ == "__main__":
     print("\n"*2)
     print(DATA_DIRECTORY)
-    print("\n"*2)
\ No newline at end of file
+    print("\n"*2)